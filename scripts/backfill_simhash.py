@@ -0,0 +1,32 @@
+"""SimHash 回填脚本 - 根据已存储的正文重建文章的 SimHash 分段索引（近似重复检测）"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# 将 src 加入 Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.storage.database import init_db, rebuild_simhash_index
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重建文章 SimHash 分段索引")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批处理的文章数")
+    args = parser.parse_args()
+
+    init_db()
+    indexed = rebuild_simhash_index(batch_size=args.batch_size)
+    logger.info("SimHash 回填完成: 共索引 %d 篇文章", indexed)
+
+
+if __name__ == "__main__":
+    main()
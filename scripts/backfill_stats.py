@@ -0,0 +1,32 @@
+"""统计回填脚本 - 根据已有发布记录（含已归档记录）重建 publish_stats / publish_latency_histogram 汇总表"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# 将 src 加入 Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.storage.database import init_db, rebuild_publish_stats
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重建发布统计汇总表")
+    parser.add_argument("--batch-size", type=int, default=5000, help="每批扫描的发布记录数")
+    args = parser.parse_args()
+
+    init_db()
+    counted = rebuild_publish_stats(batch_size=args.batch_size)
+    logger.info("统计回填完成: 共计入 %d 条终态发布记录（含已归档）", counted)
+
+
+if __name__ == "__main__":
+    main()
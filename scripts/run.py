@@ -4,6 +4,7 @@ import argparse
 import asyncio
 import logging
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 # 将 src 加入 Python path
@@ -25,14 +26,23 @@ logger = logging.getLogger(__name__)
 
 def create_app() -> FastAPI:
     """创建 FastAPI 应用"""
+    from src.publisher_hub import publisher_hub
     from src.storage.database import init_db
 
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # 启动常驻 worker，消费异步发布队列
+        await publisher_hub.start()
+        yield
+        await publisher_hub.shutdown()
+
     app = FastAPI(
         title="AI Auto Publisher",
         description="轻量级多平台发布中间件 - AI for Marketing 执行层",
         version="0.1.0",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
     app.include_router(router)
 
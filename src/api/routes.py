@@ -1,9 +1,14 @@
 """FastAPI 路由 - 标准化发布 API"""
 
+from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
+from ..fingerprint import NearDuplicateContent
+from ..idempotency import IdempotencyKeyConflict
+from ..lifecycle import ServiceDraining
 from ..models import (
     PlatformListResponse,
     PublishRequest,
@@ -11,27 +16,56 @@ from ..models import (
     TaskStatusResponse,
 )
 from ..publisher_hub import publisher_hub
-from ..storage.database import get_publish_history
+from ..storage.async_database import get_publish_history
+from ..storage.database import encode_history_cursor
+from ..storage.export import EXPORT_FORMATS, iter_export_rows, stream_export
 
 router = APIRouter(prefix="/api/v1", tags=["publisher"])
 
 
+def _service_unavailable(e: ServiceDraining) -> HTTPException:
+    """服务关闭中：503 + Retry-After，调用方稍后重试（由其他实例接收）"""
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after))})
+
+
 @router.post("/publish", response_model=PublishResponse, summary="发布内容到多平台")
-async def publish(request: PublishRequest) -> PublishResponse:
+async def publish(
+    request: PublishRequest,
+    async_mode: bool = Query(False, alias="async", description="异步模式：入队后立即返回 task_id"),
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", max_length=128, description="幂等键：重复请求返回首次响应"
+    ),
+) -> PublishResponse:
     """
     发布内容到指定平台。
 
     - 接收 Markdown 格式内容
     - 自动路由到对应适配器（Wechatsync MCP / 官方 API / Playwright）
-    - 并发发布，最多 3 个平台同时进行
-    - 自动去重：相同内容不会重复发布，返回已有记录
+    - 并发发布，受全局调度器按发布方式/平台限流
+    - 自动去重：相同内容不会重复发布，返回已有记录；近似重复的内容在 `similar_tasks` 中返回相似任务，
+      配置为拒绝（NEAR_DUPLICATE_ACTION=reject）时返回 409
     - 返回任务 ID 和各平台发布结果
+    - `?async=true`: 任务持久化后立即返回（各平台状态为 pending），后台 worker 执行，
+      通过 `/status/{task_id}` 查询进度
+    - 服务关闭过程中返回 503（带 Retry-After）
+    - `Idempotency-Key` 请求头：同一键的重复请求（如网络超时后重试）直接返回首次响应；
+      同一键用于内容不同的请求时返回 422
 
     **调用方**: n8n Webhook / Dify 自定义工具 / 外部 HTTP 客户端
     """
     try:
+        if idempotency_key:
+            return await publisher_hub.publish_idempotent(request, idempotency_key, async_mode=async_mode)
+        if async_mode:
+            return await publisher_hub.enqueue(request)
         response = await publisher_hub.publish(request)
         return response
+    except IdempotencyKeyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except NearDuplicateContent as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    except ServiceDraining as e:
+        raise _service_unavailable(e) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"发布失败: {e}") from e
 
@@ -65,17 +99,27 @@ async def get_task_status(task_id: str) -> TaskStatusResponse:
 
 @router.get("/history", summary="分页查询发布历史")
 async def publish_history(
-    page: int = Query(1, ge=1, description="页码"),
+    page: int = Query(1, ge=1, description="页码（传入 after 时忽略）"),
     size: int = Query(20, ge=1, le=100, description="每页数量"),
     platform: Optional[str] = Query(None, description="按平台过滤"),
     status: Optional[str] = Query(None, description="按状态过滤"),
+    after: Optional[str] = Query(None, description="翻页游标：上一页返回的 next_cursor"),
+    with_total: bool = Query(True, description="是否返回总数（缓存的近似值）"),
 ) -> dict:
     """
     分页查询发布历史记录。
 
     支持按平台和状态过滤。
+    - 深翻页请使用游标：把响应中的 `next_cursor` 作为下一页的 `after` 参数，耗时与页数无关
+    - `total` 为短时缓存的近似值，`with_total=false` 时不统计
     """
-    records, total = get_publish_history(page=page, size=size, platform=platform, status=status)
+    try:
+        records, total = await get_publish_history(
+            page=page, size=size, platform=platform, status=status, after=after, with_total=with_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"无效的翻页游标: {after}") from e
+
     return {
         "records": [
             {
@@ -94,9 +138,33 @@ async def publish_history(
         "total": total,
         "page": page,
         "size": size,
+        "next_cursor": encode_history_cursor(records[-1]) if len(records) == size else None,
     }
 
 
+@router.get("/history/export", summary="流式导出发布历史")
+async def export_history(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="导出格式：ndjson / csv"),
+    start: Optional[datetime] = Query(None, description="起始时间（含），ISO 8601"),
+    end: Optional[datetime] = Query(None, description="结束时间（不含），ISO 8601"),
+    platform: Optional[str] = Query(None, description="按平台过滤"),
+    status: Optional[str] = Query(None, description="按状态过滤"),
+) -> StreamingResponse:
+    """
+    流式导出发布记录（关联文章标题和标签）。
+
+    - 按创建时间正序分批读取，边查边写，单次请求导出全部数据，内存占用恒定
+    - NDJSON 每行一条 JSON；CSV 首行为表头，tags 以逗号拼接
+    """
+    rows = iter_export_rows(start=start, end=end, platform=platform, status=status)
+    filename = f"publish_history_{datetime.now():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_export(rows, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.post("/retry/{task_id}", summary="重试失败的发布任务")
 async def retry_task(task_id: str, platform: Optional[str] = None) -> dict:
     """
@@ -104,19 +172,50 @@ async def retry_task(task_id: str, platform: Optional[str] = None) -> dict:
 
     - 不指定 platform: 重试该任务所有失败的平台
     - 指定 platform: 仅重试指定平台
+    - 正文从服务端存储读回，失败平台重新入队由后台 worker 执行，通过 /status/{task_id} 轮询结果
     """
-    result = await publisher_hub.retry_task(task_id, platform)
+    try:
+        result = await publisher_hub.retry_task(task_id, platform)
+    except ServiceDraining as e:
+        raise _service_unavailable(e) from e
     if result is None:
         raise HTTPException(status_code=404, detail=f"任务不存在或无失败记录: {task_id}")
 
-    retry_task_id, retry_platforms, fingerprint = result
+    retry_platforms = [r.platform.value for r in result.results]
     return {
-        "task_id": retry_task_id,
-        "retry_platforms": [p.value for p in retry_platforms],
+        "task_id": result.task_id,
+        "retry_platforms": retry_platforms,
         "message": f"已触发重试 {len(retry_platforms)} 个平台",
     }
 
 
+@router.get("/queue", summary="查询调度队列深度")
+async def queue_stats() -> dict:
+    """
+    查询全局调度器和任务队列的实时状态。
+
+    - scheduler: 各发布方式/平台的并发上限、执行中数量、排队数量
+    - jobs: 数据库队列中排队和执行中的任务数
+    """
+    return await publisher_hub.get_queue_stats()
+
+
+@router.get("/stats", summary="发布统计")
+async def publish_stats(
+    granularity: str = Query("day", pattern="^(hour|day)$", description="统计粒度：hour / day"),
+    start: Optional[datetime] = Query(None, description="起始时间（含），ISO 8601"),
+    end: Optional[datetime] = Query(None, description="结束时间（不含），ISO 8601"),
+    platform: Optional[str] = Query(None, description="按平台过滤"),
+) -> dict:
+    """
+    查询按小时/天预聚合的发布统计。
+
+    - buckets: 每个时间区间 × 平台的状态计数、成功率、平均重试次数、平均耗时
+    - platforms: 时间范围内各平台汇总，含耗时分位数（直方图区间上界，null 表示超过最大区间）
+    """
+    return await publisher_hub.get_publish_stats(granularity=granularity, start=start, end=end, platform=platform)
+
+
 @router.get("/health", summary="健康检查")
 async def health_check() -> dict:
     """服务健康检查"""
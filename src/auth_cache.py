@@ -0,0 +1,145 @@
+"""AuthStatusCache - 平台认证状态缓存（TTL + 读取时按需刷新 + 持久化到 accounts 表）"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Optional
+
+from .config import Platform, settings
+from .storage.async_database import get_accounts, update_account_auth, update_accounts_auth
+
+logger = logging.getLogger(__name__)
+
+# 探测结果：True/False 为确定的认证状态，None 表示未知（限流、5xx、网络错误）
+AuthProbe = Callable[[list[Platform]], Awaitable[dict[Platform, Optional[bool]]]]
+
+
+class AuthStatusCache:
+    """
+    认证状态缓存。
+
+    - 查询直接返回缓存值；过期条目返回旧值并在后台刷新（stale-while-revalidate）
+    - 只在读取到过期条目时探测，不做周期性探测（探测接口本身有平台配额，如 Twitter /users/me）
+    - 从未探测过的平台才会同步等待探测
+    - 同一时刻只有一次探测在进行，并发查询共享结果
+    - 探测结果未知（限流、5xx、网络错误）时保留缓存值，不误判为未登录
+    - 探测结果一次事务写入 accounts 表，重启后先用持久化的状态兜底
+    """
+
+    def __init__(self, probe: AuthProbe, ttl: Optional[float] = None) -> None:
+        self._probe = probe
+        self._ttl = ttl if ttl is not None else settings.auth_cache_ttl
+        self._entries: dict[Platform, tuple[bool, float]] = {}  # platform → (是否已认证, 探测时间戳)
+        self._refreshing: Optional[asyncio.Task] = None
+        self._loaded = False
+
+    async def get(self, platform: Platform) -> bool:
+        return (await self.get_many([platform]))[platform]
+
+    async def get_many(self, platforms: list[Platform]) -> dict[Platform, bool]:
+        """批量查询认证状态"""
+        await self._load_persisted()
+
+        missing = [p for p in platforms if p not in self._entries]
+        if missing:
+            await self._probe_now(missing, only_missing=True)
+
+        now = time.time()
+        stale = [p for p in platforms if now - self._entries.get(p, (False, 0.0))[1] > self._ttl]
+        if stale and not self._is_refreshing():
+            self._start_refresh(stale)
+
+        return {p: self._entries.get(p, (False, 0.0))[0] for p in platforms}
+
+    async def refresh(self, platforms: Optional[list[Platform]] = None) -> dict[Platform, bool]:
+        """立即重新探测指定平台，不使用缓存（已有探测进行中时先等待它完成）"""
+        targets = list(platforms) if platforms is not None else list(Platform)
+        await self._probe_now(targets)
+        return {p: self._entries.get(p, (False, 0.0))[0] for p in targets}
+
+    async def mark(self, platform: Platform, is_authenticated: bool) -> None:
+        """发布过程中得知认证状态变化（如登录失效）时直接更新缓存"""
+        self._entries[platform] = (is_authenticated, time.time())
+        await update_account_auth(platform.value, is_authenticated)
+
+    async def start(self) -> None:
+        """预加载持久化的认证状态（之后按读取需要刷新）"""
+        await self._load_persisted()
+
+    async def stop(self) -> None:
+        task, self._refreshing = self._refreshing, None
+        if task and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _probe_now(self, platforms: list[Platform], only_missing: bool = False) -> None:
+        """
+        等待进行中的探测结束后发起新探测并等待其完成。
+
+        等待结束到创建任务之间没有 await，并发调用者依次排队，不会覆盖彼此的探测任务；
+        only_missing 为 True 时只探测等待期间仍未得到结果的平台（并发的首次查询共享一次探测）。
+        """
+        while self._is_refreshing():
+            await asyncio.wait({self._refreshing})
+        if only_missing:
+            platforms = [p for p in platforms if p not in self._entries]
+        if platforms:
+            await asyncio.shield(self._start_refresh(platforms))
+
+    def _start_refresh(self, platforms: list[Platform]) -> asyncio.Task:
+        self._refreshing = asyncio.create_task(self._refresh(platforms))
+        self._refreshing.add_done_callback(self._log_refresh_failure)
+        return self._refreshing
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task) -> None:
+        """读取探测任务的异常（后台刷新无人等待，否则失败既不记录也会触发未读取异常告警）"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("刷新认证状态失败", exc_info=task.exception())
+
+    def _is_refreshing(self) -> bool:
+        if self._refreshing is None or self._refreshing.done():
+            return False
+        # 探测任务属于已关闭的事件循环时视为不存在
+        return self._refreshing.get_loop() is asyncio.get_running_loop()
+
+    async def _refresh(self, platforms: list[Platform]) -> None:
+        started = time.monotonic()
+        results = await self._probe(platforms)
+        now = time.time()
+        probed: dict[str, bool] = {}
+        unknown: list[str] = []
+        for platform in platforms:
+            is_authed = results.get(platform)
+            previous = self._entries.get(platform)
+            if is_authed is None:
+                # 保留缓存值并重新计时，TTL 内不再探测（被限流时不反复请求）
+                self._entries[platform] = (previous[0] if previous else False, now)
+                unknown.append(platform.value)
+                continue
+            self._entries[platform] = (is_authed, now)
+            probed[platform.value] = is_authed
+        if probed:
+            await update_accounts_auth(probed)
+        if unknown:
+            logger.warning("认证状态暂时无法确认，保留缓存值: %s", unknown)
+        logger.info("认证状态探测完成: %d 个平台，耗时 %.2f 秒", len(results), time.monotonic() - started)
+
+    async def _load_persisted(self) -> None:
+        """首次查询时加载 accounts 表中的历史状态（视为已过期，触发后台刷新）"""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            accounts = await get_accounts()
+        except Exception as e:
+            logger.warning("加载持久化认证状态失败: %s", e)
+            return
+        for account in accounts:
+            try:
+                platform = Platform(account.platform)
+            except ValueError:
+                continue
+            checked_at = account.last_checked_at.timestamp() if account.last_checked_at else 0.0
+            self._entries.setdefault(platform, (bool(account.is_authenticated), checked_at))
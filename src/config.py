@@ -91,6 +91,23 @@ WECHATSYNC_ALL_PLATFORMS = [
     "imooc", "oschina", "segmentfault", "cnblogs", "x", "xiaohongshu",
 ]
 
+# 各发布方式的全局并发上限（进程级，所有请求共享）
+DEFAULT_METHOD_CONCURRENCY: dict[PublishMethod, int] = {
+    PublishMethod.OFFICIAL_API: 10,
+    PublishMethod.WECHATSYNC_MCP: 4,
+    PublishMethod.PLAYWRIGHT: 2,
+}
+
+# 各平台的并发上限（未列出的平台只受发布方式限制）
+DEFAULT_PLATFORM_CONCURRENCY: dict[Platform, int] = {
+    Platform.XIAOHONGSHU: 1,
+    Platform.DOUYIN: 1,
+    Platform.BILIBILI_VIDEO: 1,
+    Platform.YOUTUBE: 1,
+    Platform.TIKTOK: 1,
+    Platform.KUAISHOU: 1,
+}
+
 
 class Settings(BaseSettings):
     """应用配置"""
@@ -100,6 +117,34 @@ class Settings(BaseSettings):
     api_port: int = 8000
     mcp_port: int = 8080
     database_url: str = "sqlite:///./data/publisher.db"
+    db_executor_workers: int = 4  # 执行同步数据库调用的线程数，避免提交阻塞事件循环
+    db_pool_size: int = 0  # 0 表示按数据库线程数自动设置（线程数 + 1）
+    db_pool_max_overflow: int = 4
+    db_pool_timeout: float = 30.0
+
+    # 发布历史总数缓存秒数（/history 深翻页不再每次全表 COUNT）
+    history_total_cache_ttl: float = 30.0
+    history_export_batch_size: int = 1000  # /history/export 每批读取的行数
+
+    # 正文存储：按内容哈希去重、zlib 压缩（1-9，越大越省空间越慢）
+    content_compression_level: int = 6
+
+    # 数据保留：超过 retention_days 天的终态发布记录压缩归档到 publish_archive（0 表示不启用）
+    retention_days: int = 0
+    retention_batch_size: int = 500  # 每个事务归档的记录数
+    retention_interval: float = 3600.0  # 每轮归档间隔秒数
+    retention_batch_pause: float = 0.1  # 批与批之间让出的秒数
+
+    # 发布状态写缓冲（合并多个任务的状态变更，批量提交）
+    status_flush_interval: float = 0.05  # 秒
+    status_flush_max_batch: int = 200  # 积累到该条数立即提交
+
+    # SQLite 连接参数（每个连接建立时通过 PRAGMA 应用）
+    sqlite_journal_mode: str = "wal"  # WAL 允许读写并发，写入不再阻塞读取
+    sqlite_synchronous: str = "normal"  # WAL 下 normal 仅在 checkpoint 时 fsync
+    sqlite_busy_timeout_ms: int = 5000  # 写锁竞争时等待而非立即报 database is locked
+    sqlite_mmap_size: int = 268435456  # 256MB 内存映射读
+    sqlite_cache_size: int = -65536  # 负数单位为 KiB，即 64MB 页缓存
 
     # 微信公众号
     wechat_mp_app_id: str = ""
@@ -114,6 +159,8 @@ class Settings(BaseSettings):
     # Wechatsync MCP
     wechatsync_mcp_url: str = "http://localhost:9529"
     wechatsync_token: str = ""
+    # syncArticle 超时（秒）按目标平台数放大：每个平台的预算 × 平台数
+    wechatsync_sync_timeout_per_platform: float = 60.0
 
     # Knot
     knot_api_token: str = ""
@@ -121,6 +168,56 @@ class Settings(BaseSettings):
     # Playwright
     playwright_headless: bool = True
     playwright_slow_mo: int = 1000
+    playwright_pool_size: int = 1  # 常驻浏览器数量
+    playwright_context_max_uses: int = 20  # 单个平台 context 复用次数上限，达到后重建
+    playwright_humanize_profile: str = "human"  # human / fast / none
+    playwright_upload_timeout: float = 600.0  # 等待上传完成的最长秒数
+    playwright_confirm_timeout: float = 30.0  # 点击发布后等待发布接口响应的最长秒数
+
+    # 异步任务队列
+    worker_concurrency: int = 4
+    worker_poll_interval: float = 1.0
+
+    # 生命周期：关闭时等待执行中任务的最长秒数
+    shutdown_drain_timeout: float = 30.0
+    # 任务租约：执行中的实例每 job_heartbeat_interval 秒续约，超过 job_lease_ttl 未续约的任务可被其他实例接管
+    job_heartbeat_interval: float = 15.0
+    job_lease_ttl: float = 90.0
+    # 租约过期后被重新认领的次数上限，超过后任务及其未完成的发布记录标记失败
+    job_max_reclaims: int = 3
+
+    # 并发调度（覆盖默认值，如 SCHEDULER_PLATFORM_LIMITS='{"twitter": 5}'）
+    scheduler_method_limits: dict[str, int] = {}
+    scheduler_platform_limits: dict[str, int] = {}
+
+    # 平台限流（覆盖默认策略，如 RATE_LIMITS='{"twitter": {"monthly_quota": 3000}}'）
+    rate_limits: dict[str, dict[str, float]] = {}
+    rate_limit_max_wait: float = 60.0  # 单次最多等待秒数，超过则直接返回限流失败
+
+    # 持久化重试（覆盖默认策略，如 RETRY_POLICIES='{"twitter": {"max_attempts": 8}}'）
+    retry_policies: dict[str, dict[str, float]] = {}
+    retry_poll_interval: float = 5.0  # RetryEngine 扫描到期重试的间隔秒数
+    retry_claim_batch: int = 50  # 每次认领的到期记录数
+
+    # 近似重复检测（正文 SimHash 汉明距离 ≤ near_duplicate_distance 视为近似重复）
+    # action: off 不检测 / warn 记录告警并在响应中返回相似任务 / reject 拒绝发布（API 返回 409）
+    near_duplicate_action: str = "warn"
+    near_duplicate_distance: int = 3
+    # SimHash 分段索引的段数，需大于 near_duplicate_distance 才能保证不漏检；修改后运行 scripts/backfill_simhash.py
+    simhash_bands: int = 4
+
+    # 幂等键（Idempotency-Key 请求头）：首次响应保留的秒数与进程内 LRU 缓存条数
+    idempotency_ttl: float = 86400.0
+    idempotency_cache_size: int = 1024
+
+    # HTTP 连接池（每个发布器一个长连接客户端）
+    http2_enabled: bool = True
+    http_pool_max_connections: int = 20
+    http_pool_max_keepalive: int = 10
+    http_keepalive_expiry: float = 30.0
+
+    # 认证状态缓存（/platforms 与 MCP check_auth 直接读缓存，读到过期条目时后台刷新）
+    auth_cache_ttl: float = 300.0
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
@@ -0,0 +1,100 @@
+"""内容指纹 - 全文 BLAKE2b 精确指纹 + SimHash 近似重复检测"""
+
+import hashlib
+from collections import Counter
+from typing import NamedTuple, Optional
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3  # 字符 n-gram，中英文混排无需分词
+_CHUNK_CHARS = 1 << 16  # 流式编码的分块大小，长文不会整体复制一份 UTF-8
+
+
+def content_fingerprint(title: str, content: str) -> str:
+    """
+    精确去重指纹：标题 + 全文的 BLAKE2b-128（32 位十六进制）。
+
+    正文分块编码后流式喂给哈希，任何位置的改动都会产生新指纹。
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(title.encode("utf-8"))
+    digest.update(b"\x00")
+    for start in range(0, len(content), _CHUNK_CHARS):
+        digest.update(content[start : start + _CHUNK_CHARS].encode("utf-8"))
+    return digest.hexdigest()
+
+
+def legacy_fingerprint(title: str, content: str) -> str:
+    """
+    旧版指纹：标题 + 正文前 500 字的 MD5。
+
+    升级前入库的文章只有旧版指纹，去重时一并查找，避免已发布的旧文章被当作新内容重复发布。
+    """
+    return hashlib.md5(f"{title}:{content[:500]}".encode()).hexdigest()
+
+
+def simhash(text: str) -> int:
+    """
+    64 位 SimHash（字符 3-gram，按出现次数加权）。
+
+    每个 n-gram 的 8 字节哈希按字节累加到 8×256 的权重表，最后再展开成 64 个位的权重，
+    单个 n-gram 的开销与位数无关。
+    """
+    normalized = " ".join(text.lower().split())
+    if len(normalized) <= SHINGLE_SIZE:
+        shingles = Counter([normalized])
+    else:
+        shingles = Counter(normalized[i : i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1))
+
+    byte_weights = [[0] * 256 for _ in range(SIMHASH_BITS // 8)]
+    total = 0
+    for shingle, weight in shingles.items():
+        for position, byte in enumerate(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()):
+            byte_weights[position][byte] += weight
+        total += weight
+
+    value = 0
+    for position, weights in enumerate(byte_weights):
+        for bit in range(8):
+            ones = sum(weight for byte, weight in enumerate(weights) if weight and byte >> bit & 1)
+            if 2 * ones > total:
+                value |= 1 << (position * 8 + bit)
+    return value
+
+
+def simhash_bands(value: int, bands: int) -> list[int]:
+    """
+    把 SimHash 切成 bands 段（LSH 分桶键）。
+
+    两个指纹的汉明距离小于 bands 时至少有一段完全相同（鸽巢原理），按段等值查找即可召回，无需全表比较。
+    """
+    values = []
+    start = 0
+    for band in range(bands):
+        width = SIMHASH_BITS // bands + (1 if band < SIMHASH_BITS % bands else 0)
+        values.append(value >> start & ((1 << width) - 1))
+        start += width
+    return values
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class NearDuplicate(NamedTuple):
+    """与新内容近似重复的已发布文章"""
+
+    fingerprint: str
+    title: str
+    task_id: Optional[str]
+    distance: int  # SimHash 汉明距离，0 表示正文（归一化空白后）几乎相同
+
+
+class NearDuplicateContent(Exception):
+    """内容与已发布文章近似重复且配置为拒绝（API 返回 409）"""
+
+    def __init__(self, matches: list[NearDuplicate]) -> None:
+        self.matches = matches
+        closest = matches[0]
+        super().__init__(
+            f"内容与已发布文章近似重复: {closest.title}（task: {closest.task_id}，距离 {closest.distance}）"
+        )
@@ -0,0 +1,81 @@
+"""IdempotencyStore - Idempotency-Key 幂等发布（数据库持久化 + 进程内 LRU 缓存）"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .config import settings
+from .models import PublishRequest, PublishResponse
+from .storage.async_database import get_idempotency_key, save_idempotency_key
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyKeyConflict(Exception):
+    """同一个 Idempotency-Key 对应了不同的请求内容（API 返回 422）"""
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        super().__init__(f"Idempotency-Key 已用于内容不同的请求: {key}")
+
+
+def compute_request_hash(request: PublishRequest, async_mode: bool = False) -> str:
+    """请求摘要（标题和正文只有空白差异时视为同一请求）"""
+    data = request.model_dump(mode="json", exclude={"content_fingerprint"})
+    data["title"] = " ".join(request.title.split())
+    data["content"] = " ".join(request.content.split())
+    data["async"] = async_mode
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    幂等键存储。
+
+    - 首次请求完成后保存 键 → (请求摘要, 响应)，TTL 内的重复请求直接返回保存的响应，不再经过发布器
+    - 数据库为准（多进程共享），进程内 LRU 缓存热点键，重试风暴时不必每次查库
+    - 同一键对应不同请求内容时抛出 IdempotencyKeyConflict
+    """
+
+    def __init__(self, ttl: Optional[float] = None, cache_size: Optional[int] = None) -> None:
+        self._ttl = ttl or settings.idempotency_ttl
+        self._cache_size = cache_size or settings.idempotency_cache_size
+        self._cache: OrderedDict[str, tuple[str, str, float]] = OrderedDict()  # key → (请求摘要, 响应 JSON, 过期时间戳)
+
+    async def get(self, key: str, request_hash: str) -> Optional[PublishResponse]:
+        """返回该键保存的响应；未保存或已过期时返回 None"""
+        entry = self._cache.get(key)
+        if entry is not None and entry[2] <= time.time():
+            del self._cache[key]
+            entry = None
+        if entry is None:
+            record = await get_idempotency_key(key)
+            if record is None:
+                return None
+            entry = (record.request_hash, record.response, record.expires_at.timestamp())
+            self._remember(key, entry)
+        else:
+            self._cache.move_to_end(key)
+
+        if entry[0] != request_hash:
+            raise IdempotencyKeyConflict(key)
+        return PublishResponse.model_validate_json(entry[1])
+
+    async def put(self, key: str, request_hash: str, response: PublishResponse) -> None:
+        """保存首次请求的响应（同一键已被其他请求先保存时保留先保存的）"""
+        expires_at = datetime.now() + timedelta(seconds=self._ttl)
+        payload = response.model_dump_json()
+        if await save_idempotency_key(key, request_hash, response.task_id, payload, expires_at):
+            self._remember(key, (request_hash, payload, expires_at.timestamp()))
+        else:
+            logger.info("幂等键已由并发请求保存，保留先保存的响应: %s", key)
+
+    def _remember(self, key: str, entry: tuple[str, str, float]) -> None:
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
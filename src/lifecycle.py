@@ -0,0 +1,163 @@
+"""LifecycleManager - 任务租约续约、优雅关闭（停止接收 → 等待执行中任务 → 转存未完成任务）"""
+
+import asyncio
+import logging
+import os
+import socket
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional
+from uuid import uuid4
+
+from .config import settings
+from .storage.async_database import recover_interrupted_jobs, recover_orphaned_records, renew_publish_leases
+
+if TYPE_CHECKING:
+    from .publisher_hub import PublisherHub
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceDraining(Exception):
+    """服务正在关闭，不再接收新的发布任务（API 返回 503）"""
+
+    def __init__(self, retry_after: float) -> None:
+        self.retry_after = retry_after
+        super().__init__("服务正在关闭，请稍后重试")
+
+
+class LifecycleManager:
+    """
+    发布任务的生命周期管理。
+
+    - 每个实例有唯一的 owner 标识，认领任务时以此持有租约（多进程/多机共享数据库）
+    - 执行中的任务（同步发布和 worker 任务）通过 track() 登记，后台定期续约；
+      进程崩溃/被强杀后租约过期，任务由其他实例（或重启后的本实例）重新认领
+    - 关闭时先拒绝新任务并停止认领，最多等待 drain_timeout 秒；仍未完成的任务取消后转为重试
+    """
+
+    def __init__(
+        self,
+        hub: "PublisherHub",
+        drain_timeout: Optional[float] = None,
+        heartbeat_interval: Optional[float] = None,
+        lease_ttl: Optional[float] = None,
+    ) -> None:
+        self._hub = hub
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+        self._drain_timeout = settings.shutdown_drain_timeout if drain_timeout is None else drain_timeout
+        self._heartbeat_interval = heartbeat_interval or settings.job_heartbeat_interval
+        self.lease_ttl = lease_ttl or settings.job_lease_ttl
+        self._inflight: dict[asyncio.Task, int] = {}
+        self._idle: Optional[asyncio.Event] = None
+        self._draining = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def draining(self) -> bool:
+        return self._draining
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def admit(self) -> None:
+        """接收新任务前调用，关闭过程中抛出 ServiceDraining"""
+        if self._draining:
+            raise ServiceDraining(retry_after=self._drain_timeout)
+
+    @asynccontextmanager
+    async def track(self, job_id: int) -> AsyncIterator[None]:
+        """登记一次任务执行（心跳刷新、关闭时等待/取消的对象）"""
+        task = asyncio.current_task()
+        self._inflight[task] = job_id
+        self._ensure_idle().clear()
+        try:
+            yield
+        finally:
+            self._inflight.pop(task, None)
+            if not self._inflight:
+                self._ensure_idle().set()
+
+    async def start(self) -> None:
+        """
+        恢复没有队列任务的未完成记录并启动租约续约。
+
+        崩溃遗留的任务租约过期后由 WorkerPool 重新认领；升级前遗留、没有队列任务的 pending/processing
+        记录在这里转为重试，不会一直停留在 processing。
+        """
+        self._draining = False
+        self._idle = None  # Event 绑定事件循环，每次启动重新创建
+        await self.recover_orphaned()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._heartbeat_loop())
+
+    async def recover_orphaned(self) -> int:
+        """未完成但没有活动队列任务的发布记录转为重试，返回转移的记录数"""
+        stale_before = datetime.now() - timedelta(seconds=self.lease_ttl)
+        recovered = await recover_orphaned_records(stale_before)
+        if recovered:
+            await self._hub.retry_engine.run_once()
+        return recovered
+
+    async def renew_leases(self) -> None:
+        """为执行中的任务续约；租约已被其他实例接管（本实例长时间失联）时记录告警"""
+        job_ids = list(self._inflight.values())
+        owned = set(await renew_publish_leases(job_ids, self.owner, self.lease_ttl))
+        lost = [job_id for job_id in job_ids if job_id not in owned]
+        if lost:
+            logger.warning("任务租约已失效（可能已被其他实例接管）: %s", lost)
+
+    async def drain(self) -> int:
+        """
+        优雅关闭：拒绝新任务、停止认领，等待执行中的任务完成。
+
+        超过 drain_timeout 仍未完成的任务被取消，其未完成的平台转为重试（由下一个实例继续），
+        返回转移的发布记录数。
+        """
+        self._draining = True
+        self._hub.worker_pool.stop_claiming()
+
+        if self._inflight:
+            logger.info("等待 %d 个执行中的发布任务完成（最多 %.0f 秒）", len(self._inflight), self._drain_timeout)
+            try:
+                await asyncio.wait_for(self._ensure_idle().wait(), timeout=self._drain_timeout)
+            except TimeoutError:
+                pass
+
+        interrupted = dict(self._inflight)
+        if not interrupted:
+            return 0
+
+        logger.warning("关闭期限已到，中断 %d 个未完成的发布任务", len(interrupted))
+        for task in interrupted:
+            task.cancel()
+        await asyncio.gather(*interrupted, return_exceptions=True)
+        # 被中断任务已写入缓冲的状态先落盘，再整体转为重试
+        await self._hub.status_buffer.flush()
+        return await recover_interrupted_jobs(list(interrupted.values()), reason="服务关闭")
+
+    async def stop(self) -> None:
+        """停止心跳（关闭流程最后调用，之后可再次 start）"""
+        self._draining = False
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def _ensure_idle(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            self._idle.set()
+        return self._idle
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            try:
+                await self.renew_leases()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("任务续约失败")
@@ -8,7 +8,7 @@ from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, Tool
 
 from ..config import Platform
-from ..models import PublishRequest
+from ..models import PLATFORM_DISPLAY_NAMES, PublishRequest
 from ..publisher_hub import publisher_hub
 
 logger = logging.getLogger(__name__)
@@ -165,15 +165,15 @@ async def _handle_list_platforms() -> list[TextContent]:
 async def _handle_check_auth(args: dict) -> list[TextContent]:
     """处理 check_auth 工具调用"""
     try:
-        platform = Platform(args["platform"])
-        platforms_response = await publisher_hub.get_platforms()
-
-        for p in platforms_response.platforms:
-            if p.platform == platform:
-                status = "已认证 ✅" if p.is_authenticated else "未认证 ❌"
-                return [TextContent(type="text", text=f"{p.display_name}: {status}")]
+        try:
+            platform = Platform(args["platform"])
+        except ValueError:
+            return [TextContent(type="text", text=f"未找到平台: {args['platform']}")]
 
-        return [TextContent(type="text", text=f"未找到平台: {args['platform']}")]
+        is_authed = await publisher_hub.check_auth(platform)
+        status = "已认证 ✅" if is_authed else "未认证 ❌"
+        display_name = PLATFORM_DISPLAY_NAMES.get(platform, platform.value)
+        return [TextContent(type="text", text=f"{display_name}: {status}")]
 
     except Exception as e:
         return [TextContent(type="text", text=f"检查认证失败: {e}")]
@@ -209,6 +209,15 @@ async def _handle_get_status(args: dict) -> list[TextContent]:
 
 
 async def run_mcp_server():
-    """以 stdio 模式运行 MCP Server"""
-    async with stdio_server() as (read_stream, write_stream):
-        await mcp_server.run(read_stream, write_stream, mcp_server.create_initialization_options())
+    """
+    以 stdio 模式运行 MCP Server。
+
+    与 FastAPI lifespan 一样启动和关闭 PublisherHub：中断任务恢复、worker、重试调度都依赖 start()，
+    退出时 shutdown() 排空执行中的任务并刷新状态缓冲，避免丢失发布记录。
+    """
+    await publisher_hub.start()
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await mcp_server.run(read_stream, write_stream, mcp_server.create_initialization_options())
+    finally:
+        await publisher_hub.shutdown()
@@ -1,13 +1,14 @@
 """数据模型 - FastAPI 和 MCP Server 共享"""
 
-import hashlib
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
 from typing import Optional
 
 from pydantic import BaseModel, Field, computed_field
 
 from .config import ContentType, Platform
+from .fingerprint import content_fingerprint
 
 
 class PublishStatus(str, Enum):
@@ -15,11 +16,30 @@ class PublishStatus(str, Enum):
 
     PENDING = "pending"
     PROCESSING = "processing"
+    RETRY_SCHEDULED = "retry_scheduled"  # 失败后已安排延迟重试，到期由 RetryEngine 重新入队
     DRAFT_SAVED = "draft_saved"
     PUBLISHED = "published"
     FAILED = "failed"
 
 
+class ErrorCategory(str, Enum):
+    """发布失败类型，决定重试策略"""
+
+    TRANSIENT = "transient"  # 网络抖动/超时等，可退避重试
+    RATE_LIMITED = "rate_limited"  # 被限流，按 retry_after 等待后重试
+    AUTH_EXPIRED = "auth_expired"  # 登录态/凭证失效，需人工处理
+    PERMANENT = "permanent"  # 配置错误/平台不支持等，重试无意义
+
+
+class JobStatus(str, Enum):
+    """队列任务状态"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
 # ============================================================
 # 请求模型
 # ============================================================
@@ -38,11 +58,10 @@ class PublishRequest(BaseModel):
     video_path: Optional[str] = Field(default=None, description="视频文件路径（视频类型时必填）")
 
     @computed_field
-    @property
+    @cached_property
     def content_fingerprint(self) -> str:
-        """内容指纹（标题+摘要 MD5），用于去重"""
-        raw = f"{self.title}:{self.content[:500]}"
-        return hashlib.md5(raw.encode()).hexdigest()
+        """内容指纹（标题+全文 BLAKE2b），用于去重；首次访问时计算"""
+        return content_fingerprint(self.title, self.content)
 
 
 # ============================================================
@@ -50,6 +69,21 @@ class PublishRequest(BaseModel):
 # ============================================================
 
 
+class PublishAttempt(BaseModel):
+    """单次发布尝试的耗时明细"""
+
+    attempt: int = Field(..., description="第几次尝试，从 1 开始")
+    status: PublishStatus
+    error_category: Optional[ErrorCategory] = None
+    error: Optional[str] = None
+    started_at: datetime
+    finished_at: datetime
+    duration_ms: float
+    phases: dict[str, float] = Field(
+        default_factory=dict, description="各阶段耗时（毫秒），如 token_fetch / render / bridge_call"
+    )
+
+
 class PlatformResult(BaseModel):
     """单平台发布结果"""
 
@@ -57,8 +91,12 @@ class PlatformResult(BaseModel):
     status: PublishStatus = PublishStatus.PENDING
     post_url: Optional[str] = None
     error: Optional[str] = None
+    error_category: Optional[ErrorCategory] = None
+    retry_after: Optional[float] = Field(default=None, description="限流时建议的等待秒数")
     retries: int = 0
+    next_attempt_at: Optional[datetime] = Field(default=None, description="retry_scheduled 时的下次重试时间")
     published_at: Optional[datetime] = None
+    attempts: list[PublishAttempt] = Field(default_factory=list, description="每次尝试的耗时明细")
 
 
 class PublishResponse(BaseModel):
@@ -67,6 +105,7 @@ class PublishResponse(BaseModel):
     task_id: str = Field(..., description="任务 ID")
     content_fingerprint: str = Field(..., description="内容指纹")
     results: list[PlatformResult] = Field(default_factory=list)
+    similar_tasks: list[str] = Field(default_factory=list, description="与本次内容近似重复的已有任务 ID")
     created_at: datetime = Field(default_factory=datetime.now)
 
 
@@ -7,12 +7,19 @@ from datetime import datetime
 from typing import Optional
 from uuid import uuid4
 
-from .config import PLATFORM_METHOD_MAP, ContentType, Platform, PublishMethod
+from .auth_cache import AuthStatusCache
+from .config import PLATFORM_METHOD_MAP, ContentType, Platform, PublishMethod, settings
+from .fingerprint import legacy_fingerprint
+from .idempotency import IdempotencyStore, compute_request_hash
+from .lifecycle import LifecycleManager
 from .models import (
     PLATFORM_DISPLAY_NAMES,
+    ErrorCategory,
+    JobStatus,
     PlatformInfo,
     PlatformListResponse,
     PlatformResult,
+    PublishAttempt,
     PublishRequest,
     PublishResponse,
     PublishStatus,
@@ -23,22 +30,28 @@ from .publishers.playwright_publisher import PlaywrightPublisher
 from .publishers.twitter_publisher import TwitterPublisher
 from .publishers.wechat_mp_publisher import WechatMPPublisher
 from .publishers.wechatsync_publisher import WechatsyncPublisher
-from .storage.database import (
+from .retention import RetentionManager
+from .retry_engine import RetryEngine
+from .scheduler import ConcurrencyScheduler
+from .storage.async_database import (
+    count_publish_attempts,
+    count_publish_jobs,
+    finish_publish_job,
+    get_article_content,
+    get_publish_attempts,
     get_publish_records,
-    get_session,
-    is_duplicate,
-    save_article,
-    save_publish_record,
-    update_publish_record_status,
-    get_existing_task_id,
-    get_publish_history,
+    get_publish_stats,
+    open_publish_task,
+    requeue_publish_records,
+    save_publish_attempts,
+    shutdown_executor,
 )
+from .storage.database import LATENCY_BUCKETS_MS, OpenedTask, PublishJob
+from .storage.write_buffer import StatusWriteBuffer
+from .worker_pool import WorkerPool
 
 logger = logging.getLogger(__name__)
 
-# 最大并发发布数
-MAX_CONCURRENCY = 3
-
 
 class PublisherHub:
     """
@@ -46,9 +59,15 @@ class PublisherHub:
 
     职责:
     1. 接收发布请求，路由到对应适配器
-    2. 并发控制（最多 3 个平台同时发布）
+    2. 并发控制（进程级调度器，按发布方式和平台分别限流）
     3. 状态追踪和结果聚合
     4. 内容指纹去重（数据库级持久化）
+    5. 异步模式：任务入库后由常驻 WorkerPool 执行
+    6. 认证状态缓存：各发布器并发探测，/platforms 直接读缓存
+    7. 持久化重试：进程内重试仍失败的平台按策略延迟重试，由 RetryEngine 到期重新入队
+    8. 生命周期：关闭时排空执行中任务，启动时恢复崩溃遗留的任务
+    9. 同步发布合并：同一内容的并发请求共享一次执行（single-flight）
+    10. 幂等键：携带 Idempotency-Key 的重复请求直接返回首次响应
     """
 
     def __init__(self) -> None:
@@ -63,135 +82,448 @@ class PublisherHub:
             Platform.TWITTER: TwitterPublisher(),
         }
 
+        self.scheduler = ConcurrencyScheduler()
+        self.worker_pool = WorkerPool(self)
+        self.auth_cache = AuthStatusCache(self._probe_auth)
+        self.status_buffer = StatusWriteBuffer()
+        self.retention = RetentionManager()
+        self.retry_engine = RetryEngine(on_enqueued=self.worker_pool.notify)
+        self.lifecycle = LifecycleManager(self)
+        self.idempotency = IdempotencyStore()
+        self._inflight: dict[str, asyncio.Task] = {}  # 内容指纹 → 执行中的同步发布
+
     async def publish(self, request: PublishRequest) -> PublishResponse:
         """
-        执行多平台发布。
+        执行多平台发布（同步模式，等待全部平台完成）。
 
-        1. 数据库级内容去重（重复时返回已有 task_id）
+        1. 单事务登记任务：数据库级内容去重（重复时返回已有 task_id）+ 发布记录 + 队列任务
         2. 路由到对应适配器
-        3. 并发发布（最多 MAX_CONCURRENCY 个）
+        3. 并发发布（受全局调度器限流）
         4. 结果持久化到数据库
+
+        同一内容正在发布时（如调用方超时重试），后到的请求等待首个请求执行完毕并返回同一结果，
+        而不是拿到中间状态；调用方断开也不会中断已开始的发布。
         """
+        self.lifecycle.admit()
         fingerprint = request.content_fingerprint
+        task = self._inflight.get(fingerprint)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            logger.info("合并并发的相同发布请求（指纹: %s）", fingerprint)
+        else:
+            task = asyncio.create_task(self._publish(request))
+            self._inflight[fingerprint] = task
+            task.add_done_callback(lambda t: self._forget_inflight(fingerprint, t))
+        return await asyncio.shield(task)
+
+    def _forget_inflight(self, fingerprint: str, task: asyncio.Task) -> None:
+        if self._inflight.get(fingerprint) is task:
+            del self._inflight[fingerprint]
+        if not task.cancelled():
+            task.exception()  # 所有等待者都已断开时避免 "exception was never retrieved" 告警
+
+    async def _publish(self, request: PublishRequest) -> PublishResponse:
+        # 同步模式同样落一条队列任务（直接标记为 running），便于统一追踪
+        opened = await self._open_task(request, job_status=JobStatus.RUNNING.value)
+        if opened.duplicate:
+            return await self._duplicate_response(request, opened.task_id)
+
+        task_id, record_ids, job_id = opened.task_id, opened.record_ids, opened.job_id
+        owner = self.lifecycle.owner
+        try:
+            async with self.lifecycle.track(job_id):
+                response = await self._execute(task_id, request, record_ids)
+        except Exception as e:
+            await finish_publish_job(job_id, JobStatus.FAILED.value, error=str(e), owner=owner)
+            raise
+        await finish_publish_job(job_id, JobStatus.DONE.value, owner=owner)
+        response.similar_tasks = self._similar_tasks(opened)
+        return response
 
-        # 数据库级去重：检查是否已发布过
-        if is_duplicate(fingerprint):
-            existing_task_id = get_existing_task_id(fingerprint)
-            if existing_task_id:
-                logger.warning("内容已发布过（指纹: %s, task: %s），返回已有记录", fingerprint, existing_task_id)
-                existing_status = await self.get_task_status(existing_task_id)
-                if existing_status:
-                    return PublishResponse(
-                        task_id=existing_task_id,
-                        content_fingerprint=fingerprint,
-                        results=existing_status.results,
-                        created_at=existing_status.created_at,
-                    )
-
-        task_id = uuid4().hex[:12]
+    async def enqueue(self, request: PublishRequest) -> PublishResponse:
+        """
+        异步模式：持久化任务后立即返回 task_id，由 WorkerPool 后台执行。
 
-        # 保存文章记录
-        save_article(
-            title=request.title,
-            fingerprint=fingerprint,
-            content_type=request.content_type.value if hasattr(request.content_type, 'value') else str(request.content_type),
-            tags=json.dumps(request.tags, ensure_ascii=False),
+        返回的各平台结果均为 pending，调用方通过 /status/{task_id} 轮询。
+        """
+        self.lifecycle.admit()
+        opened = await self._open_task(request, job_status=JobStatus.QUEUED.value)
+        if opened.duplicate:
+            return await self._duplicate_response(request, opened.task_id)
+
+        task_id = opened.task_id
+        self.worker_pool.notify()
+        logger.info(
+            "任务已入队 [%s] task=%s 平台=%s", request.title[:30], task_id, [p.value for p in request.platforms]
         )
 
-        response = PublishResponse(
+        return PublishResponse(
             task_id=task_id,
-            content_fingerprint=fingerprint,
-            results=[],
+            content_fingerprint=request.content_fingerprint,
+            results=[PlatformResult(platform=p, status=PublishStatus.PENDING) for p in request.platforms],
+            similar_tasks=self._similar_tasks(opened),
             created_at=datetime.now(),
         )
 
-        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    async def publish_idempotent(
+        self, request: PublishRequest, idempotency_key: str, async_mode: bool = False
+    ) -> PublishResponse:
+        """
+        按 Idempotency-Key 发布：键已保存时直接返回首次响应（不经过发布器），否则发布并保存响应。
+
+        同一键对应不同请求内容时抛出 IdempotencyKeyConflict；发布失败（异常）时不保存，调用方可用同一键重试。
+        """
+        request_hash = compute_request_hash(request, async_mode)
+        stored = await self.idempotency.get(idempotency_key, request_hash)
+        if stored is not None:
+            logger.info("幂等键命中，返回首次响应: key=%s task=%s", idempotency_key, stored.task_id)
+            return stored
+
+        response = await (self.enqueue(request) if async_mode else self.publish(request))
+        await self.idempotency.put(idempotency_key, request_hash, response)
+        return response
+
+    async def run_job(self, job: PublishJob) -> PublishResponse:
+        """
+        执行一条已认领的队列任务（WorkerPool 调用）。
+
+        租约过期后被重新认领的任务只执行仍未结束的平台，已完成或已安排重试的平台不会重复发布。
+        """
+        request = await self._load_request(job.payload)
+        record_ids = json.loads(job.record_ids)
+        statuses = {r.id: r.status for r in await get_publish_records(job.task_id)}
+        unfinished = (PublishStatus.PENDING.value, PublishStatus.PROCESSING.value)
+        remaining = [i for i, rid in enumerate(record_ids) if statuses.get(rid) in unfinished]
+        if len(remaining) < len(record_ids):
+            logger.info("任务 %s 部分平台已完成，仅执行剩余 %d 个平台", job.task_id, len(remaining))
+            request = request.model_copy(update={"platforms": [request.platforms[i] for i in remaining]})
+            record_ids = [record_ids[i] for i in remaining]
+        if not record_ids:
+            return PublishResponse(task_id=job.task_id, content_fingerprint=request.content_fingerprint)
+        # 重试任务的记录已有尝试，累计次数决定是否继续安排重试
+        prior_attempts = await count_publish_attempts(record_ids)
+        async with self.lifecycle.track(job.id):
+            return await self._execute(job.task_id, request, record_ids, prior_attempts)
+
+    async def _load_request(self, payload: str) -> PublishRequest:
+        """还原队列任务的发布请求（任务不携带正文，按文章指纹从正文存储读回）"""
+        data = json.loads(payload)
+        if "content" not in data:
+            content = await get_article_content(data["content_fingerprint"])
+            if content is None:
+                raise ValueError(f"找不到任务正文（指纹: {data['content_fingerprint']}）")
+            data["content"] = content
+        return PublishRequest.model_validate(data)
+
+    async def start(self) -> None:
+        """恢复中断的任务，启动后台 worker、重试调度、认证状态缓存和数据归档（FastAPI lifespan 与 MCP Server 调用）"""
+        await self.lifecycle.start()
+        await self.worker_pool.start()
+        await self.retry_engine.start()
+        await self.auth_cache.start()
+        await self.retention.start()
+
+    async def shutdown(self) -> None:
+        """
+        优雅关闭：停止接收新任务并排空执行中的任务（超时未完成的转为重试），
+        再停止后台 worker，释放各发布器的连接池和数据库线程池。
+        """
+        await self.retention.stop()
+        await self.retry_engine.stop()
+        await self.lifecycle.drain()
+        await self.lifecycle.stop()
+        await self.auth_cache.stop()
+        await self.worker_pool.stop()
+        await self.status_buffer.close()
+        for publisher in self._all_publishers():
+            await publisher.aclose()
+        shutdown_executor()
+
+    def _all_publishers(self) -> list[BasePublisher]:
+        """所有发布器实例（去重）"""
+        publishers = [p for p in self._publishers.values() if p] + list(self._api_publishers.values())
+        return list({id(p): p for p in publishers}.values())
+
+    async def get_queue_stats(self) -> dict:
+        """调度器和任务队列的实时深度"""
+        return {
+            "scheduler": self.scheduler.snapshot(),
+            "jobs": {
+                "queued": await count_publish_jobs(JobStatus.QUEUED.value),
+                "running": await count_publish_jobs(JobStatus.RUNNING.value),
+            },
+            "workers": {"running": self.worker_pool.running},
+        }
+
+    async def get_publish_stats(
+        self,
+        granularity: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        platform: Optional[str] = None,
+    ) -> dict:
+        """
+        基于汇总表的发布统计（不扫描 publish_records）。
+
+        返回每个时间区间 × 平台的状态计数、平均重试次数和平均耗时，
+        以及时间范围内各平台的成功率和耗时分位数（按直方图区间上界估算）。
+        """
+        # 写缓冲里的终态变更先落盘，统计才包含刚完成的任务
+        await self.status_buffer.flush()
+        rollups, histogram = await get_publish_stats(granularity=granularity, start=start, end=end, platform=platform)
+
+        def summarize(rows) -> dict:
+            statuses: dict[str, int] = {}
+            retries = latency_ms = 0.0
+            for row in rows:
+                statuses[row.status] = statuses.get(row.status, 0) + row.count
+                retries += row.retries
+                latency_ms += row.latency_ms
+            total = sum(statuses.values())
+            succeeded = sum(statuses.get(s.value, 0) for s in (PublishStatus.PUBLISHED, PublishStatus.DRAFT_SAVED))
+            return {
+                "total": total,
+                "statuses": statuses,
+                "success_rate": round(succeeded / total, 4) if total else None,
+                "avg_retries": round(retries / total, 2) if total else None,
+                "avg_latency_ms": round(latency_ms / total, 1) if total else None,
+            }
+
+        buckets: dict[tuple[datetime, str], list] = {}
+        by_platform: dict[str, list] = {}
+        for row in rollups:
+            buckets.setdefault((row.bucket_start, row.platform), []).append(row)
+            by_platform.setdefault(row.platform, []).append(row)
+
+        latency_counts: dict[str, dict[int, int]] = {}
+        for row in histogram:
+            counts = latency_counts.setdefault(row.platform, {})
+            counts[row.le_ms] = counts.get(row.le_ms, 0) + row.count
+
+        def percentile(counts: dict[int, int], q: float) -> Optional[int]:
+            total = sum(counts.values())
+            seen = 0
+            for le_ms in sorted(counts):
+                seen += counts[le_ms]
+                if seen >= q * total:
+                    return None if le_ms == LATENCY_BUCKETS_MS[-1] else le_ms
+            return None
+
+        platforms = {}
+        for name, rows in by_platform.items():
+            counts = latency_counts.get(name, {})
+            platforms[name] = {
+                **summarize(rows),
+                "latency_p50_ms": percentile(counts, 0.5),
+                "latency_p95_ms": percentile(counts, 0.95),
+                "latency_p99_ms": percentile(counts, 0.99),
+                "latency_histogram": {
+                    ("inf" if le_ms == LATENCY_BUCKETS_MS[-1] else str(le_ms)): n for le_ms, n in sorted(counts.items())
+                },
+            }
+
+        return {
+            "granularity": granularity,
+            "buckets": [
+                {"bucket_start": bucket_start.isoformat(), "platform": name, **summarize(rows)}
+                for (bucket_start, name), rows in sorted(buckets.items())
+            ],
+            "platforms": platforms,
+        }
+
+    async def _duplicate_response(self, request: PublishRequest, existing_task_id: str) -> PublishResponse:
+        """内容已发布过时返回已有任务的结果"""
+        fingerprint = request.content_fingerprint
+        logger.warning("内容已发布过（指纹: %s, task: %s），返回已有记录", fingerprint, existing_task_id)
+        existing_status = await self.get_task_status(existing_task_id)
+
+        return PublishResponse(
+            task_id=existing_task_id,
+            content_fingerprint=fingerprint,
+            results=existing_status.results if existing_status else [],
+            created_at=existing_status.created_at if existing_status else datetime.now(),
+        )
+
+    async def _open_task(self, request: PublishRequest, job_status: str) -> OpenedTask:
+        """
+        一个事务内完成去重、正文入库、文章 upsert、各平台 pending 发布记录和队列任务的写入。
+
+        重复内容由文章指纹唯一约束判定，两个相同请求并发时只有一个能创建任务；
+        升级前按旧版 MD5 指纹入库的文章同样视为重复。
+        近似重复（正文 SimHash 相近）按 near_duplicate_action 告警或拒绝（抛出 NearDuplicateContent）。
+        队列任务只记录请求元数据，正文按文章指纹引用 content_blobs。
+        """
+        action = settings.near_duplicate_action
+        opened = await open_publish_task(
+            task_id=uuid4().hex[:12],
+            title=request.title,
+            fingerprint=request.content_fingerprint,
+            platforms=[p.value for p in request.platforms],
+            content_type=request.content_type.value if hasattr(request.content_type, 'value') else str(request.content_type),
+            tags=json.dumps(request.tags, ensure_ascii=False),
+            job_payload=request.model_dump_json(exclude={"content"}),
+            job_status=job_status,
+            lease_owner=self.lifecycle.owner,
+            content=request.content,
+            cover_url=request.cover_url,
+            video_path=request.video_path,
+            draft_only=request.draft_only,
+            near_duplicate_distance=None if action == "off" else settings.near_duplicate_distance,
+            reject_near_duplicates=action == "reject",
+            legacy_fingerprint=legacy_fingerprint(request.title, request.content),
+        )
+        if opened.near_duplicates:
+            closest = opened.near_duplicates[0]
+            logger.warning(
+                "内容与已发布文章近似重复 [%s] 相似文章=%s task=%s 距离=%d",
+                request.title[:30],
+                closest.title[:30],
+                closest.task_id,
+                closest.distance,
+            )
+        return opened
+
+    @staticmethod
+    def _similar_tasks(opened: OpenedTask) -> list[str]:
+        return [d.task_id for d in opened.near_duplicates if d.task_id]
+
+    async def _execute(
+        self,
+        task_id: str,
+        request: PublishRequest,
+        record_ids: list[int],
+        prior_attempts: Optional[dict[int, int]] = None,
+    ) -> PublishResponse:
+        """
+        按发布器分组并发发布，并回写每条发布记录的最终状态。
 
-        async def publish_to_platform(platform: Platform) -> PlatformResult:
-            async with semaphore:
-                publisher = self._get_publisher(platform)
-                if not publisher:
-                    result = PlatformResult(
-                        platform=platform,
+        可重试的失败按平台策略记为 retry_scheduled（prior_attempts 为各记录此前的累计尝试次数）。
+        """
+        results: list[Optional[PlatformResult]] = [None] * len(request.platforms)
+        prior_attempts = prior_attempts or {}
+
+        async def publish_group(publisher: Optional[BasePublisher], indices: list[int]) -> None:
+            platforms = [request.platforms[i] for i in indices]
+            if not publisher:
+                for i in indices:
+                    results[i] = PlatformResult(
+                        platform=request.platforms[i],
                         status=PublishStatus.FAILED,
-                        error=f"没有可用的发布器处理平台: {platform.value}",
+                        error=f"没有可用的发布器处理平台: {request.platforms[i].value}",
+                        error_category=ErrorCategory.PERMANENT,
                     )
-                    save_publish_record(
-                        task_id=task_id,
-                        fingerprint=fingerprint,
-                        platform=platform.value,
-                        status=result.status.value,
-                        error=result.error,
+                    self.status_buffer.put(
+                        record_id=record_ids[i],
+                        status=results[i].status.value,
+                        error=results[i].error,
                     )
-                    return result
+                return
 
-                logger.info("开始发布 [%s] → %s", request.title[:30], platform.value)
+            logger.info("开始发布 [%s] → %s", request.title[:30], ", ".join(p.value for p in platforms))
 
-                # 先写入 processing 状态
-                record_id = save_publish_record(
-                    task_id=task_id,
-                    fingerprint=fingerprint,
-                    platform=platform.value,
-                    status=PublishStatus.PROCESSING.value,
-                )
+            # 先写入 processing 状态（经写缓冲与其他任务的变更合并提交）
+            for i in indices:
+                self.status_buffer.put(record_id=record_ids[i], status=PublishStatus.PROCESSING.value)
 
-                result = await publisher.publish_with_retry(request, platform)
+            # 调度器名额只在实际调用发布接口时持有，限流等待期间不占用
+            group_results = await publisher.publish_many_with_retry(
+                request, platforms, slot=lambda batch: self.scheduler.slot(*batch)
+            )
 
-                # 更新最终状态
-                update_publish_record_status(
-                    record_id=record_id,
+            # 更新最终状态
+            for i, result in zip(indices, group_results):
+                results[i] = result
+                if result.error_category == ErrorCategory.AUTH_EXPIRED:
+                    await self.auth_cache.mark(result.platform, False)
+                result.retries += prior_attempts.get(record_ids[i], 0)
+                result.next_attempt_at = self.retry_engine.next_attempt_at(result, attempts=result.retries + 1)
+                if result.next_attempt_at:
+                    result.status = PublishStatus.RETRY_SCHEDULED
+                self.status_buffer.put(
+                    record_id=record_ids[i],
                     status=result.status.value,
                     post_url=result.post_url,
                     error=result.error,
                     retries=result.retries,
+                    next_attempt_at=result.next_attempt_at,
                 )
-
                 logger.info(
                     "发布完成 [%s] → %s: %s",
                     request.title[:30],
-                    platform.value,
+                    result.platform.value,
                     result.status.value,
                 )
-                return result
 
-        tasks = [publish_to_platform(p) for p in request.platforms]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+            # 每次尝试的耗时明细（一次批量写入）
+            await save_publish_attempts(
+                [
+                    {
+                        "record_id": record_ids[i],
+                        "task_id": task_id,
+                        "platform": result.platform.value,
+                        **attempt.model_dump(mode="python"),
+                        "status": attempt.status.value,
+                        "error_category": attempt.error_category.value if attempt.error_category else None,
+                    }
+                    for i, result in zip(indices, group_results)
+                    for attempt in result.attempts
+                ]
+            )
+
+        groups = self._group_by_publisher(request.platforms)
+        outcomes = await asyncio.gather(*(publish_group(p, idx) for p, idx in groups), return_exceptions=True)
 
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                error_result = PlatformResult(
+        for (_, indices), outcome in zip(groups, outcomes):
+            if not isinstance(outcome, Exception):
+                continue
+            for i in indices:
+                if results[i] is not None:
+                    continue
+                results[i] = PlatformResult(
                     platform=request.platforms[i],
                     status=PublishStatus.FAILED,
-                    error=str(result),
+                    error=str(outcome),
                 )
-                save_publish_record(
-                    task_id=task_id,
-                    fingerprint=fingerprint,
-                    platform=request.platforms[i].value,
+                self.status_buffer.put(
+                    record_id=record_ids[i],
                     status=PublishStatus.FAILED.value,
-                    error=str(result),
+                    error=str(outcome),
                 )
-                response.results.append(error_result)
-            else:
-                response.results.append(result)
 
-        return response
+        # 最终状态落盘后再返回（与同时完成的其他任务共享一次提交）
+        await self.status_buffer.sync()
+
+        return PublishResponse(
+            task_id=task_id,
+            content_fingerprint=request.content_fingerprint,
+            results=results,
+            created_at=datetime.now(),
+        )
+
+    def _group_by_publisher(self, platforms: list[Platform]) -> list[tuple[Optional[BasePublisher], list[int]]]:
+        """
+        按发布器分组平台下标。
+
+        支持批量的发布器（如 Wechatsync）同一请求的所有平台合为一组，一次调用完成；
+        其余平台各自一组。
+        """
+        groups: list[tuple[Optional[BasePublisher], list[int]]] = []
+        batches: dict[int, tuple[BasePublisher, list[int]]] = {}
+        for i, platform in enumerate(platforms):
+            publisher = self._get_publisher(platform)
+            if publisher and publisher.SUPPORTS_BATCH:
+                batches.setdefault(id(publisher), (publisher, []))[1].append(i)
+            else:
+                groups.append((publisher, [i]))
+        groups.extend(batches.values())
+        return groups
 
     async def get_platforms(self) -> PlatformListResponse:
-        """获取所有支持的平台列表和认证状态"""
+        """获取所有支持的平台列表和认证状态（认证状态来自缓存）"""
+        auth_status = await self.auth_cache.get_many(list(Platform))
         platforms: list[PlatformInfo] = []
 
         for platform in Platform:
             method = PLATFORM_METHOD_MAP.get(platform)
-            publisher = self._get_publisher(platform)
-
-            is_authed = False
-            if publisher:
-                try:
-                    is_authed = await publisher.check_auth(platform)
-                except Exception:
-                    pass
-
             content_types = self._get_platform_content_types(platform)
 
             platforms.append(
@@ -199,34 +531,83 @@ class PublisherHub:
                     platform=platform,
                     display_name=PLATFORM_DISPLAY_NAMES.get(platform, platform.value),
                     publish_method=method.value if method else "unknown",
-                    is_authenticated=is_authed,
+                    is_authenticated=auth_status[platform],
                     content_types=content_types,
                 )
             )
 
         return PlatformListResponse(platforms=platforms, total=len(platforms))
 
+    async def check_auth(self, platform: Platform, refresh: bool = False) -> bool:
+        """查询单个平台认证状态，refresh=True 时跳过缓存立即探测"""
+        if refresh:
+            return (await self.auth_cache.refresh([platform]))[platform]
+        return await self.auth_cache.get(platform)
+
+    async def _probe_auth(self, platforms: list[Platform]) -> dict[Platform, Optional[bool]]:
+        """按发布器分组并发探测认证状态，每个发布器一次 check_auth_many 调用（探测失败为未知）"""
+        results: dict[Platform, Optional[bool]] = {p: False for p in platforms}
+        groups: dict[int, tuple[BasePublisher, list[Platform]]] = {}
+        for platform in platforms:
+            publisher = self._get_publisher(platform)
+            if publisher:
+                groups.setdefault(id(publisher), (publisher, []))[1].append(platform)
+
+        outcomes = await asyncio.gather(
+            *(publisher.check_auth_many(group) for publisher, group in groups.values()),
+            return_exceptions=True,
+        )
+        for (publisher, group), outcome in zip(groups.values(), outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("%s 认证探测失败: %s", type(publisher).__name__, outcome)
+                results.update({p: None for p in group})
+                continue
+            results.update({p: outcome.get(p) for p in group})
+        return results
+
     async def get_task_status(self, task_id: str) -> Optional[TaskStatusResponse]:
-        """从数据库查询任务状态"""
-        records = get_publish_records(task_id)
+        """从数据库查询任务状态（先提交写缓冲，保证读到最新状态）"""
+        await self.status_buffer.flush()
+        records = await get_publish_records(task_id)
         if not records:
             return None
 
+        attempts_by_record: dict[int, list[PublishAttempt]] = {}
+        for a in await get_publish_attempts(task_id):
+            attempts_by_record.setdefault(a.record_id, []).append(
+                PublishAttempt(
+                    attempt=a.attempt,
+                    status=PublishStatus(a.status),
+                    error_category=ErrorCategory(a.error_category) if a.error_category else None,
+                    error=a.error,
+                    started_at=a.started_at,
+                    finished_at=a.finished_at,
+                    duration_ms=a.duration_ms,
+                    phases=json.loads(a.phases or "{}"),
+                )
+            )
+
         results = []
         for r in records:
+            attempts = attempts_by_record.get(r.id, [])
             results.append(
                 PlatformResult(
                     platform=Platform(r.platform),
                     status=PublishStatus(r.status),
                     post_url=r.post_url,
                     error=r.error,
+                    error_category=attempts[-1].error_category if attempts else None,
                     retries=r.retries,
+                    next_attempt_at=r.next_attempt_at,
+                    attempts=attempts,
                 )
             )
 
         all_statuses = [r.status for r in results]
         if all(s == PublishStatus.PUBLISHED for s in all_statuses):
             overall_status = PublishStatus.PUBLISHED
+        elif all(s == PublishStatus.PENDING for s in all_statuses):
+            overall_status = PublishStatus.PENDING
         elif any(s == PublishStatus.PROCESSING for s in all_statuses):
             overall_status = PublishStatus.PROCESSING
         elif all(s == PublishStatus.FAILED for s in all_statuses):
@@ -246,14 +627,22 @@ class PublisherHub:
         )
 
     async def retry_task(self, task_id: str, platform: Optional[str] = None) -> Optional[PublishResponse]:
-        """重试失败的发布任务"""
-        records = get_publish_records(task_id)
+        """
+        立即重试失败（或已安排延迟重试）的发布记录。
+
+        记录重置为 pending 并作为新的队列任务入队，沿用原 task_id 和发布记录；
+        正文从正文存储读回，调用方无需重新提交内容。
+        """
+        self.lifecycle.admit()
+        await self.status_buffer.flush()
+        records = await get_publish_records(task_id)
         if not records:
             return None
 
+        retryable = (PublishStatus.FAILED.value, PublishStatus.RETRY_SCHEDULED.value)
         failed_records = [
             r for r in records
-            if r.status == PublishStatus.FAILED.value
+            if r.status in retryable
             and (platform is None or r.platform == platform)
         ]
 
@@ -261,22 +650,20 @@ class PublisherHub:
             logger.info("任务 %s 没有需要重试的失败记录", task_id)
             return None
 
-        fingerprint = failed_records[0].article_fingerprint
-        # 获取原始文章信息用于重新发布
-        from .storage.database import get_article_by_fingerprint
-        article = get_article_by_fingerprint(fingerprint)
-        if not article:
-            logger.error("找不到文章记录: %s", fingerprint)
+        job_id = await requeue_publish_records(task_id, [r.id for r in failed_records])
+        if job_id is None:
             return None
+        self.worker_pool.notify()
 
         retry_platforms = [Platform(r.platform) for r in failed_records]
         logger.info("重试任务 %s，平台: %s", task_id, [p.value for p in retry_platforms])
 
-        # 标记为 processing
-        for r in failed_records:
-            update_publish_record_status(r.id, PublishStatus.PROCESSING.value)
-
-        return task_id, retry_platforms, fingerprint
+        return PublishResponse(
+            task_id=task_id,
+            content_fingerprint=failed_records[0].article_fingerprint,
+            results=[PlatformResult(platform=p, status=PublishStatus.PENDING) for p in retry_platforms],
+            created_at=datetime.now(),
+        )
 
     def _get_publisher(self, platform: Platform) -> Optional[BasePublisher]:
         """根据平台获取对应的发布器"""
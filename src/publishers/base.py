@@ -2,10 +2,20 @@
 
 import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager, nullcontext
+from datetime import datetime
+from typing import Optional
 
-from ..config import Platform
-from ..models import PlatformResult, PublishRequest, PublishStatus
+import httpx
+
+from ..config import Platform, settings
+from ..models import ErrorCategory, PlatformResult, PublishAttempt, PublishRequest, PublishStatus
+from ..rate_limiter import RateLimitExceeded, rate_limiter
+from ..timing import collect_phases, phase
+from .http_client import create_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +34,13 @@ class BasePublisher(ABC):
     BASE_RETRY_DELAY = 1.0  # 秒
     MAX_RETRY_DELAY = 32.0  # 秒
 
+    # 是否支持一次调用发布到多个平台（PublisherHub 据此合并同一请求的平台）
+    SUPPORTS_BATCH = False
+
+    # 长连接客户端（懒加载，见 _http_client）
+    _client: Optional[httpx.AsyncClient] = None
+    _client_loop: Optional[asyncio.AbstractEventLoop] = None
+
     @abstractmethod
     async def publish(self, request: PublishRequest, platform: Platform) -> PlatformResult:
         """
@@ -39,7 +56,7 @@ class BasePublisher(ABC):
         ...
 
     @abstractmethod
-    async def check_auth(self, platform: Platform) -> bool:
+    async def check_auth(self, platform: Platform) -> Optional[bool]:
         """
         检查指定平台的认证状态。
 
@@ -47,49 +64,219 @@ class BasePublisher(ABC):
             platform: 目标平台
 
         Returns:
-            bool: 是否已认证
+            bool: 是否已认证；无法确认时（限流、5xx、网络错误）返回 None
         """
         ...
 
+    async def check_auth_many(self, platforms: list[Platform]) -> dict[Platform, Optional[bool]]:
+        """
+        批量检查认证状态。
+
+        默认并发调用 check_auth()，探测异常视为未知（None）；
+        能一次查询所有平台的发布器（如 Wechatsync）可覆盖为单次调用。
+        """
+        outcomes = await asyncio.gather(*(self.check_auth(p) for p in platforms), return_exceptions=True)
+        return {p: None if isinstance(outcome, Exception) else outcome for p, outcome in zip(platforms, outcomes)}
+
     @abstractmethod
     def get_supported_platforms(self) -> list[Platform]:
         """返回此发布器支持的平台列表"""
         ...
 
+    def _http_client(self) -> httpx.AsyncClient:
+        """
+        获取发布器自有的连接池客户端。
+
+        首次使用时创建并复用 TCP/TLS 连接；客户端绑定创建时的事件循环，循环切换后重建。
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = create_http_client()
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """释放发布器持有的连接等资源（应用关闭时调用）"""
+        client, self._client = self._client, None
+        if client is not None and not client.is_closed and self._client_loop is asyncio.get_running_loop():
+            await client.aclose()
+
+    async def publish_many(self, request: PublishRequest, platforms: list[Platform]) -> list[PlatformResult]:
+        """
+        一次发布到多个平台，返回与 platforms 顺序一致的结果。
+
+        默认逐个平台并发调用 publish()；支持批量接口的发布器（SUPPORTS_BATCH=True）可覆盖为单次调用。
+        """
+        return list(await asyncio.gather(*(self.publish(request, p) for p in platforms)))
+
     async def publish_with_retry(self, request: PublishRequest, platform: Platform) -> PlatformResult:
+        """带指数退避重试的单平台发布，见 publish_many_with_retry()"""
+        results = await self.publish_many_with_retry(request, [platform])
+        return results[0]
+
+    async def publish_many_with_retry(
+        self,
+        request: PublishRequest,
+        platforms: list[Platform],
+        slot: Optional[Callable[[list[Platform]], AbstractAsyncContextManager]] = None,
+    ) -> list[PlatformResult]:
         """
-        带指数退避重试的发布方法。
+        带指数退避重试的批量发布方法。
+
+        slot 为调度器名额（如 ConcurrencyScheduler.slot），只在实际调用发布接口时持有：
+        限流等待和重试退避期间不占用名额，被限流的平台不会拖住同组其他平台。
+
+        重试策略: delay = min(base * 2^attempt, max_delay)，每轮只重试仍未成功的平台。
+        每次尝试前先向限流器申请许可，等待过久或配额用尽时直接返回失败。
+        按失败类型决定是否重试:
+        - permanent / auth_expired: 立即返回，不再重试
+        - rate_limited: 按 retry_after 等待（超过限流等待上限则立即返回）
+        - transient（含未分类错误和异常）: 指数退避重试
 
-        重试策略: delay = min(base * 2^attempt, max_delay)
+        每次尝试的起止时间和各阶段耗时记录在结果的 attempts 中。
         """
-        last_error: str | None = None
+        final: dict[int, PlatformResult] = {}
+        last_errors: dict[int, tuple[str | None, ErrorCategory]] = {}
+        attempts: dict[int, list[PublishAttempt]] = {i: [] for i in range(len(platforms))}
+        pending = list(range(len(platforms)))
 
         for attempt in range(self.MAX_RETRIES + 1):
-            try:
-                result = await self.publish(request, platform)
-                if result.status in (PublishStatus.PUBLISHED, PublishStatus.DRAFT_SAVED):
-                    result.retries = attempt
-                    return result
-                last_error = result.error
-            except Exception as e:
-                last_error = str(e)
-                logger.warning(
-                    "发布失败 [%s] 平台=%s 尝试=%d/%d 错误=%s",
-                    request.title[:30],
-                    platform.value,
-                    attempt + 1,
-                    self.MAX_RETRIES + 1,
-                    last_error,
+            started_at = datetime.now()
+            started = time.perf_counter()
+            allowed: list[int] = []
+            limiter_phases: dict[int, dict[str, float]] = {}
+            for i in pending:
+                platform = platforms[i]
+                try:
+                    with collect_phases() as limiter_phases[i], phase("rate_limit_wait"):
+                        await rate_limiter.acquire(platform)
+                    allowed.append(i)
+                except RateLimitExceeded as e:
+                    logger.warning("发布被限流 [%s] 平台=%s: %s", request.title[:30], platform.value, e)
+                    final[i] = PlatformResult(
+                        platform=platform,
+                        status=PublishStatus.FAILED,
+                        error=str(e),
+                        error_category=ErrorCategory.RATE_LIMITED,
+                        retry_after=e.retry_after,
+                        retries=attempt,
+                    )
+                    attempts[i].append(self._attempt_record(attempt, final[i], started_at, started, limiter_phases[i]))
+
+            if not allowed:
+                pending = []
+                break
+
+            batch = [platforms[i] for i in allowed]
+            with collect_phases() as publish_phases:
+                try:
+                    async with slot(batch) if slot else nullcontext():
+                        outcomes: list[PlatformResult | Exception] = list(await self.publish_many(request, batch))
+                except Exception as e:
+                    outcomes = [e] * len(allowed)
+            for i, outcome in zip(allowed, outcomes):
+                attempts[i].append(
+                    self._attempt_record(attempt, outcome, started_at, started, {**limiter_phases[i], **publish_phases})
                 )
 
+            pending = []
+            retry_hints: list[float] = []
+            for i, outcome in zip(allowed, outcomes):
+                platform = platforms[i]
+                if isinstance(outcome, Exception):
+                    last_errors[i] = (str(outcome), ErrorCategory.TRANSIENT)
+                    logger.warning(
+                        "发布失败 [%s] 平台=%s 尝试=%d/%d 错误=%s",
+                        request.title[:30],
+                        platform.value,
+                        attempt + 1,
+                        self.MAX_RETRIES + 1,
+                        outcome,
+                    )
+                    pending.append(i)
+                    continue
+
+                if outcome.status in (PublishStatus.PUBLISHED, PublishStatus.DRAFT_SAVED):
+                    outcome.retries = attempt
+                    final[i] = outcome
+                    try:
+                        await rate_limiter.record_usage(platform)
+                    except Exception:
+                        # 内容已发出，配额记账失败只记录日志，不能把成功结果改判为失败（否则重试会重复发布）
+                        logger.exception("记录配额用量失败 [%s] 平台=%s", request.title[:30], platform.value)
+                    continue
+
+                category = outcome.error_category or ErrorCategory.TRANSIENT
+                last_errors[i] = (outcome.error, category)
+
+                if category in (ErrorCategory.PERMANENT, ErrorCategory.AUTH_EXPIRED):
+                    logger.warning(
+                        "发布失败且不可重试 [%s] 平台=%s 类型=%s 错误=%s",
+                        request.title[:30],
+                        platform.value,
+                        category.value,
+                        outcome.error,
+                    )
+                    outcome.error_category = category
+                    outcome.retries = attempt
+                    final[i] = outcome
+                    continue
+
+                if category == ErrorCategory.RATE_LIMITED and outcome.retry_after is not None:
+                    if outcome.retry_after > settings.rate_limit_max_wait:
+                        outcome.retries = attempt
+                        final[i] = outcome
+                        continue
+                    retry_hints.append(outcome.retry_after)
+
+                pending.append(i)
+
+            if not pending:
+                break
+
             if attempt < self.MAX_RETRIES:
-                delay = min(self.BASE_RETRY_DELAY * (2**attempt), self.MAX_RETRY_DELAY)
+                backoff = min(self.BASE_RETRY_DELAY * (2**attempt), self.MAX_RETRY_DELAY)
+                delay = max(retry_hints) if retry_hints else backoff
                 logger.info("等待 %.1f 秒后重试...", delay)
                 await asyncio.sleep(delay)
 
-        return PlatformResult(
-            platform=platform,
-            status=PublishStatus.FAILED,
-            error=f"达到最大重试次数({self.MAX_RETRIES}): {last_error}",
-            retries=self.MAX_RETRIES,
+        for i in pending:
+            last_error, last_category = last_errors.get(i, (None, ErrorCategory.TRANSIENT))
+            final[i] = PlatformResult(
+                platform=platforms[i],
+                status=PublishStatus.FAILED,
+                error=f"达到最大重试次数({self.MAX_RETRIES}): {last_error}",
+                error_category=last_category,
+                retries=self.MAX_RETRIES,
+            )
+
+        for i, result in final.items():
+            result.attempts = attempts[i]
+        return [final[i] for i in range(len(platforms))]
+
+    @staticmethod
+    def _attempt_record(
+        attempt: int,
+        outcome: PlatformResult | Exception,
+        started_at: datetime,
+        started: float,
+        phases: dict[str, float],
+    ) -> PublishAttempt:
+        """把一次尝试的结果整理为 PublishAttempt"""
+        if isinstance(outcome, Exception):
+            status, category, error = PublishStatus.FAILED, ErrorCategory.TRANSIENT, str(outcome)
+        else:
+            status, error = outcome.status, outcome.error
+            category = outcome.error_category
+            if status == PublishStatus.FAILED and category is None:
+                category = ErrorCategory.TRANSIENT
+        return PublishAttempt(
+            attempt=attempt + 1,
+            status=status,
+            error_category=category,
+            error=error,
+            started_at=started_at,
+            finished_at=datetime.now(),
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+            phases=phases,
         )
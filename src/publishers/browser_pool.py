@@ -0,0 +1,208 @@
+"""BrowserPool - 常驻 Chromium 浏览器池 + 按平台复用的 BrowserContext"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+from ..config import Platform, settings
+from ..timing import phase
+
+logger = logging.getLogger(__name__)
+
+# 与原先每次新建 context 时保持一致的浏览器指纹
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1280, "height": 720},
+    "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+}
+
+
+class _ContextEntry:
+    """某个平台当前使用的 BrowserContext 及其使用次数"""
+
+    def __init__(self, context: Any, browser_index: int) -> None:
+        self.context = context
+        self.browser_index = browser_index
+        self.uses = 0
+        self.active = 0  # 当前借出的页面数，归零前不关闭 context
+        self.broken = False
+        self.closed = False
+
+
+class BrowserPool:
+    """
+    Playwright 浏览器池。
+
+    - 懒启动最多 size 个 Chromium，进程内常驻，发布/重试不再反复启动浏览器
+    - 每个平台一个 BrowserContext，创建时加载该平台的 Cookie（storage_state），后续发布复用
+    - context 使用次数达到 max_context_uses、发布抛异常或浏览器断开时回收重建：
+      立即不再借出，等同一 context 上借出的页面全部归还后再关闭（平台并发大于 1 时不打断其他发布）
+    - close() 在应用关闭时释放所有浏览器
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_context_uses: Optional[int] = None,
+        headless: Optional[bool] = None,
+        slow_mo: Optional[int] = None,
+    ) -> None:
+        self._size = max(1, size or settings.playwright_pool_size)
+        self._max_context_uses = max_context_uses or settings.playwright_context_max_uses
+        self._headless = settings.playwright_headless if headless is None else headless
+        self._slow_mo = settings.playwright_slow_mo if slow_mo is None else slow_mo
+
+        self._playwright: Any = None
+        self._browsers: list[Any] = []
+        self._contexts: dict[Platform, _ContextEntry] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def stats(self) -> dict:
+        """浏览器/context 使用情况"""
+        return {
+            "browsers": len(self._browsers),
+            "contexts": {p.value: e.uses for p, e in self._contexts.items()},
+        }
+
+    @asynccontextmanager
+    async def page(self, platform: Platform, storage_state_path: Path) -> AsyncIterator[Any]:
+        """
+        借出一个平台页面。
+
+        正常结束时把最新 Cookie 写回 storage_state_path；页面总会被关闭。
+        """
+        with phase("browser_acquire"):
+            entry = await self._acquire_context(platform, storage_state_path)
+            try:
+                page = await entry.context.new_page()
+            except BaseException:
+                entry.broken = True
+                await self._release(platform, entry)
+                raise
+        try:
+            yield page
+            await entry.context.storage_state(path=str(storage_state_path))
+        except BaseException:
+            entry.broken = True
+            raise
+        finally:
+            try:
+                await page.close()
+            except Exception:
+                entry.broken = True
+            entry.uses += 1
+            await self._release(platform, entry)
+
+    async def close(self) -> None:
+        """关闭所有 context、浏览器和 playwright 驱动"""
+        if self._loop is not None and self._loop is not asyncio.get_running_loop():
+            self._reset()
+            return
+
+        for entry in list(self._contexts.values()):
+            await self._close_quietly(entry.context)
+        for browser in self._browsers:
+            await self._close_quietly(browser)
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug("停止 playwright 失败: %s", e)
+        if self._browsers:
+            logger.info("浏览器池已关闭: %d 个浏览器", len(self._browsers))
+        self._reset()
+
+    def _reset(self) -> None:
+        self._playwright = None
+        self._browsers = []
+        self._contexts = {}
+        self._lock = None
+        self._loop = None
+
+    def _ensure_loop(self) -> asyncio.Lock:
+        """浏览器对象绑定创建时的事件循环，循环切换后丢弃旧状态"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._reset()
+            self._loop = loop
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _acquire_context(self, platform: Platform, storage_state_path: Path) -> _ContextEntry:
+        async with self._ensure_loop():
+            entry = self._contexts.get(platform)
+            if entry and not self._should_retire(entry):
+                entry.active += 1
+                return entry
+            if entry:
+                await self._retire(platform, entry)
+
+            index = await self._pick_browser()
+            context = await self._browsers[index].new_context(
+                storage_state=str(storage_state_path) if storage_state_path.exists() else None,
+                **CONTEXT_OPTIONS,
+            )
+            entry = _ContextEntry(context, index)
+            entry.active = 1
+            self._contexts[platform] = entry
+            logger.info("创建浏览器上下文 [%s] browser=%d", platform.value, index)
+            return entry
+
+    async def _pick_browser(self) -> int:
+        """选择承载 context 最少的浏览器，未满 size 时启动新浏览器，已断开的重新启动"""
+        for index, browser in enumerate(self._browsers):
+            if not browser.is_connected():
+                logger.warning("浏览器 %d 已断开，重新启动", index)
+                for platform, entry in list(self._contexts.items()):
+                    if entry.browser_index == index:
+                        del self._contexts[platform]
+                self._browsers[index] = await self._launch_browser()
+
+        if len(self._browsers) < self._size:
+            self._browsers.append(await self._launch_browser())
+            return len(self._browsers) - 1
+
+        load = [0] * len(self._browsers)
+        for entry in self._contexts.values():
+            load[entry.browser_index] += 1
+        return load.index(min(load))
+
+    async def _launch_browser(self) -> Any:
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+        logger.info("启动 Chromium（headless=%s）", self._headless)
+        return await self._playwright.chromium.launch(headless=self._headless, slow_mo=self._slow_mo)
+
+    def _is_connected(self, index: int) -> bool:
+        return index < len(self._browsers) and self._browsers[index].is_connected()
+
+    def _should_retire(self, entry: _ContextEntry) -> bool:
+        return entry.broken or entry.uses >= self._max_context_uses or not self._is_connected(entry.browser_index)
+
+    async def _release(self, platform: Platform, entry: _ContextEntry) -> None:
+        """归还页面：需要回收的 context 不再借出，最后一个页面归还时关闭"""
+        async with self._ensure_loop():
+            entry.active -= 1
+            if self._should_retire(entry) or self._contexts.get(platform) is not entry:
+                await self._retire(platform, entry)
+
+    async def _retire(self, platform: Platform, entry: _ContextEntry) -> None:
+        """摘下 context（后续借出新建），仍有页面借出时延后到最后一个页面归还再关闭（调用方持有锁）"""
+        if self._contexts.get(platform) is entry:
+            logger.info("回收浏览器上下文 [%s] 已使用 %d 次", platform.value, entry.uses)
+            del self._contexts[platform]
+        if entry.active <= 0 and not entry.closed:
+            entry.closed = True
+            await self._close_quietly(entry.context)
+
+    @staticmethod
+    async def _close_quietly(obj: Any) -> None:
+        try:
+            await obj.close()
+        except Exception as e:
+            logger.debug("关闭浏览器对象失败: %s", e)
@@ -0,0 +1,35 @@
+"""共享 HTTP 客户端工厂 - 连接池 + keep-alive（可用时启用 HTTP/2）"""
+
+import importlib.util
+import logging
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 依赖 h2 包（httpx[http2]），未安装时回退到 HTTP/1.1 keep-alive
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def create_http_client(timeout: float = 30.0) -> httpx.AsyncClient:
+    """
+    创建长连接客户端。
+
+    每个发布器只访问固定的一个（或少数几个）域名，因此每个发布器一个客户端
+    即相当于按域名划分连接池，max_connections 就是该域名的连接上限。
+    """
+    http2 = settings.http2_enabled and HTTP2_AVAILABLE
+    if settings.http2_enabled and not HTTP2_AVAILABLE:
+        logger.debug("未安装 h2，HTTP 客户端使用 HTTP/1.1")
+
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=settings.http_pool_max_connections,
+            max_keepalive_connections=settings.http_pool_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+    )
@@ -5,11 +5,14 @@ import logging
 import random
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+
+from pydantic import BaseModel
 
 from ..config import Platform, settings
-from ..models import PlatformResult, PublishRequest, PublishStatus
+from ..models import PLATFORM_DISPLAY_NAMES, ErrorCategory, PlatformResult, PublishRequest, PublishStatus
+from ..timing import phase
 from .base import BasePublisher
+from .browser_pool import BrowserPool
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,43 @@ PLATFORM_URLS: dict[Platform, str] = {
     Platform.KUAISHOU: "https://cp.kuaishou.com/article/publish/video",
 }
 
+# 视频/图片上传完成的页面标志（出现即视为上传结束）
+UPLOAD_COMPLETE_SELECTORS: dict[Platform, str] = {
+    Platform.XIAOHONGSHU: 'text=/重新上传|上传成功/',
+    Platform.DOUYIN: 'text=/重新上传|上传完成/',
+    Platform.BILIBILI_VIDEO: 'text=/上传完成|更换视频/',
+    Platform.YOUTUBE: 'text=/Checks complete|Upload complete|上传完毕|检查完毕/',
+}
+
+# 点击发布后平台调用的发布接口（拦截到 2xx 响应即视为发布成功）
+PUBLISH_API_PATTERNS: dict[Platform, str] = {
+    Platform.XIAOHONGSHU: "/web_api/sns/v2/note",
+    Platform.DOUYIN: "/web/api/media/aweme/create",
+    Platform.BILIBILI_VIDEO: "/x/vu/web/add",
+}
+
+
+class HumanizationProfile(BaseModel):
+    """模拟人工操作的节奏"""
+
+    step_delay: tuple[float, float]  # 主要步骤之间的随机停顿（秒）
+    input_delay: tuple[float, float]  # 连续输入（如逐个标签）之间的停顿（秒）
+    slow_mo: int  # Playwright slow_mo（毫秒）
+
+
+HUMANIZATION_PROFILES: dict[str, HumanizationProfile] = {
+    # 默认：接近真人操作，适合新账号/风控严格的平台
+    "human": HumanizationProfile(step_delay=(2.0, 5.0), input_delay=(0.3, 1.5), slow_mo=settings.playwright_slow_mo),
+    # 快速：可信账号使用，保留少量抖动
+    "fast": HumanizationProfile(step_delay=(0.2, 0.6), input_delay=(0.05, 0.2), slow_mo=0),
+    # 无延迟：仅用于调试
+    "none": HumanizationProfile(step_delay=(0.0, 0.0), input_delay=(0.0, 0.0), slow_mo=0),
+}
+
+
+class PublishNotConfirmed(Exception):
+    """点击发布后未能确认平台已接收"""
+
 
 class PlaywrightPublisher(BasePublisher):
     """
@@ -37,13 +77,22 @@ class PlaywrightPublisher(BasePublisher):
 
     特点:
     - Cookie 持久化管理，避免频繁登录
-    - 随机延迟模拟人工操作
+    - 浏览器池常驻，按平台复用 BrowserContext
+    - 随机延迟模拟人工操作（节奏由 humanization profile 决定）
+    - 上传完成/发布成功由页面元素和接口响应驱动，而非固定等待
     - 支持 headless 模式
     """
 
     def __init__(self) -> None:
+        self._profile = HUMANIZATION_PROFILES.get(settings.playwright_humanize_profile, HUMANIZATION_PROFILES["human"])
         self._headless = settings.playwright_headless
-        self._slow_mo = settings.playwright_slow_mo
+        self._slow_mo = self._profile.slow_mo
+        self._pool = BrowserPool(headless=self._headless, slow_mo=self._slow_mo)
+
+    async def aclose(self) -> None:
+        """关闭浏览器池"""
+        await super().aclose()
+        await self._pool.close()
 
     def get_supported_platforms(self) -> list[Platform]:
         return list(PLATFORM_URLS.keys())
@@ -56,12 +105,13 @@ class PlaywrightPublisher(BasePublisher):
     async def publish(self, request: PublishRequest, platform: Platform) -> PlatformResult:
         """通过 Playwright 自动化发布内容"""
         try:
-            from playwright.async_api import async_playwright
+            import playwright.async_api  # noqa: F401
         except ImportError:
             return PlatformResult(
                 platform=platform,
                 status=PublishStatus.FAILED,
                 error="playwright 未安装，请运行: pip install playwright && playwright install chromium",
+                error_category=ErrorCategory.PERMANENT,
             )
 
         publisher_method = self._get_platform_publisher(platform)
@@ -70,36 +120,29 @@ class PlaywrightPublisher(BasePublisher):
                 platform=platform,
                 status=PublishStatus.FAILED,
                 error=f"平台 {platform.value} 的自动化发布尚未实现",
+                error_category=ErrorCategory.PERMANENT,
             )
 
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=self._headless,
-                    slow_mo=self._slow_mo,
-                )
-
-                cookie_path = COOKIE_DIR / f"{platform.value}.json"
-                context = await browser.new_context(
-                    storage_state=str(cookie_path) if cookie_path.exists() else None,
-                    viewport={"width": 1280, "height": 720},
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-                )
-
-                page = await context.new_page()
-                result = await publisher_method(page, request, platform)
-
-                await context.storage_state(path=str(cookie_path))
-                await browser.close()
-
-                return result
+            cookie_path = COOKIE_DIR / f"{platform.value}.json"
+            async with self._pool.page(platform, cookie_path) as page:
+                return await publisher_method(page, request, platform)
 
+        except PublishNotConfirmed as e:
+            # 已点击发布但未确认结果，自动重试可能重复发布，交由人工核实
+            logger.error("Playwright 发布未确认 [%s -> %s]: %s", request.title[:30], platform.value, e)
+            return PlatformResult(
+                platform=platform,
+                status=PublishStatus.FAILED,
+                error=f"发布结果未确认，请人工核实: {e}",
+                error_category=ErrorCategory.PERMANENT,
+            )
         except Exception as e:
             logger.error("Playwright 发布失败 [%s -> %s]: %s", request.title[:30], platform.value, e)
             return PlatformResult(
                 platform=platform,
                 status=PublishStatus.FAILED,
-                error=f"浏览器自动化失败: {e}",
+                error=f"{PLATFORM_DISPLAY_NAMES.get(platform, platform.value)}发布失败: {e}",
             )
 
     def _get_platform_publisher(self, platform: Platform):
@@ -114,169 +157,178 @@ class PlaywrightPublisher(BasePublisher):
 
     async def _publish_xiaohongshu(self, page, request: PublishRequest, platform: Platform) -> PlatformResult:
         """小红书发布"""
-        try:
+        with phase("page_load"):
             await page.goto(PLATFORM_URLS[platform])
-            await self._random_delay()
+        await self._random_delay()
 
-            if request.video_path and Path(request.video_path).exists():
-                file_input = page.locator('input[type="file"]').first
-                await file_input.set_input_files(request.video_path)
-            elif request.cover_url:
-                file_input = page.locator('input[type="file"]').first
-                await file_input.set_input_files(request.cover_url)
+        has_video = request.video_path and Path(request.video_path).exists()
+        upload_path = request.video_path if has_video else request.cover_url
+        if upload_path:
+            file_input = page.locator('input[type="file"]').first
+            await file_input.set_input_files(upload_path)
+            await self._wait_for_upload(page, platform)
 
-            await self._random_delay()
+        await self._random_delay()
 
-            title_input = page.locator('[placeholder*="标题"]').first
-            await title_input.fill(request.title)
-            await self._random_delay()
+        title_input = page.locator('[placeholder*="标题"]').first
+        await title_input.fill(request.title)
+        await self._random_delay()
 
-            content_editor = page.locator('[contenteditable="true"]').first
-            await content_editor.fill(request.content[:1000])
-            await self._random_delay()
+        content_editor = page.locator('[contenteditable="true"]').first
+        await content_editor.fill(request.content[:1000])
+        await self._random_delay()
 
-            if request.tags:
-                for tag in request.tags[:5]:
-                    await content_editor.type(f" #{tag}")
-                    await self._random_delay(0.5, 1.5)
+        if request.tags:
+            for tag in request.tags[:5]:
+                await content_editor.type(f" #{tag}")
+                await self._random_delay(short=True)
 
-            publish_btn = page.locator('button:has-text("发布")').first
-            await publish_btn.click()
-            await page.wait_for_timeout(3000)
-
-            return PlatformResult(
-                platform=platform,
-                status=PublishStatus.PUBLISHED,
-                published_at=datetime.now(),
-            )
+        publish_btn = page.locator('button:has-text("发布")').first
+        await self._click_and_confirm(page, publish_btn, platform)
 
-        except Exception as e:
-            return PlatformResult(
-                platform=platform,
-                status=PublishStatus.FAILED,
-                error=f"小红书发布失败: {e}",
-            )
+        return PlatformResult(
+            platform=platform,
+            status=PublishStatus.PUBLISHED,
+            published_at=datetime.now(),
+        )
 
     async def _publish_douyin(self, page, request: PublishRequest, platform: Platform) -> PlatformResult:
         """抖音发布"""
-        try:
+        with phase("page_load"):
             await page.goto(PLATFORM_URLS[platform])
-            await self._random_delay()
+        await self._random_delay()
 
-            if request.video_path and Path(request.video_path).exists():
-                file_input = page.locator('input[type="file"]').first
-                await file_input.set_input_files(request.video_path)
-                await page.wait_for_timeout(5000)
+        if request.video_path and Path(request.video_path).exists():
+            file_input = page.locator('input[type="file"]').first
+            await file_input.set_input_files(request.video_path)
+            await self._wait_for_upload(page, platform)
 
-            await self._random_delay()
+        await self._random_delay()
 
-            title_input = page.locator('[placeholder*="标题"], [placeholder*="作品标题"]').first
-            await title_input.fill(request.title)
-            await self._random_delay()
+        title_input = page.locator('[placeholder*="标题"], [placeholder*="作品标题"]').first
+        await title_input.fill(request.title)
+        await self._random_delay()
 
-            desc_editor = page.locator('[contenteditable="true"]').first
-            desc_text = request.content[:500]
-            if request.tags:
-                desc_text += " " + " ".join(f"#{tag}" for tag in request.tags[:5])
-            await desc_editor.fill(desc_text)
-            await self._random_delay()
+        desc_editor = page.locator('[contenteditable="true"]').first
+        desc_text = request.content[:500]
+        if request.tags:
+            desc_text += " " + " ".join(f"#{tag}" for tag in request.tags[:5])
+        await desc_editor.fill(desc_text)
+        await self._random_delay()
 
-            publish_btn = page.locator('button:has-text("发布")').first
-            await publish_btn.click()
-            await page.wait_for_timeout(3000)
+        publish_btn = page.locator('button:has-text("发布")').first
+        await self._click_and_confirm(page, publish_btn, platform)
 
-            return PlatformResult(
-                platform=platform,
-                status=PublishStatus.PUBLISHED,
-                published_at=datetime.now(),
-            )
-
-        except Exception as e:
-            return PlatformResult(
-                platform=platform,
-                status=PublishStatus.FAILED,
-                error=f"抖音发布失败: {e}",
-            )
+        return PlatformResult(
+            platform=platform,
+            status=PublishStatus.PUBLISHED,
+            published_at=datetime.now(),
+        )
 
     async def _publish_bilibili(self, page, request: PublishRequest, platform: Platform) -> PlatformResult:
         """B站视频发布"""
-        try:
+        with phase("page_load"):
             await page.goto(PLATFORM_URLS[platform])
-            await self._random_delay()
+        await self._random_delay()
 
-            if request.video_path and Path(request.video_path).exists():
-                file_input = page.locator('input[type="file"]').first
-                await file_input.set_input_files(request.video_path)
-                await page.wait_for_timeout(10000)
+        if request.video_path and Path(request.video_path).exists():
+            file_input = page.locator('input[type="file"]').first
+            await file_input.set_input_files(request.video_path)
+            await self._wait_for_upload(page, platform)
 
-            await self._random_delay()
+        await self._random_delay()
 
-            title_input = page.locator('[placeholder*="标题"]').first
-            await title_input.fill(request.title)
-            await self._random_delay()
+        title_input = page.locator('[placeholder*="标题"]').first
+        await title_input.fill(request.title)
+        await self._random_delay()
 
-            if request.tags:
-                tag_input = page.locator('[placeholder*="标签"], [placeholder*="tag"]').first
-                for tag in request.tags[:5]:
-                    await tag_input.fill(tag)
-                    await tag_input.press("Enter")
-                    await self._random_delay(0.3, 1.0)
+        if request.tags:
+            tag_input = page.locator('[placeholder*="标签"], [placeholder*="tag"]').first
+            for tag in request.tags[:5]:
+                await tag_input.fill(tag)
+                await tag_input.press("Enter")
+                await self._random_delay(short=True)
 
-            publish_btn = page.locator('button:has-text("投稿"), button:has-text("发布")').first
-            await publish_btn.click()
-            await page.wait_for_timeout(3000)
+        publish_btn = page.locator('button:has-text("投稿"), button:has-text("发布")').first
+        await self._click_and_confirm(page, publish_btn, platform)
 
-            return PlatformResult(
-                platform=platform,
-                status=PublishStatus.PUBLISHED,
-                published_at=datetime.now(),
-            )
-
-        except Exception as e:
-            return PlatformResult(
-                platform=platform,
-                status=PublishStatus.FAILED,
-                error=f"B站发布失败: {e}",
-            )
+        return PlatformResult(
+            platform=platform,
+            status=PublishStatus.PUBLISHED,
+            published_at=datetime.now(),
+        )
 
     async def _publish_youtube(self, page, request: PublishRequest, platform: Platform) -> PlatformResult:
         """YouTube 视频发布（通过 YouTube Studio 界面）"""
-        try:
+        with phase("page_load"):
             await page.goto("https://studio.youtube.com")
-            await self._random_delay()
-
-            create_btn = page.locator('[id="create-icon"], button:has-text("Create")').first
-            await create_btn.click()
-            await self._random_delay()
-
-            upload_option = page.locator('text="Upload videos"').first
-            await upload_option.click()
-            await self._random_delay()
-
-            if request.video_path and Path(request.video_path).exists():
-                file_input = page.locator('input[type="file"]').first
-                await file_input.set_input_files(request.video_path)
-                await page.wait_for_timeout(10000)
+        await self._random_delay()
+
+        create_btn = page.locator('[id="create-icon"], button:has-text("Create")').first
+        await create_btn.click()
+        await self._random_delay()
+
+        upload_option = page.locator('text="Upload videos"').first
+        await upload_option.click()
+        await self._random_delay()
+
+        if request.video_path and Path(request.video_path).exists():
+            file_input = page.locator('input[type="file"]').first
+            await file_input.set_input_files(request.video_path)
+            await self._wait_for_upload(page, platform)
+
+        title_input = page.locator('[id="textbox"]').first
+        await title_input.fill(request.title)
+        await self._random_delay()
+
+        return PlatformResult(
+            platform=platform,
+            status=PublishStatus.DRAFT_SAVED,
+            published_at=datetime.now(),
+        )
+
+    async def _wait_for_upload(self, page, platform: Platform) -> None:
+        """等待上传完成标志出现（最长 playwright_upload_timeout 秒）"""
+        selector = UPLOAD_COMPLETE_SELECTORS.get(platform)
+        if not selector:
+            return
+        started = asyncio.get_running_loop().time()
+        with phase("upload"):
+            await page.locator(selector).first.wait_for(
+                state="visible",
+                timeout=settings.playwright_upload_timeout * 1000,
+            )
+        logger.info("上传完成 [%s] 耗时 %.1f 秒", platform.value, asyncio.get_running_loop().time() - started)
 
-            title_input = page.locator('[id="textbox"]').first
-            await title_input.fill(request.title)
-            await self._random_delay()
+    async def _click_and_confirm(self, page, button, platform: Platform) -> None:
+        """
+        点击发布并等待平台发布接口返回。
 
-            return PlatformResult(
-                platform=platform,
-                status=PublishStatus.DRAFT_SAVED,
-                published_at=datetime.now(),
-            )
+        拦截到 2xx 响应即确认成功；接口报错或超时抛出 PublishNotConfirmed。
+        """
+        pattern = PUBLISH_API_PATTERNS.get(platform)
+        if not pattern:
+            await button.click()
+            return
 
+        try:
+            with phase("submit_confirm"):
+                async with page.expect_response(
+                    lambda r: pattern in r.url and r.request.method == "POST",
+                    timeout=settings.playwright_confirm_timeout * 1000,
+                ) as response_info:
+                    await button.click()
+                response = await response_info.value
         except Exception as e:
-            return PlatformResult(
-                platform=platform,
-                status=PublishStatus.FAILED,
-                error=f"YouTube 发布失败: {e}",
-            )
-
-    @staticmethod
-    async def _random_delay(min_s: float = 2.0, max_s: float = 5.0) -> None:
-        """随机延迟，模拟人工操作"""
-        delay = random.uniform(min_s, max_s)
-        await asyncio.sleep(delay)
+            raise PublishNotConfirmed(f"{settings.playwright_confirm_timeout:.0f} 秒内未收到发布接口响应: {e}") from e
+
+        if not response.ok:
+            raise PublishNotConfirmed(f"发布接口返回 HTTP {response.status}")
+
+    async def _random_delay(self, short: bool = False) -> None:
+        """随机延迟，模拟人工操作（节奏由 humanization profile 决定）"""
+        min_s, max_s = self._profile.input_delay if short else self._profile.step_delay
+        if max_s <= 0:
+            return
+        with phase("humanize_delay"):
+            await asyncio.sleep(random.uniform(min_s, max_s))
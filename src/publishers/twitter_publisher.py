@@ -13,7 +13,9 @@ from uuid import uuid4
 import httpx
 
 from ..config import Platform, settings
-from ..models import PlatformResult, PublishRequest, PublishStatus
+from ..models import ErrorCategory, PlatformResult, PublishRequest, PublishStatus
+from ..rate_limiter import rate_limiter
+from ..timing import phase
 from .base import BasePublisher
 
 logger = logging.getLogger(__name__)
@@ -39,50 +41,70 @@ class TwitterPublisher(BasePublisher):
     def get_supported_platforms(self) -> list[Platform]:
         return [Platform.TWITTER]
 
-    async def check_auth(self, platform: Platform) -> bool:
-        """验证 Twitter API 凭证"""
+    async def check_auth(self, platform: Platform) -> Optional[bool]:
+        """验证 Twitter API 凭证（401/403 视为未认证；限流、5xx、网络错误无法确认，返回 None）"""
         if not all([self._api_key, self._api_secret, self._access_token, self._access_token_secret]):
             return False
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                headers = self._build_oauth_headers("GET", f"{TWITTER_API_BASE}/users/me")
-                response = await client.get(f"{TWITTER_API_BASE}/users/me", headers=headers)
-                return response.status_code == 200
-        except Exception:
+            headers = self._build_oauth_headers("GET", f"{TWITTER_API_BASE}/users/me")
+            response = await self._http_client().get(f"{TWITTER_API_BASE}/users/me", headers=headers, timeout=10)
+        except httpx.HTTPError as e:
+            logger.warning("Twitter 认证探测失败: %s", e)
+            return None
+        rate_limiter.update_from_headers(platform, response.headers)
+        if response.status_code == 200:
+            return True
+        if response.status_code in (401, 403):
             return False
+        logger.warning("Twitter 认证探测无法确认: HTTP %d", response.status_code)
+        return None
 
     async def publish(self, request: PublishRequest, platform: Platform) -> PlatformResult:
         """发送推文"""
+        if not all([self._api_key, self._api_secret, self._access_token, self._access_token_secret]):
+            return PlatformResult(
+                platform=platform,
+                status=PublishStatus.FAILED,
+                error="未配置 Twitter API 凭证",
+                error_category=ErrorCategory.PERMANENT,
+            )
+
         try:
-            tweet_text = self._format_tweet(request)
+            with phase("render"):
+                tweet_text = self._format_tweet(request)
 
-            async with httpx.AsyncClient(timeout=30) as client:
-                url = f"{TWITTER_API_BASE}/tweets"
+            url = f"{TWITTER_API_BASE}/tweets"
+            with phase("oauth_sign"):
                 headers = self._build_oauth_headers("POST", url)
-                headers["Content-Type"] = "application/json"
-
-                payload = {"text": tweet_text}
+            headers["Content-Type"] = "application/json"
 
-                response = await client.post(url, headers=headers, json=payload)
-                data = response.json()
+            payload = {"text": tweet_text}
 
-                if response.status_code in (200, 201):
-                    tweet_data = data.get("data", {})
-                    tweet_id = tweet_data.get("id", "")
-                    return PlatformResult(
-                        platform=platform,
-                        status=PublishStatus.PUBLISHED,
-                        post_url=f"https://twitter.com/i/status/{tweet_id}" if tweet_id else None,
-                        published_at=datetime.now(),
-                    )
+            with phase("api_call"):
+                response = await self._http_client().post(url, headers=headers, json=payload, timeout=30)
+            rate_limiter.update_from_headers(platform, response.headers)
+            data = response.json()
 
-                error_detail = data.get("detail") or data.get("title") or str(data)
+            if response.status_code in (200, 201):
+                tweet_data = data.get("data", {})
+                tweet_id = tweet_data.get("id", "")
                 return PlatformResult(
                     platform=platform,
-                    status=PublishStatus.FAILED,
-                    error=f"Twitter API 错误 ({response.status_code}): {error_detail}",
+                    status=PublishStatus.PUBLISHED,
+                    post_url=f"https://twitter.com/i/status/{tweet_id}" if tweet_id else None,
+                    published_at=datetime.now(),
                 )
 
+            error_detail = data.get("detail") or data.get("title") or str(data)
+            category, retry_after = self._classify_response(response)
+            return PlatformResult(
+                platform=platform,
+                status=PublishStatus.FAILED,
+                error=f"Twitter API 错误 ({response.status_code}): {error_detail}",
+                error_category=category,
+                retry_after=retry_after,
+            )
+
         except Exception as e:
             return PlatformResult(
                 platform=platform,
@@ -90,6 +112,23 @@ class TwitterPublisher(BasePublisher):
                 error=f"Twitter 发布异常: {e}",
             )
 
+    @staticmethod
+    def _classify_response(response: httpx.Response) -> tuple[ErrorCategory, Optional[float]]:
+        """按 HTTP 状态码判断失败类型，429 时从 x-rate-limit-reset 计算等待秒数"""
+        status = response.status_code
+        if status == 429:
+            reset = response.headers.get("x-rate-limit-reset")
+            retry_after = None
+            if reset and reset.isdigit():
+                retry_after = max(0.0, int(reset) - time.time())
+            return ErrorCategory.RATE_LIMITED, retry_after
+        if status == 401:
+            return ErrorCategory.AUTH_EXPIRED, None
+        if status >= 500:
+            return ErrorCategory.TRANSIENT, None
+        # 403（重复推文/权限不足）及其他 4xx 重试无意义
+        return ErrorCategory.PERMANENT, None
+
     def _format_tweet(self, request: PublishRequest) -> str:
         """将内容格式化为推文（≤280 字符）"""
         tags_text = " ".join(f"#{tag}" for tag in request.tags[:3]) if request.tags else ""
@@ -9,13 +9,46 @@ import httpx
 import markdown
 
 from ..config import Platform, settings
-from ..models import PlatformResult, PublishRequest, PublishStatus
+from ..models import ErrorCategory, PlatformResult, PublishRequest, PublishStatus
+from ..timing import phase
 from .base import BasePublisher
 
 logger = logging.getLogger(__name__)
 
 WECHAT_API_BASE = "https://api.weixin.qq.com/cgi-bin"
 
+# 微信 errcode → 失败类型（未列出的按 transient 处理）
+WECHAT_ERRCODE_CATEGORIES: dict[int, ErrorCategory] = {
+    -1: ErrorCategory.TRANSIENT,  # 系统繁忙
+    40001: ErrorCategory.TRANSIENT,  # access_token 无效，刷新后可重试
+    40014: ErrorCategory.TRANSIENT,  # access_token 不合法
+    42001: ErrorCategory.TRANSIENT,  # access_token 过期
+    40013: ErrorCategory.PERMANENT,  # AppID 无效
+    40125: ErrorCategory.PERMANENT,  # AppSecret 无效
+    40164: ErrorCategory.PERMANENT,  # IP 不在白名单
+    48001: ErrorCategory.PERMANENT,  # 接口未授权
+    45003: ErrorCategory.PERMANENT,  # 标题超长
+    45004: ErrorCategory.PERMANENT,  # 摘要超长
+    45009: ErrorCategory.RATE_LIMITED,  # 接口日调用量超限
+    45011: ErrorCategory.RATE_LIMITED,  # 接口调用频率超限
+}
+
+# 需要刷新 access_token 的 errcode
+WECHAT_TOKEN_ERRCODES = {40001, 40014, 42001}
+
+
+class WechatAPIError(Exception):
+    """微信接口返回 errcode"""
+
+    def __init__(self, errcode: int, errmsg: str) -> None:
+        self.errcode = errcode
+        self.errmsg = errmsg
+        super().__init__(f"errcode={errcode} errmsg={errmsg}")
+
+    @property
+    def category(self) -> ErrorCategory:
+        return WECHAT_ERRCODE_CATEGORIES.get(self.errcode, ErrorCategory.TRANSIENT)
+
 
 class WechatMPPublisher(BasePublisher):
     """
@@ -34,20 +67,32 @@ class WechatMPPublisher(BasePublisher):
     def get_supported_platforms(self) -> list[Platform]:
         return [Platform.WECHAT_MP]
 
-    async def check_auth(self, platform: Platform) -> bool:
-        """检查微信公众号 API 认证状态"""
+    async def check_auth(self, platform: Platform) -> Optional[bool]:
+        """检查微信公众号 API 认证状态（网络错误无法确认，返回 None）"""
         if not self._app_id or not self._app_secret:
             return False
         try:
             token = await self._get_access_token()
-            return token is not None
+        except httpx.HTTPError as e:
+            logger.warning("微信公众号认证探测失败: %s", e)
+            return None
         except Exception:
             return False
+        return token is not None
 
     async def publish(self, request: PublishRequest, platform: Platform) -> PlatformResult:
         """发布文章到微信公众号"""
+        if not self._app_id or not self._app_secret:
+            return PlatformResult(
+                platform=platform,
+                status=PublishStatus.FAILED,
+                error="未配置微信公众号 AppID/AppSecret",
+                error_category=ErrorCategory.PERMANENT,
+            )
+
         try:
-            token = await self._get_access_token()
+            with phase("token_fetch"):
+                token = await self._get_access_token()
             if not token:
                 return PlatformResult(
                     platform=platform,
@@ -55,14 +100,16 @@ class WechatMPPublisher(BasePublisher):
                     error="获取 access_token 失败，请检查 AppID/AppSecret 配置",
                 )
 
-            html_content = self._markdown_to_html(request.content)
+            with phase("render"):
+                html_content = self._markdown_to_html(request.content)
 
-            media_id = await self._create_draft(
-                token=token,
-                title=request.title,
-                content=html_content,
-                digest=request.content[:120].replace("\n", " "),
-            )
+            with phase("draft_create"):
+                media_id = await self._create_draft(
+                    token=token,
+                    title=request.title,
+                    content=html_content,
+                    digest=request.content[:120].replace("\n", " "),
+                )
 
             if not media_id:
                 return PlatformResult(
@@ -78,7 +125,8 @@ class WechatMPPublisher(BasePublisher):
                     published_at=datetime.now(),
                 )
 
-            publish_id = await self._submit_publish(token, media_id)
+            with phase("publish_submit"):
+                publish_id = await self._submit_publish(token, media_id)
             if publish_id:
                 return PlatformResult(
                     platform=platform,
@@ -92,6 +140,17 @@ class WechatMPPublisher(BasePublisher):
                 error="发布草稿失败",
             )
 
+        except WechatAPIError as e:
+            if e.errcode in WECHAT_TOKEN_ERRCODES:
+                # 令牌失效，清掉缓存让下一次尝试重新获取
+                self._access_token = None
+                self._token_expires_at = 0
+            return PlatformResult(
+                platform=platform,
+                status=PublishStatus.FAILED,
+                error=f"微信公众号接口错误: {e}",
+                error_category=e.category,
+            )
         except Exception as e:
             return PlatformResult(
                 platform=platform,
@@ -104,24 +163,26 @@ class WechatMPPublisher(BasePublisher):
         if self._access_token and time.time() < self._token_expires_at:
             return self._access_token
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(
-                f"{WECHAT_API_BASE}/token",
-                params={
-                    "grant_type": "client_credential",
-                    "appid": self._app_id,
-                    "secret": self._app_secret,
-                },
-            )
-            data = response.json()
+        response = await self._http_client().get(
+            f"{WECHAT_API_BASE}/token",
+            params={
+                "grant_type": "client_credential",
+                "appid": self._app_id,
+                "secret": self._app_secret,
+            },
+            timeout=10,
+        )
+        data = response.json()
 
-            if "access_token" in data:
-                self._access_token = data["access_token"]
-                self._token_expires_at = time.time() + data.get("expires_in", 7200) - 300
-                return self._access_token
+        if "access_token" in data:
+            self._access_token = data["access_token"]
+            self._token_expires_at = time.time() + data.get("expires_in", 7200) - 300
+            return self._access_token
 
-            logger.error("获取 access_token 失败: %s", data.get("errmsg", "unknown"))
-            return None
+        logger.error("获取 access_token 失败: %s", data.get("errmsg", "unknown"))
+        if data.get("errcode"):
+            raise WechatAPIError(data["errcode"], data.get("errmsg", "unknown"))
+        return None
 
     async def _create_draft(
         self,
@@ -131,47 +192,51 @@ class WechatMPPublisher(BasePublisher):
         digest: str,
     ) -> Optional[str]:
         """创建草稿，返回 media_id"""
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(
-                f"{WECHAT_API_BASE}/draft/add",
-                params={"access_token": token},
-                json={
-                    "articles": [
-                        {
-                            "title": title,
-                            "content": content,
-                            "digest": digest,
-                            "need_open_comment": 0,
-                            "only_fans_can_comment": 0,
-                        }
-                    ]
-                },
-            )
-            data = response.json()
+        response = await self._http_client().post(
+            f"{WECHAT_API_BASE}/draft/add",
+            params={"access_token": token},
+            json={
+                "articles": [
+                    {
+                        "title": title,
+                        "content": content,
+                        "digest": digest,
+                        "need_open_comment": 0,
+                        "only_fans_can_comment": 0,
+                    }
+                ]
+            },
+            timeout=30,
+        )
+        data = response.json()
 
-            if "media_id" in data:
-                logger.info("草稿创建成功: media_id=%s", data["media_id"])
-                return data["media_id"]
+        if "media_id" in data:
+            logger.info("草稿创建成功: media_id=%s", data["media_id"])
+            return data["media_id"]
 
-            logger.error("创建草稿失败: %s", data.get("errmsg", "unknown"))
-            return None
+        logger.error("创建草稿失败: %s", data.get("errmsg", "unknown"))
+        if data.get("errcode"):
+            raise WechatAPIError(data["errcode"], data.get("errmsg", "unknown"))
+        return None
 
     async def _submit_publish(self, token: str, media_id: str) -> Optional[str]:
         """提交发布，返回 publish_id"""
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(
-                f"{WECHAT_API_BASE}/freepublish/submit",
-                params={"access_token": token},
-                json={"media_id": media_id},
-            )
-            data = response.json()
+        response = await self._http_client().post(
+            f"{WECHAT_API_BASE}/freepublish/submit",
+            params={"access_token": token},
+            json={"media_id": media_id},
+            timeout=30,
+        )
+        data = response.json()
 
-            if "publish_id" in data:
-                logger.info("发布提交成功: publish_id=%s", data["publish_id"])
-                return data["publish_id"]
+        if "publish_id" in data:
+            logger.info("发布提交成功: publish_id=%s", data["publish_id"])
+            return data["publish_id"]
 
-            logger.error("发布提交失败: %s", data.get("errmsg", "unknown"))
-            return None
+        logger.error("发布提交失败: %s", data.get("errmsg", "unknown"))
+        if data.get("errcode"):
+            raise WechatAPIError(data["errcode"], data.get("errmsg", "unknown"))
+        return None
 
     @staticmethod
     def _markdown_to_html(md_content: str) -> str:
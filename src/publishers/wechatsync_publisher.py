@@ -4,11 +4,13 @@ import json
 import logging
 import re
 from datetime import datetime
+from typing import Optional
 
 import httpx
 
-from ..config import Platform, WECHATSYNC_PLATFORM_MAP, settings
-from ..models import PlatformResult, PublishRequest, PublishStatus
+from ..config import WECHATSYNC_PLATFORM_MAP, Platform, settings
+from ..models import ErrorCategory, PlatformResult, PublishRequest, PublishStatus
+from ..timing import phase
 from .base import BasePublisher
 
 logger = logging.getLogger(__name__)
@@ -16,6 +18,9 @@ logger = logging.getLogger(__name__)
 # Bridge HTTP API 端口 = WebSocket 端口 + 1，默认 9528
 BRIDGE_HTTP_URL = "http://localhost:9528"
 
+# 平台返回的错误信息中表示登录态失效的关键词
+AUTH_ERROR_KEYWORDS = ("未登录", "登录失效", "请登录", "not logged in", "unauthorized", "login required")
+
 
 class WechatsyncPublisher(BasePublisher):
     """
@@ -28,6 +33,8 @@ class WechatsyncPublisher(BasePublisher):
       ai-auto-publisher → Bridge HTTP API (9528) → WebSocket → Chrome Extension → 各平台 API
     """
 
+    SUPPORTS_BATCH = True
+
     def __init__(self) -> None:
         self._bridge_url = BRIDGE_HTTP_URL
 
@@ -36,99 +43,179 @@ class WechatsyncPublisher(BasePublisher):
 
     async def _bridge_request(self, method: str, params: dict | None = None, timeout: float = 60) -> dict:
         """向 Bridge HTTP API 发送请求"""
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(
-                f"{self._bridge_url}/request",
-                json={"method": method, "params": params or {}},
-            )
-            data = response.json()
-            if "error" in data:
-                raise RuntimeError(data["error"])
-            return data.get("result", {})
-
-    async def check_auth(self, platform: Platform) -> bool:
+        response = await self._http_client().post(
+            f"{self._bridge_url}/request",
+            json={"method": method, "params": params or {}},
+            timeout=timeout,
+        )
+        data = response.json()
+        if "error" in data:
+            raise RuntimeError(data["error"])
+        return data.get("result", {})
+
+    async def check_auth(self, platform: Platform) -> Optional[bool]:
         """通过 Bridge 的 listPlatforms 检查登录状态"""
+        results = await self.check_auth_many([platform])
+        return results[platform]
+
+    async def check_auth_many(self, platforms: list[Platform]) -> dict[Platform, Optional[bool]]:
+        """一次 listPlatforms 调用得到所有 Wechatsync 平台的登录状态（Bridge 不可用时为未知）"""
+        results: dict[Platform, Optional[bool]] = {p: False for p in platforms}
         try:
             platforms_data = await self._bridge_request("listPlatforms", {"forceRefresh": True}, timeout=15)
-            ws_name = WECHATSYNC_PLATFORM_MAP.get(platform, "")
-            if isinstance(platforms_data, list):
-                for p in platforms_data:
-                    if p.get("id") == ws_name or p.get("name") == ws_name:
-                        return p.get("isAuthenticated", False)
         except Exception as e:
             logger.warning("检查 Wechatsync 认证状态失败: %s", e)
-        return False
+            return {p: None for p in platforms}
+
+        if isinstance(platforms_data, list):
+            authed = {
+                key: bool(p.get("isAuthenticated", False))
+                for p in platforms_data
+                if isinstance(p, dict)
+                for key in (p.get("id"), p.get("name"))
+                if key
+            }
+            for platform in platforms:
+                ws_name = WECHATSYNC_PLATFORM_MAP.get(platform)
+                if ws_name:
+                    results[platform] = authed.get(ws_name, False)
+        return results
 
     async def publish(self, request: PublishRequest, platform: Platform) -> PlatformResult:
         """通过 Bridge 的 syncArticle 发布文章"""
-        ws_platform = WECHATSYNC_PLATFORM_MAP.get(platform)
-        if not ws_platform:
-            return PlatformResult(
-                platform=platform,
-                status=PublishStatus.FAILED,
-                error=f"平台 {platform.value} 不在 Wechatsync 支持列表中",
-            )
+        results = await self.publish_many(request, [platform])
+        return results[0]
+
+    async def publish_many(self, request: PublishRequest, platforms: list[Platform]) -> list[PlatformResult]:
+        """
+        一次 syncArticle 同步到多个平台。
+
+        Bridge 的 platforms 参数本身支持列表，返回的 results 按平台拆分回各自的 PlatformResult。
+        """
+        results: dict[Platform, PlatformResult] = {}
+        targets: dict[str, Platform] = {}
+        for platform in platforms:
+            ws_platform = WECHATSYNC_PLATFORM_MAP.get(platform)
+            if ws_platform:
+                targets[ws_platform] = platform
+            else:
+                results[platform] = PlatformResult(
+                    platform=platform,
+                    status=PublishStatus.FAILED,
+                    error=f"平台 {platform.value} 不在 Wechatsync 支持列表中",
+                    error_category=ErrorCategory.PERMANENT,
+                )
+
+        if targets:
+            results.update(await self._sync_article(request, targets))
+
+        return [results[p] for p in platforms]
+
+    async def _sync_article(
+        self, request: PublishRequest, targets: dict[str, Platform]
+    ) -> dict[Platform, PlatformResult]:
+        """
+        调用 syncArticle 并按平台解析结果。
+
+        Bridge 逐个平台同步，超时按平台数放大。请求已发出后的超时无法确定哪些平台已发布成功，
+        标记为 PERMANENT 不自动重试（避免重复发文），需人工核对；连接阶段超时请求未送达，可正常重试。
+        """
+        timeout = settings.wechatsync_sync_timeout_per_platform * len(targets)
+
+        def fail_all(error: str, category: ErrorCategory) -> dict[Platform, PlatformResult]:
+            return {
+                p: PlatformResult(platform=p, status=PublishStatus.FAILED, error=error, error_category=category)
+                for p in targets.values()
+            }
 
         try:
-            result = await self._bridge_request(
-                "syncArticle",
-                {
-                    "platforms": [ws_platform],
-                    "article": {
-                        "title": request.title,
-                        "markdown": request.content,
-                        "content": request.content,
+            with phase("bridge_call"):
+                result = await self._bridge_request(
+                    "syncArticle",
+                    {
+                        "platforms": list(targets.keys()),
+                        "article": {
+                            "title": request.title,
+                            "markdown": request.content,
+                            "content": request.content,
+                        },
                     },
-                },
-                timeout=120,
-            )
+                    timeout=timeout,
+                )
 
             # 解析同步结果
             results = result.get("results", []) if isinstance(result, dict) else result
-            if isinstance(results, list):
+            if isinstance(results, list) and results:
+                parsed: dict[Platform, PlatformResult] = {}
                 for r in results:
-                    if r.get("success"):
-                        return PlatformResult(
-                            platform=platform,
-                            status=PublishStatus.PUBLISHED,
-                            post_url=r.get("postUrl"),
-                            published_at=datetime.now(),
-                        )
-                    else:
-                        return PlatformResult(
+                    platform = targets.get(r.get("platform"))
+                    if platform is None and len(targets) == 1:
+                        # 单平台同步时 Bridge 可能不带 platform 字段
+                        platform = next(iter(targets.values()))
+                    if platform is None or platform in parsed:
+                        continue
+                    parsed[platform] = self._parse_platform_result(platform, r)
+
+                for platform in targets.values():
+                    if platform not in parsed:
+                        parsed[platform] = PlatformResult(
                             platform=platform,
                             status=PublishStatus.FAILED,
-                            error=r.get("error", "同步失败"),
+                            error="Wechatsync 未返回该平台的同步结果",
+                            error_category=ErrorCategory.TRANSIENT,
                         )
+                return parsed
 
             # 兜底：尝试从文本结果中判断
             result_str = json.dumps(result) if isinstance(result, dict) else str(result)
             if "success" in result_str.lower():
-                return PlatformResult(
-                    platform=platform,
-                    status=PublishStatus.PUBLISHED,
-                    post_url=self._extract_url(result_str),
-                    published_at=datetime.now(),
-                )
-
-            return PlatformResult(
-                platform=platform,
-                status=PublishStatus.FAILED,
-                error=f"Wechatsync 返回未知结果: {result_str[:200]}",
-            )
-
+                return {
+                    p: PlatformResult(
+                        platform=p,
+                        status=PublishStatus.PUBLISHED,
+                        post_url=self._extract_url(result_str),
+                        published_at=datetime.now(),
+                    )
+                    for p in targets.values()
+                }
+
+            return fail_all(f"Wechatsync 返回未知结果: {result_str[:200]}", ErrorCategory.TRANSIENT)
+
+        except (httpx.ConnectTimeout, httpx.PoolTimeout):
+            return fail_all(f"Wechatsync 连接超时（{timeout:.0f}s）", ErrorCategory.TRANSIENT)
         except httpx.TimeoutException:
-            return PlatformResult(
-                platform=platform,
-                status=PublishStatus.FAILED,
-                error="Wechatsync 请求超时（120s）",
+            logger.warning("Wechatsync 同步超时，发布结果未知: %s", list(targets))
+            return fail_all(
+                f"Wechatsync 同步超时（{timeout:.0f}s），文章可能已部分发布，请到各平台核对后再手动重试",
+                ErrorCategory.PERMANENT,
             )
         except Exception as e:
+            return fail_all(f"Wechatsync 发布异常: {e}", self._classify_error(str(e)))
+
+    def _parse_platform_result(self, platform: Platform, r: dict) -> PlatformResult:
+        """解析 results 中单个平台的同步结果"""
+        if r.get("success"):
             return PlatformResult(
                 platform=platform,
-                status=PublishStatus.FAILED,
-                error=f"Wechatsync 发布异常: {e}",
+                status=PublishStatus.PUBLISHED,
+                post_url=r.get("postUrl"),
+                published_at=datetime.now(),
             )
+        error = r.get("error", "同步失败")
+        return PlatformResult(
+            platform=platform,
+            status=PublishStatus.FAILED,
+            error=error,
+            error_category=self._classify_error(error),
+        )
+
+    @staticmethod
+    def _classify_error(error: str) -> ErrorCategory:
+        """根据 Bridge/平台返回的错误信息判断失败类型"""
+        lowered = error.lower()
+        if any(keyword in lowered for keyword in AUTH_ERROR_KEYWORDS):
+            return ErrorCategory.AUTH_EXPIRED
+        return ErrorCategory.TRANSIENT
 
     @staticmethod
     def _extract_url(text: str) -> str | None:
@@ -0,0 +1,210 @@
+"""RateLimiter - 按平台/账号的令牌桶限流与日/月配额（配额持久化到数据库）"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .config import Platform, settings
+from .storage.async_database import get_quota_usage, increment_quota_usage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACCOUNT = "default"
+
+
+class RateLimitPolicy(BaseModel):
+    """单平台限流策略"""
+
+    rate_per_minute: float  # 令牌补充速率
+    burst: int = 1  # 桶容量（允许的瞬时突发）
+    daily_quota: Optional[int] = None
+    monthly_quota: Optional[int] = None
+
+
+# 保守默认值，可通过 RATE_LIMITS 环境变量按平台覆盖
+DEFAULT_RATE_LIMITS: dict[Platform, RateLimitPolicy] = {
+    Platform.TWITTER: RateLimitPolicy(rate_per_minute=3, burst=5, monthly_quota=1500),
+    Platform.WECHAT_MP: RateLimitPolicy(rate_per_minute=6, burst=2, daily_quota=100),
+    Platform.ZHIHU: RateLimitPolicy(rate_per_minute=2, burst=2),
+    Platform.WEIBO: RateLimitPolicy(rate_per_minute=2, burst=2),
+    Platform.TOUTIAO: RateLimitPolicy(rate_per_minute=2, burst=2),
+    Platform.XIAOHONGSHU: RateLimitPolicy(rate_per_minute=1, burst=1, daily_quota=50),
+    Platform.DOUYIN: RateLimitPolicy(rate_per_minute=1, burst=1, daily_quota=30),
+    Platform.KUAISHOU: RateLimitPolicy(rate_per_minute=1, burst=1, daily_quota=30),
+}
+
+
+class RateLimitExceeded(Exception):
+    """限流等待时间超过上限或配额已用尽"""
+
+    def __init__(self, platform: Platform, retry_after: float, reason: str) -> None:
+        self.platform = platform
+        self.retry_after = retry_after
+        super().__init__(f"{platform.value} {reason}，需等待 {retry_after:.0f} 秒")
+
+
+class TokenBucket:
+    """
+    令牌桶（预约制）。
+
+    reserve() 立即扣减令牌（可为负数），返回需要等待的秒数，
+    因此并发调用者按预约顺序排队，且每人的等待时间是精确的。
+    """
+
+    def __init__(self, rate_per_second: float, capacity: int) -> None:
+        self.rate = rate_per_second
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, max_wait: Optional[float] = None) -> float:
+        """预约一个令牌，返回等待秒数；超过 max_wait 时不扣减并抛出 ValueError"""
+        now = time.monotonic()
+        self._refill(now)
+
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        wait = max(wait, self.blocked_until - now)
+
+        if max_wait is not None and wait > max_wait:
+            raise ValueError(wait)
+
+        self.tokens -= 1
+        return wait
+
+    def block_until(self, deadline: float) -> None:
+        """平台明确告知配额窗口重置时间前不再放行"""
+        self.blocked_until = max(self.blocked_until, deadline)
+        self.tokens = min(self.tokens, 0)
+
+
+class RateLimiter:
+    """
+    全局限流器。
+
+    - 令牌桶按 (平台, 账号) 维护在进程内存中
+    - 日/月配额计数持久化在 quota_usage 表，重启不丢失
+    - 平台返回的限流响应头（如 Twitter x-rate-limit-*）会直接阻塞对应令牌桶
+    """
+
+    def __init__(self, policies: Optional[dict[Platform, RateLimitPolicy]] = None) -> None:
+        if policies is None:
+            policies = dict(DEFAULT_RATE_LIMITS)
+            for platform_name, override in settings.rate_limits.items():
+                platform = Platform(platform_name)
+                base = policies.get(platform)
+                merged = {**(base.model_dump() if base else {}), **override}
+                policies[platform] = RateLimitPolicy(**merged)
+        self._policies = policies
+        self._buckets: dict[tuple[Platform, str], TokenBucket] = {}
+
+    def get_policy(self, platform: Platform) -> Optional[RateLimitPolicy]:
+        return self._policies.get(platform)
+
+    def _bucket(self, platform: Platform, account: str) -> Optional[TokenBucket]:
+        policy = self._policies.get(platform)
+        if not policy:
+            return None
+        key = (platform, account)
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(policy.rate_per_minute / 60, policy.burst)
+        return self._buckets[key]
+
+    async def acquire(
+        self,
+        platform: Platform,
+        account: str = DEFAULT_ACCOUNT,
+        max_wait: Optional[float] = None,
+    ) -> None:
+        """
+        获取一次发布许可。
+
+        配额用尽或需要等待超过 max_wait 秒时抛出 RateLimitExceeded，
+        否则精确等待到令牌可用。
+        """
+        policy = self._policies.get(platform)
+        if not policy:
+            return
+
+        await self._check_quota(platform, account, policy)
+
+        if max_wait is None:
+            max_wait = settings.rate_limit_max_wait
+        bucket = self._bucket(platform, account)
+        try:
+            wait = bucket.reserve(max_wait=max_wait)
+        except ValueError as e:
+            raise RateLimitExceeded(platform, e.args[0], "触发限流") from None
+
+        if wait > 0:
+            logger.info("限流等待 %.1f 秒 [%s/%s]", wait, platform.value, account)
+            await asyncio.sleep(wait)
+
+    async def record_usage(self, platform: Platform, account: str = DEFAULT_ACCOUNT) -> None:
+        """发布成功后累加日/月配额"""
+        policy = self._policies.get(platform)
+        if not policy:
+            return
+        now = datetime.now()
+        if policy.daily_quota is not None:
+            await increment_quota_usage(platform.value, account, "day", now.strftime("%Y-%m-%d"))
+        if policy.monthly_quota is not None:
+            await increment_quota_usage(platform.value, account, "month", now.strftime("%Y-%m"))
+
+    def update_from_headers(
+        self,
+        platform: Platform,
+        headers: Mapping[str, str],
+        account: str = DEFAULT_ACCOUNT,
+    ) -> None:
+        """
+        解析 x-rate-limit-remaining / x-rate-limit-reset 响应头。
+
+        remaining 为 0 时阻塞令牌桶直到 reset（Unix 时间戳）。
+        """
+        remaining = headers.get("x-rate-limit-remaining")
+        reset = headers.get("x-rate-limit-reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining_count = int(remaining)
+            reset_in = float(reset) - time.time()
+        except ValueError:
+            return
+
+        bucket = self._bucket(platform, account)
+        if bucket and remaining_count <= 0 and reset_in > 0:
+            bucket.block_until(time.monotonic() + reset_in)
+            logger.warning("%s 限流窗口已用尽，%.0f 秒后重置", platform.value, reset_in)
+
+    async def _check_quota(self, platform: Platform, account: str, policy: RateLimitPolicy) -> None:
+        now = datetime.now()
+        if policy.daily_quota is not None:
+            used = await get_quota_usage(platform.value, account, "day", now.strftime("%Y-%m-%d"))
+            if used >= policy.daily_quota:
+                tomorrow = datetime(now.year, now.month, now.day).timestamp() + 86400
+                raise RateLimitExceeded(
+                    platform, tomorrow - now.timestamp(), f"日配额已用尽({used}/{policy.daily_quota})"
+                )
+        if policy.monthly_quota is not None:
+            used = await get_quota_usage(platform.value, account, "month", now.strftime("%Y-%m"))
+            if used >= policy.monthly_quota:
+                next_month = datetime(now.year + now.month // 12, now.month % 12 + 1, 1)
+                raise RateLimitExceeded(
+                    platform,
+                    next_month.timestamp() - now.timestamp(),
+                    f"月配额已用尽({used}/{policy.monthly_quota})",
+                )
+
+
+# 全局单例
+rate_limiter = RateLimiter()
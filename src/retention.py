@@ -0,0 +1,80 @@
+"""RetentionManager - 后台分批归档过期发布记录，保持热表规模"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .config import settings
+from .storage.async_database import archive_publish_records, optimize_db, purge_finished_jobs
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionManager:
+    """
+    数据保留管理。
+
+    - retention_days <= 0 时不启用
+    - 每 retention_interval 秒运行一轮：分批归档过期的终态发布记录、清理已结束的队列任务
+    - 批与批之间短暂让出，归档期间发布写入不会被长时间阻塞
+    """
+
+    def __init__(
+        self,
+        retention_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        batch_pause: Optional[float] = None,
+    ) -> None:
+        self._retention_days = settings.retention_days if retention_days is None else retention_days
+        self._batch_size = batch_size or settings.retention_batch_size
+        self._interval = interval or settings.retention_interval
+        self._batch_pause = settings.retention_batch_pause if batch_pause is None else batch_pause
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._retention_days > 0
+
+    async def start(self) -> None:
+        if not self.enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+            logger.info("数据保留已启用: 保留 %d 天，每 %.0f 秒归档一轮", self._retention_days, self._interval)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def run_once(self, now: Optional[datetime] = None) -> dict:
+        """执行一轮归档，返回归档的记录数和清理的任务数"""
+        cutoff = (now or datetime.now()) - timedelta(days=self._retention_days)
+        archived = await self._drain(archive_publish_records, cutoff)
+        purged = await self._drain(purge_finished_jobs, cutoff)
+        if archived or purged:
+            await optimize_db()
+            logger.info("数据归档完成: 归档发布记录 %d 条，清理队列任务 %d 条（截止 %s）", archived, purged, cutoff)
+        return {"archived": archived, "purged_jobs": purged}
+
+    async def _drain(self, step, cutoff: datetime) -> int:
+        total = 0
+        while True:
+            count = await step(cutoff, self._batch_size)
+            total += count
+            if count < self._batch_size:
+                return total
+            await asyncio.sleep(self._batch_pause)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("数据归档失败")
+            await asyncio.sleep(self._interval)
@@ -0,0 +1,127 @@
+"""RetryEngine - 持久化的延迟重试（按平台策略计算下次重试时间，到期后重新入队）"""
+
+import asyncio
+import logging
+import random
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .config import Platform, settings
+from .models import ErrorCategory, PlatformResult, PublishStatus
+from .storage.async_database import claim_due_retries
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy(BaseModel):
+    """单平台持久化重试策略"""
+
+    max_attempts: int = 10  # 累计尝试次数上限（含进程内重试）
+    base_delay: float = 5.0  # 秒
+    max_delay: float = 3600.0  # 秒
+    jitter: float = 0.2  # 延迟在 ±jitter 比例内随机，避免同一时刻集中重试
+
+    def delay(self, attempts: int) -> float:
+        """已尝试 attempts 次后的退避秒数：min(base * 2^(attempts-1), max) ± jitter"""
+        delay = min(self.base_delay * (2 ** max(0, attempts - 1)), self.max_delay)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+# 按平台限流窗口给出的默认值，可通过 RETRY_POLICIES 环境变量按平台覆盖
+DEFAULT_RETRY_POLICIES: dict[Platform, RetryPolicy] = {
+    Platform.TWITTER: RetryPolicy(max_attempts=8, base_delay=60, max_delay=4 * 3600),
+    Platform.WECHAT_MP: RetryPolicy(max_attempts=8, base_delay=30, max_delay=3600),
+    Platform.XIAOHONGSHU: RetryPolicy(max_attempts=6, base_delay=120, max_delay=6 * 3600),
+    Platform.DOUYIN: RetryPolicy(max_attempts=6, base_delay=120, max_delay=6 * 3600),
+    Platform.KUAISHOU: RetryPolicy(max_attempts=6, base_delay=120, max_delay=6 * 3600),
+}
+
+# 只有这些失败类型会安排延迟重试
+RETRYABLE_CATEGORIES = frozenset({ErrorCategory.TRANSIENT, ErrorCategory.RATE_LIMITED})
+
+
+class RetryEngine:
+    """
+    持久化重试调度。
+
+    - 进程内重试仍失败的平台由 PublisherHub 记为 retry_scheduled，并写入 next_attempt_at
+    - 后台循环每 retry_poll_interval 秒认领一批到期记录，按任务合并为队列任务交给 WorkerPool
+    - 等待期间不占用协程和内存，进程重启后继续按数据库中的时间表执行
+    """
+
+    def __init__(
+        self,
+        on_enqueued: Optional[Callable[[], None]] = None,
+        policies: Optional[dict[Platform, RetryPolicy]] = None,
+        poll_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        if policies is None:
+            policies = dict(DEFAULT_RETRY_POLICIES)
+            for platform_name, override in settings.retry_policies.items():
+                platform = Platform(platform_name)
+                base = policies.get(platform, RetryPolicy())
+                policies[platform] = RetryPolicy(**{**base.model_dump(), **override})
+        self._policies = policies
+        self._on_enqueued = on_enqueued
+        self._poll_interval = poll_interval or settings.retry_poll_interval
+        self._batch_size = batch_size or settings.retry_claim_batch
+        self._task: Optional[asyncio.Task] = None
+
+    def get_policy(self, platform: Platform) -> RetryPolicy:
+        return self._policies.get(platform) or RetryPolicy()
+
+    def next_attempt_at(
+        self, result: PlatformResult, attempts: int, now: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        """
+        失败结果的下次重试时间；不可重试或已达尝试上限时返回 None。
+
+        attempts 为该发布记录累计的尝试次数；平台给出的 retry_after 比退避时间更长时以其为准。
+        """
+        if result.status != PublishStatus.FAILED:
+            return None
+        if (result.error_category or ErrorCategory.TRANSIENT) not in RETRYABLE_CATEGORIES:
+            return None
+        policy = self.get_policy(result.platform)
+        if attempts >= policy.max_attempts:
+            return None
+        delay = max(policy.delay(attempts), result.retry_after or 0)
+        return (now or datetime.now()) + timedelta(seconds=delay)
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """认领所有到期重试并入队，返回认领的记录数"""
+        total = 0
+        while True:
+            claimed = await claim_due_retries(now=now, limit=self._batch_size)
+            total += claimed
+            if claimed < self._batch_size:
+                break
+        if total:
+            logger.info("到期重试已入队: %d 条发布记录", total)
+            if self._on_enqueued:
+                self._on_enqueued()
+        return total
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("扫描到期重试失败")
+            await asyncio.sleep(self._poll_interval)
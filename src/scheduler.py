@@ -0,0 +1,134 @@
+"""ConcurrencyScheduler - 进程级发布并发调度（按发布方式 + 按平台限流）"""
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from .config import (
+    DEFAULT_METHOD_CONCURRENCY,
+    DEFAULT_PLATFORM_CONCURRENCY,
+    PLATFORM_METHOD_MAP,
+    Platform,
+    PublishMethod,
+    settings,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FifoLimiter:
+    """
+    先进先出的并发限制器。
+
+    与 asyncio.Semaphore 不同，释放时直接把名额移交给队首等待者，
+    新来的请求不能插队，保证公平。
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for w in self._waiters if not w.done())
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 名额已移交但调用方被取消，归还名额
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class ConcurrencyScheduler:
+    """
+    全局并发调度器，由 PublisherHub 持有，所有请求共享。
+
+    - 每种 PublishMethod 一个限制器（如 Playwright 浏览器数、Bridge 并发数）
+    - 每个 Platform 可选一个限制器（如每个视频平台同时只开 1 个浏览器）
+    - 先取平台名额再取方式名额，按固定顺序获取避免死锁，
+      且排队等平台的任务不会占用方式名额
+    """
+
+    def __init__(
+        self,
+        method_limits: Optional[dict[PublishMethod, int]] = None,
+        platform_limits: Optional[dict[Platform, int]] = None,
+    ) -> None:
+        if method_limits is None:
+            method_limits = {
+                **DEFAULT_METHOD_CONCURRENCY,
+                **{PublishMethod(k): v for k, v in settings.scheduler_method_limits.items()},
+            }
+        if platform_limits is None:
+            platform_limits = {
+                **DEFAULT_PLATFORM_CONCURRENCY,
+                **{Platform(k): v for k, v in settings.scheduler_platform_limits.items()},
+            }
+
+        self._method_limiters = {method: FifoLimiter(limit) for method, limit in method_limits.items()}
+        self._platform_limiters = {platform: FifoLimiter(limit) for platform, limit in platform_limits.items()}
+
+    def method_limit(self, method: PublishMethod) -> Optional[int]:
+        limiter = self._method_limiters.get(method)
+        return limiter.limit if limiter else None
+
+    def platform_limit(self, platform: Platform) -> Optional[int]:
+        limiter = self._platform_limiters.get(platform)
+        return limiter.limit if limiter else None
+
+    @asynccontextmanager
+    async def slot(self, *platforms: Platform) -> AsyncIterator[None]:
+        """
+        获取发布名额。
+
+        传入多个平台时（如 Wechatsync 批量同步）一次性获取所有平台名额和对应方式名额。
+        """
+        targets = sorted(set(platforms), key=lambda p: p.value)
+        methods = sorted({PLATFORM_METHOD_MAP[p] for p in targets if p in PLATFORM_METHOD_MAP}, key=lambda m: m.value)
+
+        limiters = [self._platform_limiters[p] for p in targets if p in self._platform_limiters]
+        limiters += [self._method_limiters[m] for m in methods if m in self._method_limiters]
+
+        acquired: list[FifoLimiter] = []
+        try:
+            for limiter in limiters:
+                await limiter.acquire()
+                acquired.append(limiter)
+            yield
+        finally:
+            for limiter in reversed(acquired):
+                limiter.release()
+
+    def snapshot(self) -> dict:
+        """队列深度快照：各限制器的上限、执行中和排队数"""
+
+        def describe(limiter: FifoLimiter) -> dict:
+            return {"limit": limiter.limit, "active": limiter.active, "waiting": limiter.waiting}
+
+        return {
+            "methods": {m.value: describe(l) for m, l in self._method_limiters.items()},
+            "platforms": {p.value: describe(l) for p, l in self._platform_limiters.items()},
+        }
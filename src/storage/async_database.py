@@ -0,0 +1,106 @@
+"""异步存储接口 - 在专用数据库线程池中执行同步 SQLAlchemy 调用，避免提交/fsync 阻塞事件循环"""
+
+import asyncio
+import functools
+import logging
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from ..config import settings
+from . import database
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.db_executor_workers),
+            thread_name_prefix="db",
+        )
+    return _executor
+
+
+async def run_db(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """在数据库线程池中执行同步存储函数"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """关闭数据库线程池（应用关闭时调用，下次使用时自动重建）"""
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def _offload(name: str) -> Callable[..., Awaitable[Any]]:
+    """
+    生成 database.<name> 的异步版本。
+
+    调用时才查找同步实现，测试替换 engine/函数后同样生效。
+    """
+    sync_func = getattr(database, name)
+
+    @functools.wraps(sync_func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await run_db(getattr(database, name), *args, **kwargs)
+
+    return wrapper
+
+
+# 文章与发布记录
+save_article = _offload("save_article")
+save_publish_record = _offload("save_publish_record")
+open_publish_task = _offload("open_publish_task")
+update_publish_record_status = _offload("update_publish_record_status")
+bulk_update_publish_record_status = _offload("bulk_update_publish_record_status")
+get_publish_records = _offload("get_publish_records")
+save_publish_attempts = _offload("save_publish_attempts")
+get_publish_attempts = _offload("get_publish_attempts")
+count_publish_attempts = _offload("count_publish_attempts")
+get_existing_task_id = _offload("get_existing_task_id")
+get_article_by_fingerprint = _offload("get_article_by_fingerprint")
+get_article_content = _offload("get_article_content")
+get_publish_history = _offload("get_publish_history")
+get_publish_history_export_batch = _offload("get_publish_history_export_batch")
+is_duplicate = _offload("is_duplicate")
+
+# 统计
+get_publish_stats = _offload("get_publish_stats")
+
+# 数据保留
+archive_publish_records = _offload("archive_publish_records")
+purge_finished_jobs = _offload("purge_finished_jobs")
+optimize_db = _offload("optimize_db")
+
+# 重试调度
+requeue_publish_records = _offload("requeue_publish_records")
+claim_due_retries = _offload("claim_due_retries")
+
+# 幂等键
+get_idempotency_key = _offload("get_idempotency_key")
+save_idempotency_key = _offload("save_idempotency_key")
+
+# 账号
+update_account_auth = _offload("update_account_auth")
+update_accounts_auth = _offload("update_accounts_auth")
+get_accounts = _offload("get_accounts")
+
+# 任务队列
+enqueue_publish_job = _offload("enqueue_publish_job")
+claim_next_publish_job = _offload("claim_next_publish_job")
+finish_publish_job = _offload("finish_publish_job")
+count_publish_jobs = _offload("count_publish_jobs")
+renew_publish_leases = _offload("renew_publish_leases")
+recover_interrupted_jobs = _offload("recover_interrupted_jobs")
+recover_orphaned_records = _offload("recover_orphaned_records")
+
+# 配额
+get_quota_usage = _offload("get_quota_usage")
+increment_quota_usage = _offload("increment_quota_usage")
@@ -1,14 +1,45 @@
 """SQLAlchemy 数据层 - 发布记录持久化"""
 
+import hashlib
+import json
 import logging
-from datetime import datetime
-from typing import Optional
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
 
-from sqlalchemy import Column, DateTime, Enum, Integer, String, Text, create_engine
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    and_,
+    case,
+    create_engine,
+    event,
+    func,
+    inspect,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
-from ..config import Platform, settings
-from ..models import PublishStatus
+from ..config import settings
+from ..fingerprint import NearDuplicate, NearDuplicateContent, hamming_distance, simhash, simhash_bands
+from ..models import JobStatus, PublishStatus
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +58,37 @@ class ArticleRecord(Base):
     content_fingerprint = Column(String(32), nullable=False, unique=True, index=True)
     content_type = Column(String(20), default="article")
     tags = Column(Text, default="")  # JSON 序列化的标签列表
+    content_hash = Column(String(64), nullable=True, index=True)  # content_blobs.content_hash
+    cover_url = Column(Text, nullable=True)
+    video_path = Column(Text, nullable=True)
+    draft_only = Column(Integer, default=0)  # 0=否, 1=是
+    simhash = Column(BigInteger, nullable=True)  # 正文 64 位 SimHash（按有符号整数存储）
+    archived_task_id = Column(String(12), nullable=True)  # 发布记录全部归档后保留的最近 task_id，继续参与去重
+    created_at = Column(DateTime, default=datetime.now)
+
+
+class ArticleSimhashBand(Base):
+    """SimHash 分段索引（LSH），近似重复查询按段等值命中候选文章"""
+
+    __tablename__ = "article_simhash_bands"
+    __table_args__ = (Index("ix_article_simhash_bands_band_value", "band", "value"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    article_id = Column(Integer, nullable=False, index=True)
+    band = Column(Integer, nullable=False)
+    value = Column(Integer, nullable=False)
+
+
+class ContentBlob(Base):
+    """正文内容表（按内容哈希寻址，压缩存储，多个任务/文章共享同一份正文）"""
+
+    __tablename__ = "content_blobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_hash = Column(String(64), nullable=False, unique=True)  # 正文 UTF-8 的 SHA-256
+    codec = Column(String(10), nullable=False, default="zlib")
+    size = Column(Integer, nullable=False)  # 压缩前字节数
+    payload = Column(LargeBinary, nullable=False)
     created_at = Column(DateTime, default=datetime.now)
 
 
@@ -34,6 +96,15 @@ class PublishRecord(Base):
     """发布记录表"""
 
     __tablename__ = "publish_records"
+    __table_args__ = (
+        # 历史分页按 (created_at, id) 倒序做 keyset 翻页，每种过滤组合一个复合索引
+        Index("ix_publish_records_created_id", "created_at", "id"),
+        Index("ix_publish_records_platform_created_id", "platform", "created_at", "id"),
+        Index("ix_publish_records_status_created_id", "status", "created_at", "id"),
+        Index("ix_publish_records_platform_status_created_id", "platform", "status", "created_at", "id"),
+        # RetryEngine 按 (status, next_attempt_at) 扫描到期的重试
+        Index("ix_publish_records_status_next_attempt", "status", "next_attempt_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     task_id = Column(String(12), nullable=False, index=True)
@@ -43,10 +114,74 @@ class PublishRecord(Base):
     post_url = Column(Text, nullable=True)
     error = Column(Text, nullable=True)
     retries = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, nullable=True)  # retry_scheduled 状态下的下次重试时间
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
 
+class PublishAttemptRecord(Base):
+    """发布尝试明细表（每次尝试的耗时与各阶段耗时）"""
+
+    __tablename__ = "publish_attempts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    record_id = Column(Integer, nullable=False, index=True)  # publish_records.id
+    task_id = Column(String(12), nullable=False, index=True)
+    platform = Column(String(30), nullable=False)
+    attempt = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False)
+    error_category = Column(String(20), nullable=True)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=False)
+    duration_ms = Column(Float, nullable=False)
+    phases = Column(Text, default="{}")  # JSON: 阶段名 → 毫秒
+
+
+class PublishStatsRollup(Base):
+    """发布统计汇总表（按小时/天 × 平台 × 状态，随状态转换增量维护）"""
+
+    __tablename__ = "publish_stats"
+    __table_args__ = (UniqueConstraint("granularity", "bucket_start", "platform", "status"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    granularity = Column(String(10), nullable=False)  # hour / day
+    bucket_start = Column(DateTime, nullable=False)
+    platform = Column(String(30), nullable=False)
+    status = Column(String(20), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    retries = Column(Integer, nullable=False, default=0)
+    latency_ms = Column(Float, nullable=False, default=0)  # 从创建到终态的耗时总和
+
+
+class PublishLatencyHistogram(Base):
+    """发布耗时直方图（按小时/天 × 平台 × 耗时区间）"""
+
+    __tablename__ = "publish_latency_histogram"
+    __table_args__ = (UniqueConstraint("granularity", "bucket_start", "platform", "le_ms"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    granularity = Column(String(10), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    platform = Column(String(30), nullable=False)
+    le_ms = Column(Integer, nullable=False)  # 区间上界（毫秒），LATENCY_BUCKETS_MS 最后一项表示无穷大
+    count = Column(Integer, nullable=False, default=0)
+
+
+class PublishArchive(Base):
+    """发布记录归档表（按月分组，每批记录压缩为一行，含关联文章和尝试明细）"""
+
+    __tablename__ = "publish_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    month = Column(String(7), nullable=False, index=True)  # 2026-01，按记录创建时间
+    record_count = Column(Integer, nullable=False)
+    first_record_id = Column(Integer, nullable=False)
+    last_record_id = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)  # zlib 压缩的 NDJSON
+    archived_at = Column(DateTime, default=datetime.now)
+
+
 class AccountRecord(Base):
     """平台账号记录表"""
 
@@ -60,14 +195,127 @@ class AccountRecord(Base):
     created_at = Column(DateTime, default=datetime.now)
 
 
+class PublishJob(Base):
+    """发布任务队列表（异步模式下由 WorkerPool 消费，多进程/多机通过租约协调）"""
+
+    __tablename__ = "publish_jobs"
+    __table_args__ = (Index("ix_publish_jobs_status_lease", "status", "lease_expires_at"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    task_id = Column(String(12), nullable=False, index=True)
+    payload = Column(Text, nullable=False)  # JSON 序列化的 PublishRequest
+    record_ids = Column(Text, nullable=False)  # JSON 序列化的发布记录 ID 列表（与 platforms 顺序一致）
+    status = Column(String(20), default=JobStatus.QUEUED.value, index=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # 执行中的进程定期刷新
+    lease_owner = Column(String(64), nullable=True)  # 持有租约的实例（主机-进程-随机后缀）
+    lease_expires_at = Column(DateTime, nullable=True)  # 租约到期后任务可被其他实例重新认领
+    reclaims = Column(Integer, nullable=True, default=0)  # 租约过期后被重新认领的次数
+    finished_at = Column(DateTime, nullable=True)
+
+
+class QuotaUsage(Base):
+    """平台配额用量表（按日/按月窗口计数）"""
+
+    __tablename__ = "quota_usage"
+    __table_args__ = (UniqueConstraint("platform", "account", "window", "window_key"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    platform = Column(String(30), nullable=False)
+    account = Column(String(100), nullable=False, default="default")
+    window = Column(String(10), nullable=False)  # day / month
+    window_key = Column(String(10), nullable=False)  # 2026-01-31 / 2026-01
+    used = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class IdempotencyKey(Base):
+    """幂等键表（Idempotency-Key → 首次请求的响应，过期前重复请求直接返回）"""
+
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    key = Column(String(128), nullable=False, unique=True)
+    request_hash = Column(String(64), nullable=False)  # 请求摘要，同一键对应不同请求时拒绝
+    task_id = Column(String(12), nullable=False)
+    response = Column(Text, nullable=False)  # JSON 序列化的 PublishResponse
+    created_at = Column(DateTime, default=datetime.now)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """每个新连接应用 SQLite 生产配置（WAL + 放宽 fsync + 忙等待 + 内存映射/缓存）"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    按配置创建数据库引擎。
+
+    - SQLite 文件库：连接时应用 WAL 等 PRAGMA，连接池按数据库线程数设置
+    - SQLite 内存库：使用 SQLAlchemy 默认的单连接池
+    - 其他数据库：按同样的池大小配置并开启 pre_ping
+    """
+    url = make_url(database_url or settings.database_url)
+    pool_size = settings.db_pool_size or settings.db_executor_workers + 1
+    pool_options = {
+        "pool_size": pool_size,
+        "max_overflow": settings.db_pool_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+
+    if url.get_backend_name() != "sqlite":
+        return create_engine(url, echo=False, pool_pre_ping=True, **pool_options)
+
+    if url.database in (None, "", ":memory:"):
+        new_engine = create_engine(url, echo=False)
+    else:
+        new_engine = create_engine(
+            url,
+            echo=False,
+            connect_args={"timeout": settings.sqlite_busy_timeout_ms / 1000},
+            **pool_options,
+        )
+    event.listen(new_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
+
 # 创建引擎和会话工厂
-engine = create_engine(settings.database_url, echo=False)
+engine = create_db_engine()
 SessionLocal = sessionmaker(bind=engine)
 
 
+def _add_missing_columns() -> None:
+    """为已存在的表补建新增的可空列（只增不改，旧行取 NULL）"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}')
+                logger.info("数据库迁移: %s 新增列 %s", table.name, column.name)
+
+
 def init_db():
-    """初始化数据库（创建表）"""
+    """初始化数据库（创建表，并为已存在的表补建新增列和索引）"""
     Base.metadata.create_all(engine)
+    _add_missing_columns()
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
     logger.info("数据库初始化完成: %s", settings.database_url)
 
 
@@ -125,26 +373,396 @@ def save_publish_record(
         return record.id
 
 
+class OpenedTask(NamedTuple):
+    """open_publish_task() 的结果"""
+
+    task_id: str
+    record_ids: list[int]
+    job_id: Optional[int]
+    duplicate: bool  # True 时 task_id 为已有任务，未创建任何记录
+    near_duplicates: tuple[NearDuplicate, ...] = ()  # 近似重复的已发布文章（按距离升序）
+
+
+def _insert_if_absent(session: Session, model: type[Base], key: str, values: dict) -> bool:
+    """INSERT ... ON CONFLICT DO NOTHING，返回是否插入了新行"""
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else pg_insert
+        stmt = insert(model).values(**values).on_conflict_do_nothing(index_elements=[key])
+        return session.execute(stmt).rowcount == 1
+
+    # 其他数据库退化为 SAVEPOINT + 唯一约束冲突检测
+    try:
+        with session.begin_nested():
+            session.add(model(**values))
+        return True
+    except IntegrityError:
+        return False
+
+
+def _insert_article_if_absent(session: Session, values: dict) -> bool:
+    """文章按指纹 upsert，返回是否插入了新文章"""
+    return _insert_if_absent(session, ArticleRecord, "content_fingerprint", values)
+
+
+def _published_task_id(session: Session, fingerprint: str) -> Optional[str]:
+    """内容最近一次发布的 task_id（发布记录已归档时取文章上保留的 archived_task_id）"""
+    task_id = (
+        session.query(PublishRecord.task_id)
+        .filter_by(article_fingerprint=fingerprint)
+        .order_by(PublishRecord.created_at.desc())
+        .limit(1)
+        .scalar()
+    )
+    if task_id is None:
+        task_id = (
+            session.query(ArticleRecord.archived_task_id).filter_by(content_fingerprint=fingerprint).limit(1).scalar()
+        )
+    return task_id
+
+
+def compute_content_hash(content: str) -> str:
+    """正文内容哈希（content_blobs 的寻址键）"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _put_content_blob(session: Session, content: str) -> str:
+    """压缩写入正文（相同内容只存一份），返回内容哈希"""
+    raw = content.encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+    if session.query(ContentBlob.id).filter_by(content_hash=digest).first() is None:
+        _insert_if_absent(
+            session,
+            ContentBlob,
+            "content_hash",
+            {
+                "content_hash": digest,
+                "codec": "zlib",
+                "size": len(raw),
+                "payload": zlib.compress(raw, settings.content_compression_level),
+            },
+        )
+    return digest
+
+
+def _decode_content_blob(blob: ContentBlob) -> str:
+    if blob.codec != "zlib":
+        raise ValueError(f"不支持的正文压缩格式: {blob.codec}")
+    return zlib.decompress(blob.payload).decode("utf-8")
+
+
+def get_content(content_hash: str) -> Optional[str]:
+    """按内容哈希读取并解压正文"""
+    with get_session() as session:
+        blob = session.query(ContentBlob).filter_by(content_hash=content_hash).first()
+        return _decode_content_blob(blob) if blob else None
+
+
+def get_article_content(fingerprint: str) -> Optional[str]:
+    """按文章指纹读取正文（重试/恢复任务时按需加载），文章或正文不存在时返回 None"""
+    with get_session() as session:
+        blob = (
+            session.query(ContentBlob)
+            .join(ArticleRecord, ArticleRecord.content_hash == ContentBlob.content_hash)
+            .filter(ArticleRecord.content_fingerprint == fingerprint)
+            .first()
+        )
+        return _decode_content_blob(blob) if blob else None
+
+
+def open_publish_task(
+    task_id: str,
+    title: str,
+    fingerprint: str,
+    platforms: list[str],
+    content_type: str = "article",
+    tags: str = "[]",
+    status: str = PublishStatus.PENDING.value,
+    job_payload: Optional[str] = None,
+    job_status: str = JobStatus.QUEUED.value,
+    content: Optional[str] = None,
+    cover_url: Optional[str] = None,
+    video_path: Optional[str] = None,
+    draft_only: bool = False,
+    lease_owner: Optional[str] = None,
+    near_duplicate_distance: Optional[int] = None,
+    reject_near_duplicates: bool = False,
+    legacy_fingerprint: Optional[str] = None,
+) -> OpenedTask:
+    """
+    在一个事务内完成任务登记：去重 + 正文入库 + 文章 upsert + 批量写入各平台发布记录（+ 可选的队列任务）。
+
+    文章指纹（或升级前的旧版指纹 legacy_fingerprint）已存在且有发布记录时视为重复，返回已有 task_id 且不写入任何数据；
+    唯一约束保证两个相同请求并发时只有一个能创建任务。
+    传入 content 时正文压缩存入 content_blobs，重试时按文章指纹读回，队列任务无需携带正文；
+    同时计算正文 SimHash 写入分段索引，给定 near_duplicate_distance 时查找近似重复的已发布文章，
+    reject_near_duplicates 为 True 且存在近似重复时抛出 NearDuplicateContent，不写入任何数据。
+    job_status 为 running（同步发布）时任务直接由 lease_owner 持有租约。
+    """
+    with get_session() as session:
+        if legacy_fingerprint and legacy_fingerprint != fingerprint:
+            legacy_task_id = _published_task_id(session, legacy_fingerprint)
+            if legacy_task_id:
+                logger.info("内容已按旧版指纹发布过（指纹: %s）", legacy_fingerprint)
+                return OpenedTask(task_id=legacy_task_id, record_ids=[], job_id=None, duplicate=True)
+
+        article = {
+            "title": title,
+            "content_fingerprint": fingerprint,
+            "content_type": content_type,
+            "tags": tags,
+            "cover_url": cover_url,
+            "video_path": video_path,
+            "draft_only": int(draft_only),
+        }
+        if content is not None:
+            article["content_hash"] = _put_content_blob(session, content)
+        inserted = _insert_article_if_absent(session, article)
+        if not inserted:
+            existing_task_id = _published_task_id(session, fingerprint)
+            if existing_task_id:
+                session.rollback()
+                return OpenedTask(task_id=existing_task_id, record_ids=[], job_id=None, duplicate=True)
+            logger.info("文章已存在（指纹: %s），但无发布记录，继续创建任务", fingerprint)
+            if content is not None:
+                session.query(ArticleRecord).filter_by(content_fingerprint=fingerprint).update(
+                    {k: v for k, v in article.items() if k not in ("content_fingerprint",)},
+                    synchronize_session=False,
+                )
+
+        near_duplicates = []
+        if content is not None:
+            signature = simhash(content)
+            if near_duplicate_distance is not None:
+                near_duplicates = _find_near_duplicates(session, signature, near_duplicate_distance, fingerprint)
+                if near_duplicates and reject_near_duplicates:
+                    session.rollback()
+                    raise NearDuplicateContent(near_duplicates)
+            article_id = session.query(ArticleRecord.id).filter_by(content_fingerprint=fingerprint).scalar()
+            _index_simhash(session, article_id, signature)
+
+        records = [
+            PublishRecord(task_id=task_id, article_fingerprint=fingerprint, platform=platform, status=status)
+            for platform in platforms
+        ]
+        session.add_all(records)
+        session.flush()
+        record_ids = [r.id for r in records]
+
+        job_id = None
+        if job_payload is not None:
+            job = PublishJob(
+                task_id=task_id,
+                payload=job_payload,
+                record_ids=json.dumps(record_ids),
+                status=job_status,
+            )
+            if job_status == JobStatus.RUNNING.value:
+                now = datetime.now()
+                job.started_at = job.heartbeat_at = now
+                job.lease_owner = lease_owner
+                job.lease_expires_at = now + timedelta(seconds=settings.job_lease_ttl)
+            session.add(job)
+            session.flush()
+            job_id = job.id
+
+        session.commit()
+        return OpenedTask(
+            task_id=task_id,
+            record_ids=record_ids,
+            job_id=job_id,
+            duplicate=False,
+            near_duplicates=tuple(near_duplicates),
+        )
+
+
+def _to_signed64(value: int) -> int:
+    """无符号 64 位 SimHash 转为有符号整数（SQLite INTEGER / BIGINT 均为有符号）"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _index_simhash(session: Session, article_id: int, signature: int) -> None:
+    """写入文章的 SimHash 及其分段索引（覆盖旧值）"""
+    session.query(ArticleRecord).filter_by(id=article_id).update(
+        {"simhash": _to_signed64(signature)}, synchronize_session=False
+    )
+    session.query(ArticleSimhashBand).filter_by(article_id=article_id).delete(synchronize_session=False)
+    session.add_all(
+        ArticleSimhashBand(article_id=article_id, band=band, value=value)
+        for band, value in enumerate(simhash_bands(signature, settings.simhash_bands))
+    )
+
+
+def _find_near_duplicates(
+    session: Session, signature: int, max_distance: int, exclude_fingerprint: Optional[str] = None, limit: int = 5
+) -> list[NearDuplicate]:
+    """
+    按分段索引查找汉明距离不超过 max_distance 的文章（按距离升序）。
+
+    只比较至少有一段完全相同的候选，查询代价与候选数量相关而与文章总数无关；
+    max_distance 小于分段数时不会漏检。
+    """
+    band_matches = or_(
+        *(
+            and_(ArticleSimhashBand.band == band, ArticleSimhashBand.value == value)
+            for band, value in enumerate(simhash_bands(signature, settings.simhash_bands))
+        )
+    )
+    candidates = select(ArticleSimhashBand.article_id).where(band_matches).distinct()
+    query = session.query(ArticleRecord.content_fingerprint, ArticleRecord.title, ArticleRecord.simhash).filter(
+        ArticleRecord.id.in_(candidates)
+    )
+    if exclude_fingerprint is not None:
+        query = query.filter(ArticleRecord.content_fingerprint != exclude_fingerprint)
+
+    matches = []
+    for fingerprint, title, stored in query:
+        distance = hamming_distance(signature, stored & ((1 << 64) - 1))
+        if distance <= max_distance:
+            matches.append((distance, fingerprint, title))
+    matches.sort()
+
+    near_duplicates = []
+    for distance, fingerprint, title in matches[:limit]:
+        task_id = _published_task_id(session, fingerprint)
+        near_duplicates.append(NearDuplicate(fingerprint=fingerprint, title=title, task_id=task_id, distance=distance))
+    return near_duplicates
+
+
+def rebuild_simhash_index(batch_size: int = 500) -> int:
+    """
+    根据 content_blobs 中的正文重建所有文章的 SimHash 分段索引（回填历史文章、修改分段数后使用）。
+
+    无正文的文章（正文存储上线前的记录）跳过，返回建立索引的文章数。
+    """
+    indexed = 0
+    last_id = 0
+    while True:
+        with get_session() as session:
+            rows = (
+                session.query(ArticleRecord.id, ContentBlob)
+                .join(ContentBlob, ContentBlob.content_hash == ArticleRecord.content_hash)
+                .filter(ArticleRecord.id > last_id)
+                .order_by(ArticleRecord.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return indexed
+            for article_id, blob in rows:
+                _index_simhash(session, article_id, simhash(_decode_content_blob(blob)))
+            session.commit()
+
+        indexed += len(rows)
+        last_id = rows[-1][0]
+        logger.info("SimHash 索引回填进度: %d 篇", indexed)
+
+
 def update_publish_record_status(
     record_id: int,
     status: str,
     post_url: Optional[str] = None,
     error: Optional[str] = None,
     retries: int = 0,
+    next_attempt_at: Optional[datetime] = None,
 ):
-    """更新发布记录状态"""
-    with get_session() as session:
-        record = session.query(PublishRecord).filter_by(id=record_id).first()
-        if record:
-            record.status = status
-            record.updated_at = datetime.now()
-            if post_url is not None:
-                record.post_url = post_url
-            if error is not None:
-                record.error = error
-            if retries:
-                record.retries = retries
-            session.commit()
+    """更新发布记录状态（next_attempt_at 仅 retry_scheduled 时有值，其余状态清空）"""
+    values = {"status": status, "updated_at": datetime.now(), "next_attempt_at": next_attempt_at}
+    if post_url is not None:
+        values["post_url"] = post_url
+    if error is not None:
+        values["error"] = error
+    if retries:
+        values["retries"] = retries
+    bulk_update_publish_record_status({record_id: values})
+
+
+def bulk_update_publish_record_status(updates: dict[int, dict]) -> int:
+    """
+    在一个事务内批量更新发布记录（StatusWriteBuffer 刷盘使用）。
+
+    updates: record_id → 需要更新的字段，返回实际更新的行数。
+    进入/离开终态的记录同时增量更新统计汇总表。
+    """
+    if not updates:
+        return 0
+    with get_session() as session:
+        updated = _apply_record_updates(session, updates)
+        session.commit()
+    return updated
+
+
+def _apply_record_updates(session: Session, updates: dict[int, dict]) -> int:
+    """在当前事务内更新发布记录并维护统计汇总表（不提交）"""
+    updated = 0
+    previous = {
+        row.id: row
+        for row in session.query(
+            PublishRecord.id,
+            PublishRecord.platform,
+            PublishRecord.status,
+            PublishRecord.retries,
+            PublishRecord.created_at,
+            PublishRecord.updated_at,
+        ).filter(PublishRecord.id.in_(list(updates)))
+    }
+
+    deltas = _StatsDeltas()
+    for record_id, values in updates.items():
+        updated += session.query(PublishRecord).filter_by(id=record_id).update(values, synchronize_session=False)
+        old = previous.get(record_id)
+        if old is None:
+            continue
+        # 统计只反映记录的当前终态：离开旧终态时扣减，进入新终态时累加
+        deltas.add(old.platform, old.status, old.retries, old.created_at, old.updated_at, sign=-1)
+        deltas.add(
+            old.platform,
+            values.get("status", old.status),
+            values.get("retries", old.retries),
+            old.created_at,
+            values.get("updated_at", old.updated_at),
+            sign=1,
+        )
+
+    deltas.apply(session)
+    return updated
+
+
+def save_publish_attempts(attempts: list[dict]) -> None:
+    """批量写入发布尝试明细（phases 为 dict，自动序列化）"""
+    if not attempts:
+        return
+    with get_session() as session:
+        session.add_all(
+            PublishAttemptRecord(**{**a, "phases": json.dumps(a.get("phases") or {})}) for a in attempts
+        )
+        session.commit()
+
+
+def get_publish_attempts(task_id: str) -> list[PublishAttemptRecord]:
+    """获取任务的所有发布尝试，按记录和尝试次数排序"""
+    with get_session() as session:
+        attempts = (
+            session.query(PublishAttemptRecord)
+            .filter_by(task_id=task_id)
+            .order_by(PublishAttemptRecord.record_id, PublishAttemptRecord.id)
+            .all()
+        )
+        session.expunge_all()
+        return attempts
+
+
+def count_publish_attempts(record_ids: list[int]) -> dict[int, int]:
+    """各发布记录已进行的尝试次数（跨多次执行累计）"""
+    if not record_ids:
+        return {}
+    with get_session() as session:
+        rows = (
+            session.query(PublishAttemptRecord.record_id, func.count(PublishAttemptRecord.id))
+            .filter(PublishAttemptRecord.record_id.in_(record_ids))
+            .group_by(PublishAttemptRecord.record_id)
+        )
+        return {record_id: count for record_id, count in rows}
 
 
 def get_publish_records(task_id: str) -> list[PublishRecord]:
@@ -157,15 +775,9 @@ def get_publish_records(task_id: str) -> list[PublishRecord]:
 
 
 def get_existing_task_id(fingerprint: str) -> Optional[str]:
-    """根据内容指纹查找最近一次的 task_id"""
+    """根据内容指纹查找最近一次的 task_id（含已归档的发布）"""
     with get_session() as session:
-        record = (
-            session.query(PublishRecord)
-            .filter_by(article_fingerprint=fingerprint)
-            .order_by(PublishRecord.created_at.desc())
-            .first()
-        )
-        return record.task_id if record else None
+        return _published_task_id(session, fingerprint)
 
 
 def get_article_by_fingerprint(fingerprint: str) -> Optional[ArticleRecord]:
@@ -177,13 +789,62 @@ def get_article_by_fingerprint(fingerprint: str) -> Optional[ArticleRecord]:
         return article
 
 
+def encode_history_cursor(record: PublishRecord) -> str:
+    """把记录的 (created_at, id) 编码为翻页游标"""
+    return f"{record.created_at.isoformat()},{record.id}"
+
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, int]:
+    """解析翻页游标，格式错误时抛出 ValueError"""
+    created_at, _, record_id = cursor.rpartition(",")
+    return datetime.fromisoformat(created_at), int(record_id)
+
+
+_history_total_cache: dict[tuple, tuple[int, float]] = {}
+_history_total_lock = threading.Lock()
+
+
+def count_publish_history(platform: Optional[str] = None, status: Optional[str] = None) -> int:
+    """
+    统计发布历史总数。
+
+    结果按过滤条件缓存 history_total_cache_ttl 秒（近似值），深翻页时不再每次全表 COUNT。
+    """
+    key = (str(engine.url), platform, status)
+    now = time.monotonic()
+    with _history_total_lock:
+        cached = _history_total_cache.get(key)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    with get_session() as session:
+        query = session.query(PublishRecord)
+        if platform:
+            query = query.filter_by(platform=platform)
+        if status:
+            query = query.filter_by(status=status)
+        total = query.count()
+
+    with _history_total_lock:
+        _history_total_cache[key] = (total, now + settings.history_total_cache_ttl)
+    return total
+
+
 def get_publish_history(
     page: int = 1,
     size: int = 20,
     platform: Optional[str] = None,
     status: Optional[str] = None,
-) -> tuple[list[PublishRecord], int]:
-    """分页查询发布历史"""
+    after: Optional[str] = None,
+    with_total: bool = True,
+) -> tuple[list[PublishRecord], Optional[int]]:
+    """
+    分页查询发布历史（按创建时间倒序）。
+
+    传入 after 游标（上一页最后一条的 encode_history_cursor）时使用 keyset 翻页，
+    忽略 page，耗时与翻页深度无关；否则按 page 做 OFFSET 翻页。
+    with_total=False 时不统计总数，返回 None。
+    """
     with get_session() as session:
         query = session.query(PublishRecord)
         if platform:
@@ -191,21 +852,101 @@ def get_publish_history(
         if status:
             query = query.filter_by(status=status)
 
-        total = query.count()
-        records = (
-            query.order_by(PublishRecord.created_at.desc())
-            .offset((page - 1) * size)
-            .limit(size)
-            .all()
-        )
+        query = query.order_by(PublishRecord.created_at.desc(), PublishRecord.id.desc())
+        if after:
+            created_at, record_id = decode_history_cursor(after)
+            query = query.filter(
+                or_(
+                    PublishRecord.created_at < created_at,
+                    and_(PublishRecord.created_at == created_at, PublishRecord.id < record_id),
+                )
+            )
+        else:
+            query = query.offset((page - 1) * size)
+
+        records = query.limit(size).all()
         session.expunge_all()
-        return records, total
 
+    total = count_publish_history(platform=platform, status=status) if with_total else None
+    return records, total
+
+
+EXPORT_COLUMNS = (
+    "id",
+    "task_id",
+    "platform",
+    "status",
+    "post_url",
+    "error",
+    "retries",
+    "created_at",
+    "updated_at",
+    "article_fingerprint",
+    "title",
+    "tags",
+)
+
+
+def get_publish_history_export_batch(
+    after: Optional[tuple[datetime, int]] = None,
+    limit: int = 1000,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    platform: Optional[str] = None,
+    status: Optional[str] = None,
+) -> list[tuple]:
+    """
+    导出用的一批发布记录（关联文章标题/标签），按 (created_at, id) 正序。
+
+    返回轻量的行元组（字段顺序见 EXPORT_COLUMNS），不构造 ORM 对象；
+    after 为上一批最后一行的 (created_at, id)，每批独立短事务，不长期占用读快照。
+    """
+    stmt = (
+        select(
+            PublishRecord.id,
+            PublishRecord.task_id,
+            PublishRecord.platform,
+            PublishRecord.status,
+            PublishRecord.post_url,
+            PublishRecord.error,
+            PublishRecord.retries,
+            PublishRecord.created_at,
+            PublishRecord.updated_at,
+            PublishRecord.article_fingerprint,
+            ArticleRecord.title,
+            ArticleRecord.tags,
+        )
+        .outerjoin(ArticleRecord, ArticleRecord.content_fingerprint == PublishRecord.article_fingerprint)
+        .order_by(PublishRecord.created_at, PublishRecord.id)
+        .limit(limit)
+    )
+    if start:
+        stmt = stmt.where(PublishRecord.created_at >= start)
+    if end:
+        stmt = stmt.where(PublishRecord.created_at < end)
+    if platform:
+        stmt = stmt.where(PublishRecord.platform == platform)
+    if status:
+        stmt = stmt.where(PublishRecord.status == status)
+    if after:
+        created_at, record_id = after
+        stmt = stmt.where(
+            or_(
+                PublishRecord.created_at > created_at,
+                and_(PublishRecord.created_at == created_at, PublishRecord.id > record_id),
+            )
+        )
 
-def is_duplicate(fingerprint: str) -> bool:
-    """检查内容是否已发布（去重）"""
     with get_session() as session:
-        return session.query(ArticleRecord).filter_by(content_fingerprint=fingerprint).first() is not None
+        return [tuple(row) for row in session.execute(stmt)]
+
+
+def is_duplicate(fingerprint: str, legacy_fingerprint: Optional[str] = None) -> bool:
+    """检查内容是否已发布（去重），传入 legacy_fingerprint 时同时匹配升级前的旧版指纹"""
+    fingerprints = [fingerprint] + ([legacy_fingerprint] if legacy_fingerprint else [])
+    with get_session() as session:
+        query = session.query(ArticleRecord.id).filter(ArticleRecord.content_fingerprint.in_(fingerprints))
+        return query.first() is not None
 
 
 def update_account_auth(platform: str, is_authenticated: bool, display_name: Optional[str] = None):
@@ -226,3 +967,833 @@ def update_account_auth(platform: str, is_authenticated: bool, display_name: Opt
             )
             session.add(account)
         session.commit()
+
+
+def update_accounts_auth(statuses: dict[str, bool]) -> None:
+    """一次事务批量更新多个平台的认证状态（认证状态探测后调用）"""
+    now = datetime.now()
+    with get_session() as session:
+        accounts = {
+            a.platform: a for a in session.query(AccountRecord).filter(AccountRecord.platform.in_(list(statuses)))
+        }
+        for platform, is_authenticated in statuses.items():
+            account = accounts.get(platform)
+            if account is None:
+                account = AccountRecord(platform=platform)
+                session.add(account)
+            account.is_authenticated = 1 if is_authenticated else 0
+            account.last_checked_at = now
+        session.commit()
+
+
+def get_accounts() -> list[AccountRecord]:
+    """获取所有平台账号的认证状态"""
+    with get_session() as session:
+        return session.query(AccountRecord).all()
+
+
+# ============================================================
+# 发布统计汇总
+# ============================================================
+
+TERMINAL_STATUSES = frozenset(
+    {PublishStatus.PUBLISHED.value, PublishStatus.DRAFT_SAVED.value, PublishStatus.FAILED.value}
+)
+STATS_GRANULARITIES = ("hour", "day")
+# 耗时直方图区间上界（毫秒），最后一项兜底
+LATENCY_BUCKETS_MS = (1_000, 5_000, 15_000, 30_000, 60_000, 120_000, 300_000, 600_000, 2_147_483_647)
+
+
+def _bucket_start(moment: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _latency_bucket(latency_ms: float) -> int:
+    for upper in LATENCY_BUCKETS_MS:
+        if latency_ms <= upper:
+            return upper
+    return LATENCY_BUCKETS_MS[-1]
+
+
+class _StatsDeltas:
+    """一次事务内的统计增量，先在内存合并再逐键 upsert"""
+
+    def __init__(self) -> None:
+        self.rollups: dict[tuple, list[float]] = {}  # key → [count, retries, latency_ms]
+        self.histogram: dict[tuple, int] = {}
+
+    def add(
+        self,
+        platform: str,
+        status: Optional[str],
+        retries: Optional[int],
+        created_at: Optional[datetime],
+        finished_at: Optional[datetime],
+        sign: int = 1,
+    ) -> None:
+        if status not in TERMINAL_STATUSES or created_at is None or finished_at is None:
+            return
+        latency_ms = max(0.0, (finished_at - created_at).total_seconds() * 1000)
+        le_ms = _latency_bucket(latency_ms)
+        for granularity in STATS_GRANULARITIES:
+            bucket = _bucket_start(finished_at, granularity)
+            totals = self.rollups.setdefault((granularity, bucket, platform, status), [0, 0, 0.0])
+            totals[0] += sign
+            totals[1] += sign * (retries or 0)
+            totals[2] += sign * latency_ms
+            key = (granularity, bucket, platform, le_ms)
+            self.histogram[key] = self.histogram.get(key, 0) + sign
+
+    def apply(self, session: Session) -> None:
+        for (granularity, bucket, platform, status), (count, retries, latency_ms) in self.rollups.items():
+            if count or retries or latency_ms:
+                _upsert_increment(
+                    session,
+                    PublishStatsRollup,
+                    {"granularity": granularity, "bucket_start": bucket, "platform": platform, "status": status},
+                    {"count": count, "retries": retries, "latency_ms": latency_ms},
+                )
+        for (granularity, bucket, platform, le_ms), count in self.histogram.items():
+            if count:
+                _upsert_increment(
+                    session,
+                    PublishLatencyHistogram,
+                    {"granularity": granularity, "bucket_start": bucket, "platform": platform, "le_ms": le_ms},
+                    {"count": count},
+                )
+
+
+def _upsert_increment(
+    session: Session, model, keys: dict, increments: dict, assignments: Optional[dict] = None
+) -> None:
+    """INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col（assignments 中的列直接赋值）"""
+    assignments = assignments or {}
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else pg_insert
+        stmt = insert(model).values(**keys, **increments, **assignments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={
+                **{col: getattr(model, col) + stmt.excluded[col] for col in increments},
+                **{col: stmt.excluded[col] for col in assignments},
+            },
+        )
+        session.execute(stmt)
+        return
+
+    row = session.query(model).filter_by(**keys).with_for_update().first()
+    if row is None:
+        session.add(model(**keys, **increments, **assignments))
+    else:
+        for col, value in increments.items():
+            setattr(row, col, getattr(row, col) + value)
+        for col, value in assignments.items():
+            setattr(row, col, value)
+
+
+def get_publish_stats(
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    platform: Optional[str] = None,
+) -> tuple[list[PublishStatsRollup], list[PublishLatencyHistogram]]:
+    """读取时间范围内的汇总行和耗时直方图（行数只与区间数 × 平台数相关）"""
+    with get_session() as session:
+        rollups = session.query(PublishStatsRollup).filter_by(granularity=granularity)
+        histogram = session.query(PublishLatencyHistogram).filter_by(granularity=granularity)
+        if start:
+            rollups = rollups.filter(PublishStatsRollup.bucket_start >= _bucket_start(start, granularity))
+            histogram = histogram.filter(PublishLatencyHistogram.bucket_start >= _bucket_start(start, granularity))
+        if end:
+            rollups = rollups.filter(PublishStatsRollup.bucket_start < end)
+            histogram = histogram.filter(PublishLatencyHistogram.bucket_start < end)
+        if platform:
+            rollups = rollups.filter_by(platform=platform)
+            histogram = histogram.filter_by(platform=platform)
+
+        result = (
+            rollups.filter(PublishStatsRollup.count != 0).order_by(PublishStatsRollup.bucket_start).all(),
+            histogram.filter(PublishLatencyHistogram.count != 0).order_by(PublishLatencyHistogram.bucket_start).all(),
+        )
+        session.expunge_all()
+        return result
+
+
+def rebuild_publish_stats(batch_size: int = 5000) -> int:
+    """
+    清空并根据 publish_records 和 publish_archive 重新计算统计汇总（回填历史数据用），返回计入的记录数。
+
+    整个重建在一个事务内完成：先清空汇总表并取得写锁，重建期间的状态变更等本事务提交后
+    再增量更新，不会与扫描重复计数；扫描范围固定为开始时的最大记录 id，按 id 分批读取只为控制内存。
+    提交前统计接口读到的仍是重建前的完整数据。
+    """
+    with get_session() as session:
+        if session.get_bind().dialect.name == "postgresql":
+            # 阻塞并发的记录状态更新（允许读），SQLite 下清空汇总表时已持有库级写锁
+            session.execute(text("LOCK TABLE publish_records IN SHARE MODE"))
+        session.query(PublishStatsRollup).delete(synchronize_session=False)
+        session.query(PublishLatencyHistogram).delete(synchronize_session=False)
+        max_id = session.query(func.max(PublishRecord.id)).scalar() or 0
+
+        deltas = _StatsDeltas()
+        counted = 0
+        last_id = 0
+        while last_id < max_id:
+            rows = (
+                session.query(
+                    PublishRecord.id,
+                    PublishRecord.platform,
+                    PublishRecord.status,
+                    PublishRecord.retries,
+                    PublishRecord.created_at,
+                    PublishRecord.updated_at,
+                )
+                .filter(
+                    PublishRecord.id > last_id,
+                    PublishRecord.id <= max_id,
+                    PublishRecord.status.in_(TERMINAL_STATUSES),
+                )
+                .order_by(PublishRecord.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            for row in rows:
+                deltas.add(row.platform, row.status, row.retries, row.created_at, row.updated_at)
+            counted += len(rows)
+            last_id = rows[-1].id
+            logger.info("统计回填进度: %d 条", counted)
+
+        # 已归档的记录不在 publish_records 中，从归档批次补回，保留期之外的历史统计不丢失
+        for (payload,) in session.query(PublishArchive.payload).order_by(PublishArchive.id).yield_per(50):
+            for line in zlib.decompress(payload).decode("utf-8").splitlines():
+                row = json.loads(line)
+                deltas.add(
+                    row["platform"],
+                    row["status"],
+                    row["retries"],
+                    datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
+                    datetime.fromisoformat(row["updated_at"]) if row["updated_at"] else None,
+                )
+                counted += 1
+
+        deltas.apply(session)
+        session.commit()
+        return counted
+
+
+# ============================================================
+# 数据保留与归档
+# ============================================================
+
+
+def _archive_row(record: PublishRecord, article: Optional[ArticleRecord], attempts: list[PublishAttemptRecord]) -> dict:
+    def iso(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+
+    return {
+        "id": record.id,
+        "task_id": record.task_id,
+        "article_fingerprint": record.article_fingerprint,
+        "platform": record.platform,
+        "status": record.status,
+        "post_url": record.post_url,
+        "error": record.error,
+        "retries": record.retries,
+        "created_at": iso(record.created_at),
+        "updated_at": iso(record.updated_at),
+        "article": {
+            "title": article.title,
+            "content_type": article.content_type,
+            "tags": article.tags,
+            "content_hash": article.content_hash,
+            "cover_url": article.cover_url,
+            "video_path": article.video_path,
+            "draft_only": bool(article.draft_only),
+            "created_at": iso(article.created_at),
+        }
+        if article
+        else None,
+        "attempts": [
+            {
+                "attempt": a.attempt,
+                "status": a.status,
+                "error_category": a.error_category,
+                "error": a.error,
+                "started_at": iso(a.started_at),
+                "finished_at": iso(a.finished_at),
+                "duration_ms": a.duration_ms,
+                "phases": json.loads(a.phases or "{}"),
+            }
+            for a in attempts
+        ],
+    }
+
+
+def archive_publish_records(cutoff: datetime, batch_size: int = 500) -> int:
+    """
+    把一批创建于 cutoff 之前的终态发布记录移入 publish_archive，返回归档条数（0 表示已无可归档数据）。
+
+    - 每次只处理 batch_size 条、一个短事务，不长时间占用写锁
+    - 关联的尝试明细随记录一起归档删除；不再被任何记录引用的旧文章保留指纹和 SimHash 索引，
+      记下最近的 task_id（archived_task_id），超出保留期的内容仍参与精确去重和近似重复检测
+    - 统计汇总表不受影响，rebuild_publish_stats() 重建时会从归档中补回这些记录
+    """
+    with get_session() as session:
+        records = (
+            session.query(PublishRecord)
+            .filter(PublishRecord.created_at < cutoff, PublishRecord.status.in_(TERMINAL_STATUSES))
+            .order_by(PublishRecord.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not records:
+            return 0
+
+        record_ids = [r.id for r in records]
+        fingerprints = {r.article_fingerprint for r in records}
+        articles = {
+            a.content_fingerprint: a
+            for a in session.query(ArticleRecord).filter(ArticleRecord.content_fingerprint.in_(fingerprints))
+        }
+        attempts: dict[int, list[PublishAttemptRecord]] = {}
+        for a in (
+            session.query(PublishAttemptRecord)
+            .filter(PublishAttemptRecord.record_id.in_(record_ids))
+            .order_by(PublishAttemptRecord.id)
+        ):
+            attempts.setdefault(a.record_id, []).append(a)
+
+        by_month: dict[str, list[PublishRecord]] = {}
+        for record in records:
+            by_month.setdefault(record.created_at.strftime("%Y-%m"), []).append(record)
+        for month, group in by_month.items():
+            lines = (
+                json.dumps(
+                    _archive_row(r, articles.get(r.article_fingerprint), attempts.get(r.id, [])), ensure_ascii=False
+                )
+                for r in group
+            )
+            session.add(
+                PublishArchive(
+                    month=month,
+                    record_count=len(group),
+                    first_record_id=group[0].id,
+                    last_record_id=group[-1].id,
+                    payload=zlib.compress("\n".join(lines).encode("utf-8"), 6),
+                )
+            )
+
+        session.query(PublishAttemptRecord).filter(PublishAttemptRecord.record_id.in_(record_ids)).delete(
+            synchronize_session=False
+        )
+        session.query(PublishRecord).filter(PublishRecord.id.in_(record_ids)).delete(synchronize_session=False)
+
+        still_referenced = {
+            fp
+            for (fp,) in session.query(PublishRecord.article_fingerprint)
+            .filter(PublishRecord.article_fingerprint.in_(fingerprints))
+            .distinct()
+        }
+        latest_task_ids = {r.article_fingerprint: r.task_id for r in sorted(records, key=lambda r: r.created_at)}
+        for fp, article in articles.items():
+            if fp not in still_referenced:
+                article.archived_task_id = latest_task_ids[fp]
+
+        session.commit()
+        return len(records)
+
+
+def purge_finished_jobs(cutoff: datetime, batch_size: int = 500) -> int:
+    """删除一批 cutoff 之前已结束的队列任务（纯调度数据，不归档），返回删除条数"""
+    with get_session() as session:
+        job_ids = [
+            job_id
+            for (job_id,) in session.query(PublishJob.id)
+            .filter(
+                PublishJob.status.in_([JobStatus.DONE.value, JobStatus.FAILED.value]),
+                PublishJob.finished_at < cutoff,
+            )
+            .limit(batch_size)
+        ]
+        if job_ids:
+            session.query(PublishJob).filter(PublishJob.id.in_(job_ids)).delete(synchronize_session=False)
+            session.commit()
+        return len(job_ids)
+
+
+def read_publish_archive(month: str) -> list[dict]:
+    """读取某月归档的发布记录（解压后的字典列表，按记录 id 排序）"""
+    with get_session() as session:
+        batches = session.query(PublishArchive).filter_by(month=month).order_by(PublishArchive.first_record_id).all()
+        rows = []
+        for batch in batches:
+            rows.extend(json.loads(line) for line in zlib.decompress(batch.payload).decode("utf-8").splitlines())
+        return rows
+
+
+def optimize_db() -> None:
+    """归档后整理数据库：SQLite 下刷新查询规划统计并把 WAL 合并回主库，释放的页供后续写入复用"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA optimize")
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(PASSIVE)")
+
+
+# ============================================================
+# 重试调度
+# ============================================================
+
+
+def _retry_job_payload(article: ArticleRecord, platforms: list[str]) -> str:
+    """由文章元数据重建队列任务的请求（不含正文，执行时按指纹从 content_blobs 读回）"""
+    try:
+        tags = json.loads(article.tags) if article.tags else []
+    except ValueError:
+        tags = []
+    return json.dumps(
+        {
+            "title": article.title,
+            "platforms": platforms,
+            "content_type": article.content_type,
+            "tags": tags,
+            "cover_url": article.cover_url,
+            "draft_only": bool(article.draft_only),
+            "video_path": article.video_path,
+            "content_fingerprint": article.content_fingerprint,
+        },
+        ensure_ascii=False,
+    )
+
+
+def _requeue(session: Session, task_id: str, records: list[PublishRecord], now: datetime) -> Optional[int]:
+    """
+    把同一任务的若干发布记录重置为 pending 并写入一条队列任务（不提交），返回 job_id。
+
+    文章正文不存在（旧数据或已归档）时无法重新发布，记录直接标记为失败，返回 None。
+    """
+    fingerprint = records[0].article_fingerprint
+    article = session.query(ArticleRecord).filter_by(content_fingerprint=fingerprint).first()
+    if article is None or not article.content_hash:
+        logger.error("找不到文章正文，无法重试（指纹: %s）", fingerprint)
+        failed = {
+            "status": PublishStatus.FAILED.value,
+            "next_attempt_at": None,
+            "updated_at": now,
+            "error": "找不到文章正文，无法重试",
+        }
+        _apply_record_updates(session, {r.id: dict(failed) for r in records})
+        return None
+
+    record_ids = [r.id for r in records]
+    _apply_record_updates(
+        session,
+        {
+            rid: {"status": PublishStatus.PENDING.value, "next_attempt_at": None, "updated_at": now}
+            for rid in record_ids
+        },
+    )
+    job = PublishJob(
+        task_id=task_id,
+        payload=_retry_job_payload(article, [r.platform for r in records]),
+        record_ids=json.dumps(record_ids),
+        status=JobStatus.QUEUED.value,
+    )
+    session.add(job)
+    session.flush()
+    return job.id
+
+
+def requeue_publish_records(task_id: str, record_ids: list[int]) -> Optional[int]:
+    """手动重试：把指定发布记录重新入队（一个事务），返回 job_id；无法重试时返回 None"""
+    with get_session() as session:
+        records = (
+            session.query(PublishRecord)
+            .filter(PublishRecord.task_id == task_id, PublishRecord.id.in_(record_ids))
+            .order_by(PublishRecord.id)
+            .all()
+        )
+        if not records:
+            return None
+        job_id = _requeue(session, task_id, records, datetime.now())
+        session.commit()
+        return job_id
+
+
+def claim_due_retries(now: Optional[datetime] = None, limit: int = 50) -> int:
+    """
+    认领一批到期的 retry_scheduled 记录，按任务合并为队列任务，返回认领的记录数。
+
+    逐条条件更新（status 仍为 retry_scheduled 才生效），多个进程同时扫描时每条记录只会被认领一次。
+    """
+    now = now or datetime.now()
+    scheduled = PublishStatus.RETRY_SCHEDULED.value
+    with get_session() as session:
+        due = (
+            session.query(PublishRecord)
+            .filter(PublishRecord.status == scheduled, PublishRecord.next_attempt_at <= now)
+            .order_by(PublishRecord.next_attempt_at, PublishRecord.id)
+            .limit(limit)
+            .all()
+        )
+        by_task: dict[str, list[PublishRecord]] = {}
+        for record in due:
+            claimed = (
+                session.query(PublishRecord)
+                .filter_by(id=record.id, status=scheduled)
+                .update({"status": PublishStatus.PENDING.value}, synchronize_session=False)
+            )
+            if claimed:
+                by_task.setdefault(record.task_id, []).append(record)
+
+        for task_id, records in by_task.items():
+            _requeue(session, task_id, records, now)
+        session.commit()
+        return sum(len(records) for records in by_task.values())
+
+
+# ============================================================
+# 幂等键
+# ============================================================
+
+
+def get_idempotency_key(key: str, now: Optional[datetime] = None) -> Optional[IdempotencyKey]:
+    """查询未过期的幂等键"""
+    with get_session() as session:
+        record = (
+            session.query(IdempotencyKey)
+            .filter(IdempotencyKey.key == key, IdempotencyKey.expires_at > (now or datetime.now()))
+            .first()
+        )
+        if record is not None:
+            session.expunge(record)
+        return record
+
+
+def save_idempotency_key(
+    key: str,
+    request_hash: str,
+    task_id: str,
+    response: str,
+    expires_at: datetime,
+    purge_batch: int = 100,
+) -> bool:
+    """
+    保存幂等键，返回是否写入。
+
+    同一键已有未过期记录时保留先写入的（并发的相同请求以先完成者为准）；
+    写入时顺带清理一批已过期的键，表规模随 TTL 保持稳定。
+    """
+    now = datetime.now()
+    with get_session() as session:
+        expired_ids = [
+            key_id
+            for (key_id,) in (
+                session.query(IdempotencyKey.id).filter(IdempotencyKey.expires_at <= now).limit(purge_batch)
+            )
+        ]
+        if expired_ids:
+            session.query(IdempotencyKey).filter(IdempotencyKey.id.in_(expired_ids)).delete(synchronize_session=False)
+        # 本键过期的旧记录即使不在本批清理范围内也要先删除，否则唯一约束会挡住新记录
+        session.query(IdempotencyKey).filter(IdempotencyKey.key == key, IdempotencyKey.expires_at <= now).delete(
+            synchronize_session=False
+        )
+        inserted = _insert_if_absent(
+            session,
+            IdempotencyKey,
+            "key",
+            {
+                "key": key,
+                "request_hash": request_hash,
+                "task_id": task_id,
+                "response": response,
+                "created_at": now,
+                "expires_at": expires_at,
+            },
+        )
+        session.commit()
+        return inserted
+
+
+# ============================================================
+# 任务队列
+# ============================================================
+
+
+def enqueue_publish_job(
+    task_id: str,
+    payload: str,
+    record_ids: list[int],
+    status: str = JobStatus.QUEUED.value,
+) -> int:
+    """写入队列任务，返回 job_id"""
+    with get_session() as session:
+        job = PublishJob(
+            task_id=task_id,
+            payload=payload,
+            record_ids=json.dumps(record_ids),
+            status=status,
+            started_at=datetime.now() if status == JobStatus.RUNNING.value else None,
+        )
+        session.add(job)
+        session.commit()
+        return job.id
+
+
+def _lease_expired(now: datetime):
+    """执行中但租约已过期（持有者崩溃/失联）"""
+    return and_(
+        PublishJob.status == JobStatus.RUNNING.value,
+        or_(PublishJob.lease_expires_at.is_(None), PublishJob.lease_expires_at < now),
+    )
+
+
+def _claimable(now: datetime):
+    """可认领：排队中，或租约已过期且重新认领次数未超过上限"""
+    return or_(
+        PublishJob.status == JobStatus.QUEUED.value,
+        and_(_lease_expired(now), func.coalesce(PublishJob.reclaims, 0) < settings.job_max_reclaims),
+    )
+
+
+def _fail_exhausted_jobs(session: Session, now: datetime) -> None:
+    """
+    租约过期且重新认领次数已达上限的任务标记失败（不提交），其未完成的发布记录一并失败。
+
+    这类任务每次执行都让 worker 进程崩溃，继续认领只会无限循环。
+    """
+    jobs = (
+        session.query(PublishJob.id, PublishJob.record_ids)
+        .filter(_lease_expired(now), func.coalesce(PublishJob.reclaims, 0) >= settings.job_max_reclaims)
+        .all()
+    )
+    if not jobs:
+        return
+    error = f"任务执行中断超过 {settings.job_max_reclaims} 次（worker 崩溃或失联），不再重试"
+    record_ids = [record_id for job in jobs for record_id in json.loads(job.record_ids)]
+    open_ids = [
+        record_id
+        for (record_id,) in session.query(PublishRecord.id).filter(
+            PublishRecord.id.in_(record_ids),
+            PublishRecord.status.in_([PublishStatus.PENDING.value, PublishStatus.PROCESSING.value]),
+        )
+    ]
+    failed = {"status": PublishStatus.FAILED.value, "next_attempt_at": None, "updated_at": now, "error": error}
+    _apply_record_updates(session, {record_id: dict(failed) for record_id in open_ids})
+    session.query(PublishJob).filter(PublishJob.id.in_([job.id for job in jobs]), _lease_expired(now)).update(
+        {"status": JobStatus.FAILED.value, "error": error, "finished_at": now, "lease_expires_at": None},
+        synchronize_session=False,
+    )
+    logger.error("%d 个任务多次中断后标记失败: %s", len(jobs), [job.id for job in jobs])
+
+
+def claim_next_publish_job(owner: str = "local", lease_seconds: Optional[float] = None) -> Optional[PublishJob]:
+    """
+    认领最早的可认领任务并取得租约。
+
+    单条 UPDATE ... WHERE <可认领> RETURNING 完成认领，多个进程/主机共享同一数据库时每个任务只会被一方取走；
+    PostgreSQL 下候选行加 FOR UPDATE SKIP LOCKED，并发认领者互不等待。
+    租约过期的任务每次被重新认领时 reclaims 加一，达到 job_max_reclaims 后不再认领并标记失败。
+    """
+    now = datetime.now()
+    lease = timedelta(seconds=lease_seconds or settings.job_lease_ttl)
+    values = {
+        "status": JobStatus.RUNNING.value,
+        "started_at": now,
+        "heartbeat_at": now,
+        "lease_owner": owner,
+        "lease_expires_at": now + lease,
+        "reclaims": func.coalesce(PublishJob.reclaims, 0)
+        + case((PublishJob.status == JobStatus.RUNNING.value, 1), else_=0),
+    }
+    with get_session() as session:
+        _fail_exhausted_jobs(session, now)
+        dialect = session.get_bind().dialect
+        candidate = select(PublishJob.id).where(_claimable(now)).order_by(PublishJob.id).limit(1)
+        if dialect.name == "postgresql":
+            candidate = candidate.with_for_update(skip_locked=True)
+
+        if dialect.update_returning:
+            stmt = (
+                update(PublishJob)
+                .where(PublishJob.id == candidate.scalar_subquery(), _claimable(now))
+                .values(**values)
+                .returning(PublishJob)
+                .execution_options(synchronize_session=False)
+            )
+            job = session.execute(stmt).scalars().first()
+            if job is not None:
+                session.expunge(job)  # 提交前分离，保留 RETURNING 取回的字段
+            session.commit()
+            return job
+
+        # 不支持 RETURNING 的数据库：先查候选再条件更新，更新失败说明被抢先认领，换下一个
+        while True:
+            job_id = session.execute(candidate).scalar()
+            if job_id is None:
+                session.commit()
+                return None
+            claimed = (
+                session.query(PublishJob)
+                .filter(PublishJob.id == job_id, _claimable(now))
+                .update(values, synchronize_session=False)
+            )
+            session.commit()
+            if claimed:
+                job = session.get(PublishJob, job_id)
+                session.expunge(job)
+                return job
+
+
+def finish_publish_job(job_id: int, status: str, error: Optional[str] = None, owner: Optional[str] = None) -> bool:
+    """
+    标记队列任务结束并释放租约，返回是否更新成功。
+
+    指定 owner 时只有仍持有租约的实例能结束任务（租约已被接管时不覆盖新持有者的状态）。
+    """
+    with get_session() as session:
+        query = session.query(PublishJob).filter_by(id=job_id)
+        if owner is not None:
+            query = query.filter_by(lease_owner=owner)
+        updated = query.update(
+            {"status": status, "error": error, "finished_at": datetime.now(), "lease_expires_at": None},
+            synchronize_session=False,
+        )
+        session.commit()
+        return bool(updated)
+
+
+def renew_publish_leases(job_ids: list[int], owner: str, lease_seconds: Optional[float] = None) -> list[int]:
+    """续约执行中的任务（同时刷新心跳），返回仍由 owner 持有的任务 ID"""
+    if not job_ids:
+        return []
+    now = datetime.now()
+    owned = and_(
+        PublishJob.id.in_(job_ids),
+        PublishJob.status == JobStatus.RUNNING.value,
+        PublishJob.lease_owner == owner,
+    )
+    with get_session() as session:
+        session.query(PublishJob).filter(owned).update(
+            {"heartbeat_at": now, "lease_expires_at": now + timedelta(seconds=lease_seconds or settings.job_lease_ttl)},
+            synchronize_session=False,
+        )
+        session.commit()
+        return [job_id for (job_id,) in session.query(PublishJob.id).filter(owned)]
+
+
+def recover_interrupted_jobs(job_ids: list[int], reason: str = "进程中断") -> int:
+    """
+    把中断的 running 任务转交重试调度，返回转为 retry_scheduled 的发布记录数。
+
+    用于关闭时未能在期限内完成的任务：未结束的发布记录改为立即到期的 retry_scheduled，
+    由 RetryEngine 重新入队；任务本身标记为 failed 并释放租约。
+    """
+    now = datetime.now()
+    with get_session() as session:
+        jobs = (
+            session.query(PublishJob)
+            .filter(PublishJob.status == JobStatus.RUNNING.value, PublishJob.id.in_(job_ids))
+            .all()
+        )
+        if not jobs:
+            return 0
+
+        record_ids = {record_id for job in jobs for record_id in json.loads(job.record_ids)}
+        open_ids = [
+            record_id
+            for (record_id,) in session.query(PublishRecord.id).filter(
+                PublishRecord.id.in_(record_ids),
+                PublishRecord.status.in_([PublishStatus.PENDING.value, PublishStatus.PROCESSING.value]),
+            )
+        ]
+        scheduled = {"status": PublishStatus.RETRY_SCHEDULED.value, "next_attempt_at": now, "updated_at": now}
+        _apply_record_updates(session, {record_id: dict(scheduled) for record_id in open_ids})
+        session.query(PublishJob).filter(
+            PublishJob.id.in_([job.id for job in jobs]), PublishJob.status == JobStatus.RUNNING.value
+        ).update(
+            {
+                "status": JobStatus.FAILED.value,
+                "error": f"{reason}，未完成的平台已转为重试",
+                "finished_at": now,
+                "lease_expires_at": None,
+            },
+            synchronize_session=False,
+        )
+        session.commit()
+        logger.warning("%s: %d 个任务中断，%d 条发布记录转为重试", reason, len(jobs), len(open_ids))
+        return len(open_ids)
+
+
+def recover_orphaned_records(stale_before: datetime) -> int:
+    """
+    把没有活动队列任务的 pending/processing 发布记录转交重试调度，返回转为 retry_scheduled 的记录数。
+
+    队列任务表上线前遗留的记录（以及任务已结束但记录状态未更新的记录）不会被任何 worker 认领，
+    租约过期恢复也覆盖不到，启动时扫描一次；只处理 stale_before 之前更新的记录，不与刚登记的任务竞争。
+    """
+    now = datetime.now()
+    active = (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+    with get_session() as session:
+        owned = {
+            record_id
+            for (record_ids,) in session.query(PublishJob.record_ids).filter(PublishJob.status.in_(active))
+            for record_id in json.loads(record_ids)
+        }
+        orphan_ids = [
+            record_id
+            for (record_id,) in session.query(PublishRecord.id).filter(
+                PublishRecord.status.in_([PublishStatus.PENDING.value, PublishStatus.PROCESSING.value]),
+                PublishRecord.updated_at < stale_before,
+            )
+            if record_id not in owned
+        ]
+        if not orphan_ids:
+            return 0
+        scheduled = {"status": PublishStatus.RETRY_SCHEDULED.value, "next_attempt_at": now, "updated_at": now}
+        _apply_record_updates(session, {record_id: dict(scheduled) for record_id in orphan_ids})
+        session.commit()
+        logger.warning("%d 条无队列任务的未完成发布记录转为重试", len(orphan_ids))
+        return len(orphan_ids)
+
+
+def count_publish_jobs(status: str = JobStatus.QUEUED.value) -> int:
+    """统计指定状态的队列任务数"""
+    with get_session() as session:
+        return session.query(PublishJob).filter_by(status=status).count()
+
+
+# ============================================================
+# 配额计数
+# ============================================================
+
+
+def get_quota_usage(platform: str, account: str, window: str, window_key: str) -> int:
+    """查询配额窗口内已用次数"""
+    with get_session() as session:
+        usage = (
+            session.query(QuotaUsage)
+            .filter_by(platform=platform, account=account, window=window, window_key=window_key)
+            .first()
+        )
+        return usage.used if usage else 0
+
+
+def increment_quota_usage(platform: str, account: str, window: str, window_key: str, amount: int = 1) -> int:
+    """
+    累加配额用量，返回累加后的值。
+
+    单条 upsert 原子累加：并发发布同一平台不会丢失计数，同时开启新窗口也不会触发唯一约束冲突。
+    """
+    keys = {"platform": platform, "account": account, "window": window, "window_key": window_key}
+    with get_session() as session:
+        _upsert_increment(session, QuotaUsage, keys, {"used": amount}, {"updated_at": datetime.now()})
+        # 同一事务内读取：upsert 已持有该行的写锁，读到的就是本次累加后的值
+        used = session.query(QuotaUsage.used).filter_by(**keys).scalar()
+        session.commit()
+        return used
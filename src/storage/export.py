@@ -0,0 +1,88 @@
+"""发布历史导出 - 按批读取并逐行编码为 NDJSON / CSV，内存占用与导出总量无关"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Optional
+
+from ..config import settings
+from .async_database import get_publish_history_export_batch
+from .database import EXPORT_COLUMNS
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+async def iter_export_rows(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    platform: Optional[str] = None,
+    status: Optional[str] = None,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[tuple]:
+    """按 (created_at, id) keyset 分批读取，逐行产出"""
+    limit = batch_size or settings.history_export_batch_size
+    after: Optional[tuple[datetime, int]] = None
+    created_at_index = EXPORT_COLUMNS.index("created_at")
+
+    while True:
+        rows = await get_publish_history_export_batch(
+            after=after, limit=limit, start=start, end=end, platform=platform, status=status
+        )
+        for row in rows:
+            yield row
+        if len(rows) < limit:
+            return
+        last = rows[-1]
+        after = (last[created_at_index], last[0])
+
+
+def _to_dict(row: tuple) -> dict:
+    record = dict(zip(EXPORT_COLUMNS, row))
+    for key in ("created_at", "updated_at"):
+        if record[key] is not None:
+            record[key] = record[key].isoformat()
+    try:
+        record["tags"] = json.loads(record["tags"]) if record["tags"] else []
+    except ValueError:
+        record["tags"] = [record["tags"]]
+    return record
+
+
+async def stream_export(rows: AsyncIterator[tuple], fmt: str) -> AsyncIterator[bytes]:
+    """
+    把行编码为导出格式的字节块。
+
+    每批行合并为一个块输出，避免逐行产生大量小块。
+    """
+    chunk_rows = settings.history_export_batch_size
+    buffer = io.StringIO()
+    writer = None
+
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        buffer.write("\ufeff")  # BOM，Excel 打开中文不乱码
+        writer.writerow(EXPORT_COLUMNS)
+
+    pending = 0
+    async for row in rows:
+        record = _to_dict(row)
+        if writer:
+            record["tags"] = ",".join(str(t) for t in record["tags"])
+            writer.writerow([record[c] for c in EXPORT_COLUMNS])
+        else:
+            buffer.write(json.dumps(record, ensure_ascii=False))
+            buffer.write("\n")
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
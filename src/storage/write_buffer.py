@@ -0,0 +1,136 @@
+"""StatusWriteBuffer - 发布记录状态的 write-behind 缓冲（合并写入 + 批量提交）"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from ..config import settings
+from .async_database import bulk_update_publish_record_status
+
+logger = logging.getLogger(__name__)
+
+
+class StatusWriteBuffer:
+    """
+    发布记录状态写缓冲。
+
+    - put() 只写内存，同一条记录的多次状态变更合并为一次 UPDATE
+    - 每 flush_interval 秒或积累 max_batch 条记录时，在一个事务里批量提交
+    - sync() 等待调用前写入的变更落盘（多个任务共享同一次提交）
+    - flush() 立即提交，用于读取状态前的读屏障和关闭时的持久化
+    """
+
+    def __init__(self, flush_interval: Optional[float] = None, max_batch: Optional[int] = None) -> None:
+        self._flush_interval = flush_interval if flush_interval is not None else settings.status_flush_interval
+        self._max_batch = max(1, max_batch or settings.status_flush_max_batch)
+
+        self._pending: dict[int, dict[str, Any]] = {}
+        self._pending_done: Optional[asyncio.Future] = None
+        self._inflight_done: Optional[asyncio.Future] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def put(
+        self,
+        record_id: int,
+        status: str,
+        post_url: Optional[str] = None,
+        error: Optional[str] = None,
+        retries: int = 0,
+        next_attempt_at: Optional[datetime] = None,
+    ) -> None:
+        """登记一次状态变更（字段语义与 update_publish_record_status 一致，next_attempt_at 随每次变更覆盖）"""
+        self._ensure_loop()
+        values: dict[str, Any] = {"status": status, "updated_at": datetime.now(), "next_attempt_at": next_attempt_at}
+        if post_url is not None:
+            values["post_url"] = post_url
+        if error is not None:
+            values["error"] = error
+        if retries:
+            values["retries"] = retries
+
+        self._pending.setdefault(record_id, {}).update(values)
+        if self._pending_done is None:
+            self._pending_done = self._loop.create_future()
+        if len(self._pending) >= self._max_batch:
+            self._wakeup.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = self._loop.create_task(self._flush_loop())
+
+    async def sync(self) -> None:
+        """等待此前登记的变更随下一次批量提交落盘"""
+        for future in (self._pending_done, self._inflight_done):
+            if future is not None and future.get_loop() is asyncio.get_running_loop():
+                await asyncio.shield(future)
+
+    async def flush(self) -> None:
+        """立即提交所有缓冲的变更"""
+        self._ensure_loop()
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+            done, self._pending_done = self._pending_done, None
+            if not batch:
+                if done is not None and not done.done():
+                    done.set_result(None)
+                return
+
+            self._inflight_done = done
+            try:
+                await bulk_update_publish_record_status(batch)
+            except Exception as e:
+                # 未能写入的变更放回缓冲（不覆盖其后的新变更），由下一次提交重试
+                for record_id, values in batch.items():
+                    self._pending[record_id] = {**values, **self._pending.get(record_id, {})}
+                if self._pending_done is None:
+                    self._pending_done = self._loop.create_future()
+                if done is not None and not done.done():
+                    done.set_exception(e)
+                    done.exception()  # 无人等待时不产生未读取异常的警告
+                raise
+            else:
+                logger.debug("批量提交 %d 条发布状态", len(batch))
+                if done is not None and not done.done():
+                    done.set_result(None)
+            finally:
+                self._inflight_done = None
+
+    async def close(self) -> None:
+        """停止后台提交并把剩余变更持久化（应用关闭时调用）"""
+        flusher, self._flusher = self._flusher, None
+        if flusher is not None and not flusher.done():
+            flusher.cancel()
+            await asyncio.gather(flusher, return_exceptions=True)
+        if self._pending and self._loop is asyncio.get_running_loop():
+            await self.flush()
+
+    def _ensure_loop(self) -> None:
+        """缓冲绑定当前事件循环，循环切换后重建同步原语（未提交的变更保留）"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._wakeup = asyncio.Event()
+            self._flusher = None
+            self._inflight_done = None
+            self._pending_done = loop.create_future() if self._pending else None
+
+    async def _flush_loop(self) -> None:
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("批量提交发布状态失败，%.2f 秒后重试", self._flush_interval)
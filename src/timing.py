@@ -0,0 +1,41 @@
+"""发布阶段计时 - 通过 contextvars 在一次发布尝试内收集各阶段耗时"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# 当前发布尝试的阶段耗时（毫秒），由 BasePublisher 在每次尝试前设置
+_current_phases: ContextVar[Optional[dict[str, float]]] = ContextVar("publish_phases", default=None)
+
+
+@contextmanager
+def collect_phases() -> Iterator[dict[str, float]]:
+    """开启一次计时收集，块内（含 gather 出去的子任务）的 phase() 耗时都会累加到返回的字典"""
+    phases: dict[str, float] = {}
+    token = _current_phases.set(phases)
+    try:
+        yield phases
+    finally:
+        _current_phases.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    记录一个阶段的耗时，同名阶段多次出现时累加。
+
+    不在 collect_phases() 范围内时不做任何记录，发布器可无条件使用。
+    """
+    phases = _current_phases.get()
+    if phases is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        phases[name] = round(phases.get(name, 0.0) + elapsed, 2)
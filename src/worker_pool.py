@@ -0,0 +1,111 @@
+"""WorkerPool - 常驻异步 worker，消费数据库中的发布任务队列"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Optional
+
+from .config import settings
+from .models import JobStatus
+from .storage.async_database import claim_next_publish_job, finish_publish_job
+
+if TYPE_CHECKING:
+    from .publisher_hub import PublisherHub
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """
+    进程内常驻 worker 池。
+
+    - 任务持久化在 publish_jobs 表，worker 以实例 owner 认领并持有租约（多进程/多机可同时消费）
+    - 入队时 notify() 立即唤醒空闲 worker，否则按 poll_interval 轮询兜底
+    - 固定数量的协程，不随请求量增长
+    """
+
+    def __init__(
+        self,
+        hub: "PublisherHub",
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ) -> None:
+        self._hub = hub
+        self._concurrency = concurrency or settings.worker_concurrency
+        self._poll_interval = poll_interval or settings.worker_poll_interval
+        self._wakeup = asyncio.Event()
+        self._workers: list[asyncio.Task] = []
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def notify(self) -> None:
+        """有新任务入队，唤醒空闲 worker"""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        """启动 worker 协程"""
+        if self._workers:
+            return
+        self._stopping = False
+        # Event 绑定到当前事件循环，每次启动重新创建
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker_loop(i), name=f"publish-worker-{i}") for i in range(self._concurrency)
+        ]
+        logger.info("WorkerPool 已启动: %d 个 worker", self._concurrency)
+
+    def stop_claiming(self) -> None:
+        """不再认领新任务，正在执行的任务继续直到完成（优雅关闭的第一步）"""
+        self._stopping = True
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """停止所有 worker（正在执行的任务会被取消）"""
+        self._stopping = True
+        self._wakeup.set()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("WorkerPool 已停止")
+
+    async def _worker_loop(self, index: int) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            lifecycle = self._hub.lifecycle
+            try:
+                job = await claim_next_publish_job(owner=lifecycle.owner, lease_seconds=lifecycle.lease_ttl)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # 数据库暂时不可用（如 database is locked、连接断开）时退避后继续，worker 不能因此退出
+                logger.exception("worker-%d 认领任务失败，%.1f 秒后重试", index, self._poll_interval)
+                await asyncio.sleep(self._poll_interval)
+                continue
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+                except TimeoutError:
+                    pass
+                continue
+
+            logger.info("worker-%d 开始执行任务 job=%d task=%s", index, job.id, job.task_id)
+            try:
+                await self._hub.run_job(job)
+                status, error = JobStatus.DONE.value, None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("worker-%d 执行任务失败 job=%d", index, job.id)
+                status, error = JobStatus.FAILED.value, str(e)
+            try:
+                await finish_publish_job(job.id, status, error=error, owner=job.lease_owner)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # 任务保持 running，租约到期后重新认领，已完成的平台不会重复发布
+                logger.exception("worker-%d 标记任务结束失败 job=%d", index, job.id)
+                await asyncio.sleep(self._poll_interval)
@@ -0,0 +1,11 @@
+"""测试公共配置"""
+
+import pytest
+
+from src.rate_limiter import rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def disable_rate_limits(monkeypatch):
+    """默认关闭全局限流，避免用例之间互相消耗令牌（限流逻辑由独立用例覆盖）"""
+    monkeypatch.setattr(rate_limiter, "_policies", {})
@@ -2,6 +2,7 @@
 
 import sys
 from pathlib import Path
+from uuid import uuid4
 
 import pytest
 from fastapi.testclient import TestClient
@@ -57,6 +58,17 @@ class TestPlatformsAPI:
         assert "content_types" in platform
 
 
+class TestQueueAPI:
+    """调度队列 API 测试"""
+
+    def test_queue_stats(self, client):
+        response = client.get("/api/v1/queue")
+        assert response.status_code == 200
+        data = response.json()
+        assert "wechatsync_mcp" in data["scheduler"]["methods"]
+        assert "queued" in data["jobs"]
+
+
 class TestPublishAPI:
     """发布 API 测试"""
 
@@ -123,3 +135,83 @@ class TestTaskStatusAPI:
         data = status_response.json()
         assert data["task_id"] == task_id
         assert "results" in data
+
+
+class TestAsyncPublishAPI:
+    """异步发布 API 测试"""
+
+    def test_publish_async_mode(self):
+        """?async=true 立即返回 pending 的 task_id"""
+        app = create_app()
+        with TestClient(app) as client:
+            response = client.post(
+                "/api/v1/publish?async=true",
+                json={
+                    "title": "异步模式测试文章",
+                    "content": f"入队后立即返回 {uuid4().hex}",
+                    "platforms": ["zhihu"],
+                },
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["task_id"]
+            assert data["results"][0]["status"] == "pending"
+
+            status_response = client.get(f"/api/v1/status/{data['task_id']}")
+            assert status_response.status_code == 200
+
+
+class TestIdempotencyAPI:
+    """Idempotency-Key 幂等发布测试"""
+
+    def test_repeat_returns_first_response(self):
+        """同一键的重复请求返回首次响应（正文只有空白差异也视为同一请求），内容不同时返回 422"""
+        app = create_app()
+        key = f"test-{uuid4().hex}"
+        content = f"幂等发布 {uuid4().hex}"
+        body = {"title": "幂等键测试文章", "content": content, "platforms": ["zhihu"]}
+
+        with TestClient(app) as client:
+            first = client.post("/api/v1/publish?async=true", json=body, headers={"Idempotency-Key": key})
+            assert first.status_code == 200
+
+            retried = client.post(
+                "/api/v1/publish?async=true",
+                json={**body, "content": f"  {content}\n"},
+                headers={"Idempotency-Key": key},
+            )
+            assert retried.status_code == 200
+            assert retried.json()["task_id"] == first.json()["task_id"]
+
+            conflict = client.post(
+                "/api/v1/publish?async=true",
+                json={**body, "content": f"另一篇 {uuid4().hex}"},
+                headers={"Idempotency-Key": key},
+            )
+            assert conflict.status_code == 422
+
+
+class TestNearDuplicateAPI:
+    """近似重复检测测试"""
+
+    def test_reject_near_duplicate(self, monkeypatch):
+        """配置为拒绝时，与已发布文章近似重复的内容返回 409"""
+        from src.config import settings
+
+        monkeypatch.setattr(settings, "near_duplicate_action", "reject")
+        app = create_app()
+        # 正文全部随机，避免与共享数据库中历次运行留下的文章近似重复
+        body = "\n".join(uuid4().hex + uuid4().hex for _ in range(40))
+
+        with TestClient(app) as client:
+            first = client.post(
+                "/api/v1/publish?async=true",
+                json={"title": "近似重复测试", "content": body, "platforms": ["zhihu"]},
+            )
+            assert first.status_code == 200
+
+            rewritten = client.post(
+                "/api/v1/publish?async=true",
+                json={"title": "近似重复测试（改）", "content": body + "补充一句。", "platforms": ["zhihu"]},
+            )
+            assert rewritten.status_code == 409
@@ -22,10 +22,11 @@ class TestDatabase:
         os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
 
         # 重新加载模块以使用新的数据库路径
-        from src.storage import database as db_module
         from sqlalchemy import create_engine
         from sqlalchemy.orm import sessionmaker
 
+        from src.storage import database as db_module
+
         engine = create_engine(f"sqlite:///{db_path}", echo=False)
         db_module.engine = engine
         db_module.SessionLocal = sessionmaker(bind=engine)
@@ -149,12 +150,577 @@ class TestDatabase:
         assert total == 5
         assert len(records) == 2
 
+    def test_publish_history_keyset(self, setup_db):
+        """游标翻页按 (created_at, id) 倒序遍历全部记录且不重复"""
+        db = setup_db
+        for i in range(7):
+            db.save_publish_record(f"task6{i:02d}", "fp_page", "zhihu" if i % 2 else "juejin", "published")
+
+        seen = []
+        records, total = db.get_publish_history(size=3)
+        assert total == 7
+        while records:
+            seen.extend(r.id for r in records)
+            cursor = db.encode_history_cursor(records[-1])
+            records, total = db.get_publish_history(size=3, after=cursor, with_total=False)
+            assert total is None
+
+        assert len(seen) == 7
+        assert seen == sorted(seen, reverse=True)
+
+        zhihu, _ = db.get_publish_history(size=10, platform="zhihu")
+        after_first, _ = db.get_publish_history(size=10, platform="zhihu", after=db.encode_history_cursor(zhihu[0]))
+        assert [r.id for r in after_first] == [r.id for r in zhihu[1:]]
+
+        with pytest.raises(ValueError):
+            db.get_publish_history(after="not-a-cursor")
+
+    def test_claim_publish_job(self, setup_db):
+        """队列任务按 FIFO 认领，且只能被认领一次"""
+        db = setup_db
+        first = db.enqueue_publish_job("task101", "{}", [1, 2])
+        second = db.enqueue_publish_job("task102", "{}", [3])
+
+        job = db.claim_next_publish_job()
+        assert job.id == first
+        assert job.status == "running"
+        assert job.started_at is not None
+
+        assert db.claim_next_publish_job().id == second
+        assert db.claim_next_publish_job() is None
+        assert db.count_publish_jobs("running") == 2
+
+        db.finish_publish_job(first, "done")
+        assert db.count_publish_jobs("done") == 1
+
+    @pytest.mark.asyncio
+    async def test_async_api_runs_off_event_loop(self, setup_db, monkeypatch):
+        """异步存储接口在数据库线程中执行，且使用替换后的 engine"""
+        import threading
+
+        from src.storage import async_database
+
+        db = setup_db
+        threads = []
+        original = db.save_publish_record
+
+        def tracking_save(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(db, "save_publish_record", tracking_save)
+
+        assert await async_database.save_article("异步文章", "fp_async") is True
+        record_id = await async_database.save_publish_record("task201", "fp_async", "zhihu", "pending")
+        await async_database.update_publish_record_status(record_id, "published", post_url="https://z.com/1")
+
+        records = await async_database.get_publish_records("task201")
+        assert records[0].status == "published"
+        assert await async_database.is_duplicate("fp_async") is True
+        assert threads and threads[0].startswith("db")
+        assert threads[0] != threading.current_thread().name
+
+    def test_sqlite_engine_pragmas(self, tmp_path):
+        """文件库连接应用 WAL 等 PRAGMA，连接池按配置设置"""
+        from sqlalchemy import text
+
+        from src.storage.database import create_db_engine
+
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'pragma.db'}")
+        try:
+            with engine.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+                assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+                assert conn.execute(text("PRAGMA cache_size")).scalar() == -65536
+            assert engine.pool.size() >= 2
+        finally:
+            engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_status_write_buffer_coalesces(self, setup_db, monkeypatch):
+        """同一批次内的状态变更合并为一次提交，sync() 后可读到最终状态"""
+        from src.storage import write_buffer
+        from src.storage.write_buffer import StatusWriteBuffer
+
+        db = setup_db
+        first = db.save_publish_record("task301", "fp_buf", "zhihu", "pending")
+        second = db.save_publish_record("task301", "fp_buf", "juejin", "pending")
+
+        batches = []
+        original = write_buffer.bulk_update_publish_record_status
+
+        async def tracking_bulk(updates):
+            batches.append(dict(updates))
+            return await original(updates)
+
+        monkeypatch.setattr(write_buffer, "bulk_update_publish_record_status", tracking_bulk)
+
+        buffer = StatusWriteBuffer(flush_interval=0.01, max_batch=100)
+        buffer.put(first, "processing")
+        buffer.put(second, "processing")
+        buffer.put(first, "published", post_url="https://zhihu.com/p/1")
+        buffer.put(second, "failed", error="网络错误", retries=2)
+        await buffer.sync()
+
+        assert len(batches) == 1
+        assert batches[0][first]["status"] == "published"
+        records = {r.platform: r for r in db.get_publish_records("task301")}
+        assert records["zhihu"].post_url == "https://zhihu.com/p/1"
+        assert records["juejin"].status == "failed"
+        assert records["juejin"].retries == 2
+
+        buffer.put(first, "processing")
+        await buffer.close()
+        assert buffer.pending == 0
+        assert {r.platform: r.status for r in db.get_publish_records("task301")}["zhihu"] == "processing"
+
+    def test_open_publish_task(self, setup_db):
+        """单事务登记任务：首次创建记录和队列任务，重复内容返回已有 task_id"""
+        db = setup_db
+        opened = db.open_publish_task(
+            "task401", "标题", "fp_open", ["zhihu", "juejin"], job_payload="{}", job_status="running"
+        )
+        assert opened.duplicate is False
+        assert len(opened.record_ids) == 2
+        assert [r.id for r in db.get_publish_records("task401")] == opened.record_ids
+        assert db.count_publish_jobs("running") == 1
+
+        again = db.open_publish_task("task402", "标题", "fp_open", ["csdn"], job_payload="{}")
+        assert again.duplicate is True
+        assert again.task_id == "task401"
+        assert again.job_id is None
+        assert db.get_publish_records("task402") == []
+        assert db.count_publish_jobs("queued") == 0
+
+    def test_open_publish_task_legacy_fingerprint(self, setup_db):
+        """升级前按旧版 MD5 指纹发布过的内容视为重复"""
+        from src.fingerprint import content_fingerprint, legacy_fingerprint
+
+        db = setup_db
+        old_fp = legacy_fingerprint("旧文章", "升级前发布的正文")
+        db.save_article("旧文章", old_fp)
+        db.save_publish_record("task411", old_fp, "zhihu", "published")
+
+        new_fp = content_fingerprint("旧文章", "升级前发布的正文")
+        assert db.is_duplicate(new_fp) is False
+        assert db.is_duplicate(new_fp, old_fp) is True
+
+        again = db.open_publish_task(
+            "task412", "旧文章", new_fp, ["zhihu"], content="升级前发布的正文", legacy_fingerprint=old_fp
+        )
+        assert again.duplicate is True
+        assert again.task_id == "task411"
+        assert db.get_publish_records("task412") == []
+
+    def test_open_publish_task_concurrent(self, setup_db):
+        """相同内容并发登记时只有一个请求能创建任务"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        db = setup_db
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(
+                pool.map(lambda i: db.open_publish_task(f"task5{i:02d}", "并发", "fp_race", ["zhihu"]), range(8))
+            )
+
+        created = [r for r in results if not r.duplicate]
+        assert len(created) == 1
+        assert all(r.task_id == created[0].task_id for r in results)
+
+    def test_content_store_dedup(self, setup_db):
+        """正文按内容哈希压缩存储，不同文章的相同正文只存一份，可按指纹读回"""
+        db = setup_db
+        body = "# 正文\n\n" + "可压缩的重复段落。" * 500
+        db.open_publish_task("task901", "标题一", "fp_body1", ["zhihu"], content=body, cover_url="https://c/1.png")
+        db.open_publish_task("task902", "标题二", "fp_body2", ["juejin"], content=body)
+
+        assert db.get_article_content("fp_body1") == body
+        assert db.get_article_content("fp_body2") == body
+        assert db.get_article_content("nonexistent") is None
+        assert db.get_content(db.compute_content_hash(body)) == body
+        assert db.get_article_by_fingerprint("fp_body1").cover_url == "https://c/1.png"
+
+        with db.get_session() as session:
+            blobs = session.query(db.ContentBlob).all()
+        assert len(blobs) == 1
+        assert blobs[0].size == len(body.encode("utf-8"))
+        assert len(blobs[0].payload) < blobs[0].size // 10
+
+    def test_init_db_adds_missing_columns(self, setup_db):
+        """旧库缺少的新增列在 init_db 时补建"""
+        from sqlalchemy import inspect
+
+        db = setup_db
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE articles")
+            conn.exec_driver_sql(
+                "CREATE TABLE articles (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, "
+                "content_fingerprint VARCHAR(32) NOT NULL UNIQUE, content_type VARCHAR(20), tags TEXT, "
+                "created_at DATETIME)"
+            )
+        db.init_db()
+
+        columns = {c["name"] for c in inspect(db.engine).get_columns("articles")}
+        assert {"content_hash", "cover_url", "video_path", "draft_only"} <= columns
+        db.open_publish_task("task903", "迁移后", "fp_migrated", ["zhihu"], content="正文")
+        assert db.get_article_content("fp_migrated") == "正文"
+
+    def test_claim_due_retries(self, setup_db):
+        """到期的 retry_scheduled 记录按任务合并入队且只认领一次，缺少正文的记录直接失败"""
+        import json
+        from datetime import datetime, timedelta
+
+        db = setup_db
+        now = datetime.now()
+        opened = db.open_publish_task(
+            "task951", "重试", "fp_retry", ["zhihu", "juejin", "csdn"], content="正文", tags='["t"]'
+        )
+        orphan = db.save_publish_record("task952", "fp_missing", "zhihu", "pending")
+        for record_id, due in zip(opened.record_ids, (now, now - timedelta(minutes=1), now + timedelta(hours=1))):
+            db.update_publish_record_status(record_id, "retry_scheduled", error="503", next_attempt_at=due)
+        db.update_publish_record_status(orphan, "retry_scheduled", next_attempt_at=now)
+
+        assert db.claim_due_retries(now=now) == 3
+        assert db.claim_due_retries(now=now) == 0
+
+        job = db.claim_next_publish_job()
+        assert job.task_id == "task951"
+        # 按到期先后入队，platforms 与 record_ids 一一对应
+        assert json.loads(job.record_ids) == [opened.record_ids[1], opened.record_ids[0]]
+        payload = json.loads(job.payload)
+        assert payload["platforms"] == ["juejin", "zhihu"]
+        assert payload["tags"] == ["t"]
+        assert db.claim_next_publish_job() is None
+
+        statuses = {r.id: (r.status, r.next_attempt_at) for r in db.get_publish_records("task951")}
+        assert statuses[opened.record_ids[0]] == ("pending", None)
+        assert statuses[opened.record_ids[2]][0] == "retry_scheduled"
+        assert db.get_publish_records("task952")[0].status == "failed"
+
+    def test_recover_interrupted_jobs(self, setup_db):
+        """关闭时被中断的任务：未完成记录转为立即到期的重试，已完成记录不动，任务标记失败"""
+        db = setup_db
+        interrupted = db.open_publish_task(
+            "task961", "中断", "fp_crash", ["zhihu", "juejin"], content="正文", job_payload="{}", job_status="running"
+        )
+        db.open_publish_task(
+            "task962", "执行中", "fp_alive", ["zhihu"], content="正文", job_payload="{}", job_status="running"
+        )
+        db.update_publish_record_status(interrupted.record_ids[0], "published")
+        db.update_publish_record_status(interrupted.record_ids[1], "processing")
+
+        assert db.recover_interrupted_jobs([interrupted.job_id]) == 1
+        records = {r.id: r for r in db.get_publish_records("task961")}
+        assert records[interrupted.record_ids[0]].status == "published"
+        assert records[interrupted.record_ids[1]].status == "retry_scheduled"
+        assert records[interrupted.record_ids[1]].next_attempt_at is not None
+        assert db.count_publish_jobs("running") == 1
+        assert db.count_publish_jobs("failed") == 1
+        assert db.claim_due_retries() == 1
+
+    def test_recover_orphaned_records(self, setup_db):
+        """没有活动队列任务的未完成记录转为重试，有任务的和刚更新的记录不动"""
+        from datetime import datetime, timedelta
+
+        db = setup_db
+        legacy = db.save_publish_record("task971", "fp_legacy", "zhihu", "processing")  # 升级前遗留，无队列任务
+        queued = db.open_publish_task("task972", "排队中", "fp_queued", ["zhihu"], content="正文", job_payload="{}")
+        fresh = db.save_publish_record("task973", "fp_fresh", "zhihu", "pending")
+        old = datetime.now() - timedelta(hours=1)
+        with db.get_session() as session:
+            session.query(db.PublishRecord).filter(db.PublishRecord.id.in_([legacy, *queued.record_ids])).update(
+                {"updated_at": old}, synchronize_session=False
+            )
+            session.commit()
+
+        assert db.recover_orphaned_records(datetime.now() - timedelta(minutes=5)) == 1
+        assert db.get_publish_records("task971")[0].status == "retry_scheduled"
+        assert db.get_publish_records("task972")[0].status == "pending"
+        assert [r.id for r in db.get_publish_records("task973") if r.status == "pending"] == [fresh]
+        assert db.recover_orphaned_records(datetime.now() - timedelta(minutes=5)) == 0
+
+    def test_near_duplicate_index(self, setup_db):
+        """全文指纹区分正文末尾的改动；SimHash 分段索引召回近似重复，拒绝模式下不写入任何数据"""
+        from src.fingerprint import NearDuplicateContent
+        from src.models import PublishRequest
+
+        db = setup_db
+        body = "".join(f"第 {i} 段：多平台分发、内容指纹去重与并发控制。\n" for i in range(60))
+        edited = body + "补充一句结尾。"
+        first = PublishRequest(title="近似重复", content=body, platforms=["zhihu"])
+        second = PublishRequest(title="近似重复", content=edited, platforms=["zhihu"])
+        assert len(body) > 500
+        assert first.content_fingerprint != second.content_fingerprint
+
+        opened = db.open_publish_task(
+            "task981", first.title, first.content_fingerprint, ["zhihu"], content=body, near_duplicate_distance=3
+        )
+        assert opened.near_duplicates == ()
+
+        similar = db.open_publish_task(
+            "task982", second.title, second.content_fingerprint, ["zhihu"], content=edited, near_duplicate_distance=3
+        )
+        assert [d.task_id for d in similar.near_duplicates] == ["task981"]
+
+        unrelated = db.open_publish_task(
+            "task983", "无关", "fp_unrelated", ["zhihu"], content="今天的天气很好，适合出门散步和骑行。" * 10,
+            near_duplicate_distance=3,
+        )
+        assert unrelated.near_duplicates == ()
+
+        with pytest.raises(NearDuplicateContent) as exc_info:
+            db.open_publish_task(
+                "task984", "再次改写", "fp_rewrite", ["zhihu"], content=body + "又一句。",
+                near_duplicate_distance=3, reject_near_duplicates=True,
+            )
+        assert exc_info.value.matches[0].distance <= 3
+        assert db.get_publish_records("task984") == []
+        assert db.get_article_by_fingerprint("fp_rewrite") is None
+
+        with db.get_session() as session:
+            session.query(db.ArticleSimhashBand).delete()
+            session.commit()
+        assert db.rebuild_simhash_index(batch_size=2) == 3
+        with db.get_session() as session:
+            assert session.query(db.ArticleSimhashBand).count() == 3 * db.settings.simhash_bands
+
+    def test_idempotency_key(self, setup_db):
+        """幂等键先写入者生效，过期后可被新请求覆盖，写入时清理过期键"""
+        from datetime import datetime, timedelta
+
+        db = setup_db
+        later = datetime.now() + timedelta(hours=1)
+        assert db.save_idempotency_key("key-1", "hash-a", "task991", '{"a": 1}', later) is True
+        assert db.save_idempotency_key("key-1", "hash-b", "task992", '{"b": 1}', later) is False
+        assert db.get_idempotency_key("key-1").task_id == "task991"
+
+        db.save_idempotency_key("key-old", "hash-c", "task993", "{}", datetime.now() - timedelta(seconds=1))
+        assert db.get_idempotency_key("key-old") is None
+        assert db.save_idempotency_key("key-old", "hash-d", "task994", "{}", later) is True
+        assert db.get_idempotency_key("key-old").request_hash == "hash-d"
+
+        db.save_idempotency_key("key-2", "hash-e", "task995", "{}", datetime.now() - timedelta(seconds=1))
+        db.save_idempotency_key("key-3", "hash-f", "task996", "{}", later)
+        with db.get_session() as session:
+            assert {k for (k,) in session.query(db.IdempotencyKey.key)} == {"key-1", "key-old", "key-3"}
+
+    def test_publish_job_lease(self, setup_db):
+        """租约过期的任务可被其他实例接管，原持有者不能再续约或结束任务"""
+        from datetime import datetime, timedelta
+
+        db = setup_db
+        job_id = db.enqueue_publish_job("task971", "{}", [1])
+
+        job = db.claim_next_publish_job(owner="node-a", lease_seconds=60)
+        assert job.id == job_id
+        assert job.lease_owner == "node-a"
+        assert job.lease_expires_at > datetime.now()
+        assert db.claim_next_publish_job(owner="node-b") is None
+        assert db.renew_publish_leases([job_id], "node-a") == [job_id]
+
+        # node-a 失联，租约过期
+        with db.get_session() as session:
+            session.query(db.PublishJob).filter_by(id=job_id).update(
+                {"lease_expires_at": datetime.now() - timedelta(seconds=1)}
+            )
+            session.commit()
+
+        taken = db.claim_next_publish_job(owner="node-b")
+        assert taken.id == job_id
+        assert taken.lease_owner == "node-b"
+        assert db.renew_publish_leases([job_id], "node-a") == []
+        assert db.finish_publish_job(job_id, "done", owner="node-a") is False
+        assert db.finish_publish_job(job_id, "done", owner="node-b") is True
+        assert db.count_publish_jobs("done") == 1
+
+    def test_publish_job_reclaim_limit(self, setup_db, monkeypatch):
+        """每次执行都让 worker 崩溃的任务重新认领达到上限后标记失败，未完成的记录一并失败"""
+        from datetime import datetime, timedelta
+
+        from src.config import settings
+
+        db = setup_db
+        monkeypatch.setattr(settings, "job_max_reclaims", 2)
+        opened = db.open_publish_task("task981", "崩溃", "fp_poison", ["zhihu"], content="正文", job_payload="{}")
+
+        def expire():
+            with db.get_session() as session:
+                session.query(db.PublishJob).filter_by(id=opened.job_id).update(
+                    {"lease_expires_at": datetime.now() - timedelta(seconds=1)}
+                )
+                session.commit()
+
+        assert db.claim_next_publish_job(owner="node-a").reclaims == 0
+        for reclaims in (1, 2):
+            expire()
+            assert db.claim_next_publish_job(owner="node-a").reclaims == reclaims
+
+        expire()
+        assert db.claim_next_publish_job(owner="node-a") is None
+        assert db.count_publish_jobs("failed") == 1
+        record = db.get_publish_records("task981")[0]
+        assert record.status == "failed"
+        assert "不再重试" in record.error
+
+    def test_claim_publish_job_multiprocess(self, setup_db, tmp_path):
+        """多个进程同时认领同一数据库中的任务，每个任务恰好被认领一次"""
+        import multiprocessing
+
+        from sqlalchemy.orm import sessionmaker
+
+        db = setup_db
+        url = f"sqlite:///{tmp_path / 'shared.db'}"
+        engine = db.create_db_engine(url)
+        db.Base.metadata.create_all(engine)
+        engine.dispose()
+
+        db.engine = db.create_db_engine(url)
+        db.SessionLocal = sessionmaker(bind=db.engine)
+        job_ids = {db.enqueue_publish_job(f"task98{i}", "{}", [i]) for i in range(40)}
+        db.engine.dispose()
+
+        ctx = multiprocessing.get_context("fork")
+        queue = ctx.Queue()
+        workers = [ctx.Process(target=_claim_all, args=(url, f"node-{i}", queue)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        claimed = [job_id for _ in workers for job_id in queue.get(timeout=30)]
+        for worker in workers:
+            worker.join(timeout=30)
+
+        assert sorted(claimed) == sorted(job_ids)
+
+    def test_publish_stats_rollup(self, setup_db):
+        """终态转换增量更新汇总表，重试后改判的记录不重复计数，回填结果一致"""
+        db = setup_db
+        ok = db.save_publish_record("task701", "fp_stats", "zhihu", "pending")
+        bad = db.save_publish_record("task701", "fp_stats", "juejin", "pending")
+        db.update_publish_record_status(ok, "processing")
+        db.update_publish_record_status(ok, "published", retries=1)
+        db.update_publish_record_status(bad, "failed", retries=3)
+        db.update_publish_record_status(bad, "processing")  # 重试
+        db.update_publish_record_status(bad, "published", retries=1)
+
+        def snapshot():
+            rollups, histogram = db.get_publish_stats(granularity="hour")
+            return (
+                sorted((r.platform, r.status, r.count, r.retries) for r in rollups),
+                sorted((h.platform, h.count) for h in histogram),
+            )
+
+        rollups, histogram = snapshot()
+        assert rollups == [("juejin", "published", 1, 1), ("zhihu", "published", 1, 1)]
+        assert histogram == [("juejin", 1), ("zhihu", 1)]
+
+        assert db.rebuild_publish_stats() == 2
+        assert snapshot() == (rollups, histogram)
+        assert db.rebuild_publish_stats(batch_size=1) == 2  # 分批扫描在同一事务内累加
+        assert snapshot() == (rollups, histogram)
+
+    def test_archive_publish_records(self, setup_db):
+        """过期终态记录分批压缩归档，未结束的记录保留，文章指纹继续参与去重，统计不变"""
+        from datetime import datetime, timedelta
+
+        db = setup_db
+        old = datetime.now() - timedelta(days=120)
+        db.save_article("旧文章", "fp_old")
+        db.save_article("仍在发布", "fp_live")
+        done = [db.save_publish_record("task801", "fp_old", p, "pending") for p in ("zhihu", "juejin", "csdn")]
+        for record_id in done:
+            db.update_publish_record_status(record_id, "published", post_url=f"https://x/{record_id}")
+        running = db.save_publish_record("task802", "fp_live", "zhihu", "processing")
+        with db.get_session() as session:
+            session.query(db.PublishRecord).update({"created_at": old}, synchronize_session=False)
+            session.query(db.ArticleRecord).update({"created_at": old}, synchronize_session=False)
+            session.commit()
+        stats_before = sorted((r.platform, r.count) for r in db.get_publish_stats(granularity="day")[0])
+
+        cutoff = datetime.now() - timedelta(days=90)
+        assert db.archive_publish_records(cutoff, batch_size=2) == 2
+        assert db.archive_publish_records(cutoff, batch_size=2) == 1
+        assert db.archive_publish_records(cutoff, batch_size=2) == 0
+
+        archived = db.read_publish_archive(old.strftime("%Y-%m"))
+        assert [r["id"] for r in archived] == done
+        assert archived[0]["post_url"] == f"https://x/{done[0]}"
+        assert archived[0]["article"]["title"] == "旧文章"
+
+        assert [r.id for r in db.get_publish_records("task802")] == [running]
+        assert db.get_publish_records("task801") == []
+        assert db.is_duplicate("fp_old")  # 归档后仍参与去重
+        assert db.is_duplicate("fp_live")
+        assert db.get_existing_task_id("fp_old") == "task801"
+        again = db.open_publish_task("task803", "旧文章", "fp_old", ["zhihu"])
+        assert again.duplicate is True
+        assert again.task_id == "task801"
+        assert sorted((r.platform, r.count) for r in db.get_publish_stats(granularity="day")[0]) == stats_before
+        db.optimize_db()
+
+    def test_rebuild_stats_after_archive(self, setup_db):
+        """归档后重建统计：已归档记录从 publish_archive 补回，汇总不变"""
+        from datetime import datetime, timedelta
+
+        db = setup_db
+        record_id = db.save_publish_record("task811", "fp_archived_stats", "zhihu", "pending")
+        db.update_publish_record_status(record_id, "published")
+        with db.get_session() as session:
+            old = datetime.now() - timedelta(days=120)
+            session.query(db.PublishRecord).update({"created_at": old}, synchronize_session=False)
+            session.commit()
+
+        def snapshot():
+            rollups, histogram = db.get_publish_stats(granularity="day")
+            return sorted((r.status, r.count) for r in rollups), sorted(h.count for h in histogram)
+
+        before = snapshot()
+        assert before[0] == [("published", 1)]
+        assert db.archive_publish_records(datetime.now() - timedelta(days=90)) == 1
+        assert snapshot() == before
+
+        assert db.rebuild_publish_stats() == 1
+        assert snapshot() == before
+
+    def test_quota_usage(self, setup_db):
+        """配额计数按窗口累加"""
+        db = setup_db
+        assert db.get_quota_usage("twitter", "default", "month", "2026-01") == 0
+        assert db.increment_quota_usage("twitter", "default", "month", "2026-01") == 1
+        assert db.increment_quota_usage("twitter", "default", "month", "2026-01", amount=2) == 3
+        assert db.get_quota_usage("twitter", "default", "month", "2026-02") == 0
+        assert db.get_quota_usage("twitter", "default", "month", "2026-01") == 3
+
+    def test_quota_usage_concurrent_increments(self, setup_db):
+        """多个线程同时开启新窗口并累加，不丢计数也不触发唯一约束冲突"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        db = setup_db
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: db.increment_quota_usage("twitter", "default", "day", "2026-03-01"), range(40)))
+        assert db.get_quota_usage("twitter", "default", "day", "2026-03-01") == 40
+
     def test_update_account_auth(self, setup_db):
         """更新平台账号认证状态"""
         db = setup_db
         db.update_account_auth("zhihu", True, "测试用户")
         db.update_account_auth("zhihu", False)  # 更新同一平台
 
+        accounts = db.get_accounts()
+        assert len(accounts) == 1
+        assert accounts[0].is_authenticated == 0
+        assert accounts[0].display_name == "测试用户"
+
+    def test_update_accounts_auth_batch(self, setup_db):
+        """批量更新认证状态：已有账号更新，新平台创建"""
+        db = setup_db
+        db.update_account_auth("zhihu", True, "测试用户")
+        db.update_accounts_auth({"zhihu": False, "juejin": True})
+
+        accounts = {a.platform: a for a in db.get_accounts()}
+        assert set(accounts) == {"zhihu", "juejin"}
+        assert accounts["zhihu"].is_authenticated == 0
+        assert accounts["zhihu"].display_name == "测试用户"
+        assert accounts["juejin"].is_authenticated == 1
+
 
 class TestHistoryAPI:
     """发布历史 API 测试"""
@@ -165,10 +731,11 @@ class TestHistoryAPI:
         db_path = tmp_path / "test_api.db"
         os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
 
-        from src.storage import database as db_module
         from sqlalchemy import create_engine
         from sqlalchemy.orm import sessionmaker
 
+        from src.storage import database as db_module
+
         engine = create_engine(f"sqlite:///{db_path}", echo=False)
         db_module.engine = engine
         db_module.SessionLocal = sessionmaker(bind=engine)
@@ -181,6 +748,7 @@ class TestHistoryAPI:
     def test_history_endpoint(self, setup_db_for_api):
         """测试历史查询端点"""
         from fastapi.testclient import TestClient
+
         from scripts.run import create_app
 
         db = setup_db_for_api
@@ -199,6 +767,7 @@ class TestHistoryAPI:
     def test_history_filter_by_platform(self, setup_db_for_api):
         """测试按平台过滤"""
         from fastapi.testclient import TestClient
+
         from scripts.run import create_app
 
         db = setup_db_for_api
@@ -213,9 +782,91 @@ class TestHistoryAPI:
         assert data["total"] == 1
         assert data["records"][0]["platform"] == "zhihu"
 
+    def test_history_cursor_pagination(self, setup_db_for_api):
+        """测试游标翻页"""
+        from fastapi.testclient import TestClient
+
+        from scripts.run import create_app
+
+        db = setup_db_for_api
+        for i in range(3):
+            db.save_publish_record(f"t10{i}", "fp100", "zhihu", "published")
+
+        client = TestClient(create_app())
+
+        first = client.get("/api/v1/history?size=2").json()
+        assert len(first["records"]) == 2
+        assert first["next_cursor"]
+
+        params = {"size": 2, "after": first["next_cursor"], "with_total": False}
+        second = client.get("/api/v1/history", params=params).json()
+        assert len(second["records"]) == 1
+        assert second["total"] is None
+        assert second["next_cursor"] is None
+
+        assert client.get("/api/v1/history?after=bad").status_code == 400
+
+    def test_history_export(self, setup_db_for_api, monkeypatch):
+        """测试流式导出（跨多个批次，NDJSON / CSV）"""
+        import csv
+        import io
+        import json
+
+        from fastapi.testclient import TestClient
+
+        from scripts.run import create_app
+        from src.config import settings
+
+        monkeypatch.setattr(settings, "history_export_batch_size", 2)
+        db = setup_db_for_api
+        db.save_article("导出文章", "fp200", tags='["AI", "发布"]')
+        for i in range(5):
+            db.save_publish_record(f"t20{i}", "fp200", "zhihu" if i < 3 else "juejin", "published")
+
+        client = TestClient(create_app())
+
+        response = client.get("/api/v1/history/export?format=ndjson")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["task_id"] for r in lines] == [f"t20{i}" for i in range(5)]
+        assert lines[0]["title"] == "导出文章"
+        assert lines[0]["tags"] == ["AI", "发布"]
+
+        response = client.get("/api/v1/history/export", params={"format": "csv", "platform": "juejin"})
+        rows = list(csv.DictReader(io.StringIO(response.text.lstrip("\ufeff"))))
+        assert [r["task_id"] for r in rows] == ["t203", "t204"]
+        assert rows[0]["tags"] == "AI,发布"
+
+        assert client.get("/api/v1/history/export?format=xml").status_code == 422
+
+    def test_stats_endpoint(self, setup_db_for_api):
+        """测试统计端点"""
+        from fastapi.testclient import TestClient
+
+        from scripts.run import create_app
+
+        db = setup_db_for_api
+        for i, status in enumerate(["published", "published", "failed"]):
+            record_id = db.save_publish_record(f"t30{i}", "fp300", "zhihu", "pending")
+            db.update_publish_record_status(record_id, status)
+
+        client = TestClient(create_app())
+        data = client.get("/api/v1/stats?granularity=hour").json()
+
+        zhihu = data["platforms"]["zhihu"]
+        assert zhihu["total"] == 3
+        assert zhihu["statuses"] == {"published": 2, "failed": 1}
+        assert zhihu["success_rate"] == pytest.approx(0.6667)
+        assert zhihu["latency_p50_ms"] == 1000
+        assert len(data["buckets"]) == 1
+
+        assert client.get("/api/v1/stats?granularity=week").status_code == 422
+
     def test_retry_nonexistent_task(self, setup_db_for_api):
         """测试重试不存在的任务"""
         from fastapi.testclient import TestClient
+
         from scripts.run import create_app
 
         app = create_app()
@@ -223,3 +874,17 @@ class TestHistoryAPI:
 
         response = client.post("/api/v1/retry/nonexistent")
         assert response.status_code == 404
+
+
+def _claim_all(url: str, owner: str, queue) -> None:
+    """子进程：使用独立的 engine 认领直到队列为空"""
+    from sqlalchemy.orm import sessionmaker
+
+    from src.storage import database as db
+
+    db.engine = db.create_db_engine(url)
+    db.SessionLocal = sessionmaker(bind=db.engine)
+    claimed = []
+    while (job := db.claim_next_publish_job(owner=owner)) is not None:
+        claimed.append(job.id)
+    queue.put(claimed)
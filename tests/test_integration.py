@@ -2,16 +2,20 @@
 
 import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
 
 import pytest
 
-from src.config import Platform
-from src.models import PlatformResult, PublishRequest, PublishStatus
+from src.config import Platform, PublishMethod, settings
+from src.models import ErrorCategory, PlatformResult, PublishRequest, PublishStatus
 from src.publisher_hub import PublisherHub
+from src.scheduler import ConcurrencyScheduler
+from src.storage.database import init_db
 
 
 @pytest.fixture
 def hub():
+    init_db()
     return PublisherHub()
 
 
@@ -37,20 +41,17 @@ def sample_video_request():
     )
 
 
-def _make_mock_client(response_json):
-    """构建正确的 httpx.AsyncClient mock（支持 async with 上下文管理器）"""
+def _make_mock_client(response_json=None):
+    """构建 httpx.AsyncClient mock（发布器复用长连接客户端，直接调用 post）"""
     mock_resp = MagicMock()
     mock_resp.json.return_value = response_json
     mock_resp.status_code = 200
 
     mock_client = AsyncMock()
+    mock_client.is_closed = False
     mock_client.post.return_value = mock_resp
 
-    mock_client_cm = MagicMock()
-    mock_client_cm.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client_cm.__aexit__ = AsyncMock(return_value=False)
-
-    return mock_client_cm
+    return mock_client
 
 
 class TestWechatsyncIntegration:
@@ -66,7 +67,17 @@ class TestWechatsyncIntegration:
                         "platform": "zhihu",
                         "success": True,
                         "postUrl": "https://zhuanlan.zhihu.com/p/123456",
-                    }
+                    },
+                    {
+                        "platform": "juejin",
+                        "success": True,
+                        "postUrl": "https://juejin.cn/post/123456",
+                    },
+                    {
+                        "platform": "csdn",
+                        "success": True,
+                        "postUrl": "https://blog.csdn.net/u/article/details/123456",
+                    },
                 ]
             },
         }
@@ -83,6 +94,27 @@ class TestWechatsyncIntegration:
                 assert result.status == PublishStatus.PUBLISHED
                 assert result.platform in [Platform.ZHIHU, Platform.JUEJIN, Platform.CSDN]
 
+    @pytest.mark.asyncio
+    async def test_status_includes_attempt_timings(self, hub):
+        """任务状态返回每次尝试的耗时明细"""
+        request = PublishRequest(
+            title="耗时明细测试",
+            content=f"# 耗时\n\n{uuid4().hex}",
+            platforms=[Platform.ZHIHU, Platform.JUEJIN],
+        )
+        mock_cm = _make_mock_client(
+            {"result": {"results": [{"platform": "zhihu", "success": True}, {"platform": "juejin", "success": True}]}}
+        )
+
+        with patch("src.publishers.wechatsync_publisher.httpx.AsyncClient", return_value=mock_cm):
+            response = await hub.publish(request)
+
+        status = await hub.get_task_status(response.task_id)
+        for result in status.results:
+            assert len(result.attempts) == 1
+            assert result.attempts[0].status == PublishStatus.PUBLISHED
+            assert "bridge_call" in result.attempts[0].phases
+
     @pytest.mark.asyncio
     async def test_wechatsync_publish_failure(self, hub):
         """模拟 Wechatsync MCP 返回错误"""
@@ -110,22 +142,106 @@ class TestWechatsyncIntegration:
 
         request = PublishRequest(
             title="超时测试",
-            content="测试内容",
+            content=f"测试内容 {uuid4().hex}",
             platforms=[Platform.JUEJIN],
         )
 
-        mock_client = AsyncMock()
-        mock_client.post.side_effect = httpx.TimeoutException("连接超时")
-
-        mock_cm = MagicMock()
-        mock_cm.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_cm.__aexit__ = AsyncMock(return_value=False)
+        mock_cm = _make_mock_client()
+        mock_cm.post.side_effect = httpx.ConnectTimeout("连接超时")
 
         with patch("src.publishers.wechatsync_publisher.httpx.AsyncClient", return_value=mock_cm):
             response = await hub.publish(request)
-            assert response.results[0].status == PublishStatus.FAILED
+            # 进程内重试用尽后转为持久化延迟重试
+            assert response.results[0].status == PublishStatus.RETRY_SCHEDULED
+            assert response.results[0].next_attempt_at is not None
             assert "超时" in response.results[0].error
 
+    @pytest.mark.asyncio
+    async def test_wechatsync_read_timeout_not_retried(self, hub):
+        """请求已发出后超时：结果未知，不自动重试，超时按平台数放大"""
+        import httpx
+
+        request = PublishRequest(
+            title="同步超时测试",
+            content=f"测试内容 {uuid4().hex}",
+            platforms=[Platform.JUEJIN, Platform.ZHIHU, Platform.CSDN],
+        )
+
+        mock_cm = _make_mock_client()
+        mock_cm.post.side_effect = httpx.ReadTimeout("读取超时")
+
+        with patch("src.publishers.wechatsync_publisher.httpx.AsyncClient", return_value=mock_cm):
+            response = await hub.publish(request)
+
+        assert mock_cm.post.call_count == 1
+        assert mock_cm.post.call_args.kwargs["timeout"] == settings.wechatsync_sync_timeout_per_platform * 3
+        for result in response.results:
+            assert result.status == PublishStatus.FAILED
+            assert result.error_category == ErrorCategory.PERMANENT
+            assert "核对" in result.error
+
+
+    @pytest.mark.asyncio
+    async def test_wechatsync_single_bridge_call(self, hub):
+        """同一请求的所有 Wechatsync 平台合并为一次 syncArticle，并按平台拆分结果"""
+        request = PublishRequest(
+            title="批量同步测试",
+            content=f"一次同步多个平台 {uuid4().hex}",
+            platforms=[Platform.ZHIHU, Platform.JUEJIN, Platform.TWITTER, Platform.CSDN],
+        )
+
+        mock_response = {
+            "result": {
+                "results": [
+                    {"platform": "zhihu", "success": True, "postUrl": "https://zhuanlan.zhihu.com/p/1"},
+                    {"platform": "juejin", "success": False, "error": "掘金未登录"},
+                    {"platform": "csdn", "success": True, "postUrl": "https://blog.csdn.net/1"},
+                ]
+            },
+        }
+        mock_cm = _make_mock_client(mock_response)
+
+        with patch("src.publishers.wechatsync_publisher.httpx.AsyncClient", return_value=mock_cm):
+            response = await hub.publish(request)
+
+        assert mock_cm.post.call_count == 1
+        payload = mock_cm.post.call_args.kwargs["json"]
+        assert payload["method"] == "syncArticle"
+        assert payload["params"]["platforms"] == ["zhihu", "juejin", "csdn"]
+
+        by_platform = {r.platform: r for r in response.results}
+        assert [r.platform for r in response.results] == request.platforms
+        assert by_platform[Platform.ZHIHU].post_url == "https://zhuanlan.zhihu.com/p/1"
+        assert by_platform[Platform.JUEJIN].status == PublishStatus.FAILED
+        assert by_platform[Platform.CSDN].status == PublishStatus.PUBLISHED
+
+        status = await hub.get_task_status(response.task_id)
+        assert {r.platform: r.status for r in status.results}[Platform.JUEJIN] == PublishStatus.FAILED
+        assert len(status.results) == 4
+
+
+class TestHttpClientPool:
+    """长连接客户端测试"""
+
+    @pytest.mark.asyncio
+    async def test_client_reused_across_requests(self, hub):
+        """同一发布器的多次请求复用同一个客户端，关闭后重新创建"""
+        publisher = hub._get_publisher(Platform.ZHIHU)
+
+        with patch(
+            "src.publishers.http_client.httpx.AsyncClient",
+            side_effect=lambda **kw: _make_mock_client({"result": {}}),
+        ) as factory:
+            await publisher._bridge_request("listPlatforms")
+            await publisher._bridge_request("listPlatforms")
+            assert factory.call_count == 1
+
+            await hub.shutdown()
+            assert publisher._client is None
+
+            await publisher._bridge_request("listPlatforms")
+            assert factory.call_count == 2
+
 
 class TestPlaywrightIntegration:
     """Playwright 浏览器自动化集成测试（Mock 模式）"""
@@ -140,6 +256,7 @@ class TestPlaywrightIntegration:
                 platform=Platform.XIAOHONGSHU,
                 status=PublishStatus.FAILED,
                 error="playwright 未安装",
+                error_category=ErrorCategory.PERMANENT,
             ),
         ):
             response = await hub.publish(sample_video_request)
@@ -176,13 +293,38 @@ class TestContentDedup:
             resp2 = await hub.publish(request)
             assert resp2.content_fingerprint == resp1.content_fingerprint
 
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_share_one_publish(self, hub):
+        """相同内容的并发请求只执行一次发布，后到的请求返回首个任务的最终结果"""
+        request = PublishRequest(
+            title="并发去重测试",
+            content=f"并发重复请求 {uuid4().hex}",
+            platforms=[Platform.CSDN, Platform.JUEJIN],
+        )
+
+        async def slow_publish(req, platforms):
+            await asyncio.sleep(0.1)
+            return [PlatformResult(platform=p, status=PublishStatus.PUBLISHED) for p in platforms]
+
+        with patch(
+            "src.publishers.wechatsync_publisher.WechatsyncPublisher.publish_many",
+            side_effect=slow_publish,
+        ) as publish_many:
+            responses = await asyncio.gather(*(hub.publish(request) for _ in range(3)))
+
+        assert publish_many.call_count == 1
+        assert len({r.task_id for r in responses}) == 1
+        for response in responses:
+            assert [r.status for r in response.results] == [PublishStatus.PUBLISHED] * 2
+        assert hub._inflight == {}
+
 
 class TestConcurrencyControl:
     """并发控制测试"""
 
     @pytest.mark.asyncio
     async def test_max_concurrency(self, hub):
-        """验证最多 3 个平台同时发布"""
+        """验证同时发布数不超过调度器的 Wechatsync 并发上限"""
         request = PublishRequest(
             title="并发测试",
             content="测试并发控制",
@@ -214,16 +356,60 @@ class TestConcurrencyControl:
             mock_resp.status_code = 200
             return mock_resp
 
-        mock_client = AsyncMock()
-        mock_client.post.side_effect = slow_mock_post
-
-        mock_cm = MagicMock()
-        mock_cm.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_cm.__aexit__ = AsyncMock(return_value=False)
+        mock_cm = _make_mock_client()
+        mock_cm.post.side_effect = slow_mock_post
 
         with patch("src.publishers.wechatsync_publisher.httpx.AsyncClient", return_value=mock_cm):
             await hub.publish(request)
-            assert max_active <= 3, f"最大并发数 {max_active} 超过限制 3"
+            limit = hub.scheduler.method_limit(PublishMethod.WECHATSYNC_MCP)
+            assert max_active <= limit, f"最大并发数 {max_active} 超过限制 {limit}"
+
+    @pytest.mark.asyncio
+    async def test_limit_shared_across_requests(self):
+        """并发上限由调度器全局共享，而不是每个请求各自一份"""
+        scheduler = ConcurrencyScheduler(method_limits={PublishMethod.OFFICIAL_API: 2}, platform_limits={})
+
+        active = 0
+        max_active = 0
+
+        async def fake_publish():
+            nonlocal active, max_active
+            async with scheduler.slot(Platform.TWITTER):
+                active += 1
+                max_active = max(max_active, active)
+                await asyncio.sleep(0.02)
+                active -= 1
+
+        await asyncio.gather(*(fake_publish() for _ in range(6)))
+        assert max_active == 2
+
+    @pytest.mark.asyncio
+    async def test_fifo_order_and_snapshot(self):
+        """名额按到达顺序分配，并可查询排队深度"""
+        scheduler = ConcurrencyScheduler(method_limits={}, platform_limits={Platform.DOUYIN: 1})
+        order: list[int] = []
+        gate = asyncio.Event()
+
+        async def holder():
+            async with scheduler.slot(Platform.DOUYIN):
+                await gate.wait()
+
+        async def waiter(i: int):
+            async with scheduler.slot(Platform.DOUYIN):
+                order.append(i)
+
+        first = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(waiter(i)) for i in range(3)]
+        await asyncio.sleep(0)
+
+        snapshot = scheduler.snapshot()["platforms"]["douyin"]
+        assert snapshot == {"limit": 1, "active": 1, "waiting": 3}
+
+        gate.set()
+        await asyncio.gather(first, *waiters)
+        assert order == [0, 1, 2]
+        assert scheduler.snapshot()["platforms"]["douyin"]["active"] == 0
 
 
 class TestEndToEndFlow:
@@ -246,7 +432,12 @@ class TestEndToEndFlow:
                         "platform": "zhihu",
                         "success": True,
                         "postUrl": "https://example.com/article/1",
-                    }
+                    },
+                    {
+                        "platform": "csdn",
+                        "success": True,
+                        "postUrl": "https://example.com/article/2",
+                    },
                 ]
             },
         }
@@ -285,3 +476,404 @@ class TestEndToEndFlow:
         assert Platform.ZHIHU in names
         assert Platform.WECHAT_MP in names
         assert Platform.XIAOHONGSHU in names
+
+
+class TestAuthStatusCache:
+    """认证状态缓存测试"""
+
+    @pytest.fixture(autouse=True)
+    def no_persisted_accounts(self):
+        with patch("src.auth_cache.get_accounts", new_callable=AsyncMock, return_value=[]):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_wechatsync_platforms_share_one_probe(self, hub):
+        """所有 Wechatsync 平台共用一次 listPlatforms，第二次查询直接命中缓存"""
+        bridge_response = [
+            {"id": "zhihu", "isAuthenticated": True},
+            {"id": "juejin", "isAuthenticated": False},
+        ]
+        with patch(
+            "src.publishers.wechatsync_publisher.WechatsyncPublisher._bridge_request",
+            new_callable=AsyncMock,
+            return_value=bridge_response,
+        ) as mock_bridge:
+            first = await hub.get_platforms()
+            second = await hub.get_platforms()
+
+        assert mock_bridge.call_count == 1
+        for response in (first, second):
+            authed = {p.platform: p.is_authenticated for p in response.platforms}
+            assert authed[Platform.ZHIHU] is True
+            assert authed[Platform.JUEJIN] is False
+            assert authed[Platform.XIAOHONGSHU] is False
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_refreshed_in_background(self):
+        """过期条目先返回旧值，后台刷新完成后返回新值"""
+        from src.auth_cache import AuthStatusCache
+
+        probe_results = {Platform.ZHIHU: True}
+
+        async def probe(platforms):
+            return {p: probe_results.get(p, False) for p in platforms}
+
+        cache = AuthStatusCache(probe, ttl=0)
+        assert await cache.get(Platform.ZHIHU) is True
+
+        probe_results[Platform.ZHIHU] = False
+        assert await cache.get(Platform.ZHIHU) is True  # 旧值，同时触发后台刷新
+        await asyncio.sleep(0)
+        await cache._refreshing
+        assert await cache.get(Platform.ZHIHU) is False
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_share_probe(self):
+        """并发查询只触发一次探测"""
+        from src.auth_cache import AuthStatusCache
+
+        calls = 0
+
+        async def probe(platforms):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {p: True for p in platforms}
+
+        cache = AuthStatusCache(probe, ttl=60)
+        results = await asyncio.gather(*(cache.get(Platform.TWITTER) for _ in range(5)))
+
+        assert results == [True] * 5
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_probe_keeps_cached_status(self):
+        """探测结果未知（限流、5xx）时保留缓存值，已确认的状态一次批量写库"""
+        from src.auth_cache import AuthStatusCache
+
+        probe_results = {Platform.TWITTER: True, Platform.ZHIHU: True}
+
+        async def probe(platforms):
+            return {p: probe_results[p] for p in platforms}
+
+        cache = AuthStatusCache(probe, ttl=60)
+        with patch("src.auth_cache.update_accounts_auth", new_callable=AsyncMock) as mock_write:
+            await cache.refresh([Platform.TWITTER, Platform.ZHIHU])
+            probe_results[Platform.TWITTER] = None  # Twitter 被限流
+            probe_results[Platform.ZHIHU] = False
+            results = await cache.refresh([Platform.TWITTER, Platform.ZHIHU])
+
+        assert results == {Platform.TWITTER: True, Platform.ZHIHU: False}
+        assert mock_write.await_count == 2
+        assert mock_write.await_args_list[-1].args == ({"zhihu": False},)
+
+    @pytest.mark.asyncio
+    async def test_explicit_refresh_reprobes_during_background_refresh(self):
+        """后台刷新进行中时显式 refresh 等待其结束后仍重新探测，并发 refresh 依次执行不重叠"""
+        from src.auth_cache import AuthStatusCache
+
+        probed: list[list[Platform]] = []
+        running = 0
+        max_running = 0
+
+        async def probe(platforms):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            probed.append(list(platforms))
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {p: True for p in platforms}
+
+        cache = AuthStatusCache(probe, ttl=60)
+        with patch("src.auth_cache.update_accounts_auth", new_callable=AsyncMock):
+            await cache.get_many([Platform.ZHIHU, Platform.TWITTER])
+            cache._ttl = 0
+            await cache.get(Platform.ZHIHU)  # 过期，触发后台刷新
+            assert cache._is_refreshing()
+            await asyncio.gather(cache.refresh([Platform.TWITTER]), cache.refresh([Platform.TWITTER]))
+
+        assert probed[1:] == [[Platform.ZHIHU], [Platform.TWITTER], [Platform.TWITTER]]
+        assert max_running == 1
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_failure_logged(self, caplog):
+        """后台刷新失败时记录日志"""
+        from src.auth_cache import AuthStatusCache
+
+        calls = 0
+
+        async def probe(platforms):
+            nonlocal calls
+            calls += 1
+            if calls > 1:
+                raise RuntimeError("探测失败")
+            return {p: True for p in platforms}
+
+        cache = AuthStatusCache(probe, ttl=0)
+        with patch("src.auth_cache.update_accounts_auth", new_callable=AsyncMock):
+            assert await cache.get(Platform.ZHIHU) is True
+            assert await cache.get(Platform.ZHIHU) is True  # 旧值，后台刷新失败
+            await asyncio.wait({cache._refreshing})
+
+        assert "刷新认证状态失败" in caplog.text
+
+
+class TestAsyncQueue:
+    """异步任务队列测试"""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_returns_pending_immediately(self, hub):
+        """入队模式立即返回 pending 结果，不调用发布器"""
+        request = PublishRequest(
+            title="队列测试文章",
+            content=f"# 队列\n\n入队后立即返回 {uuid4().hex}",
+            platforms=[Platform.ZHIHU, Platform.JUEJIN],
+        )
+
+        with patch(
+            "src.publishers.wechatsync_publisher.WechatsyncPublisher.publish_many",
+            new_callable=AsyncMock,
+        ) as mock_publish:
+            response = await hub.enqueue(request)
+
+        mock_publish.assert_not_called()
+        assert response.task_id
+        assert [r.status for r in response.results] == [PublishStatus.PENDING, PublishStatus.PENDING]
+
+        status = await hub.get_task_status(response.task_id)
+        assert status.status == PublishStatus.PENDING
+
+    @pytest.mark.asyncio
+    async def test_worker_pool_drains_queue(self, hub):
+        """WorkerPool 从数据库认领并执行排队任务"""
+        request = PublishRequest(
+            title="队列消费测试",
+            content=f"worker 后台执行 {uuid4().hex}",
+            platforms=[Platform.CSDN],
+        )
+
+        with patch(
+            "src.publishers.wechatsync_publisher.WechatsyncPublisher.publish_many",
+            new_callable=AsyncMock,
+            return_value=[PlatformResult(platform=Platform.CSDN, status=PublishStatus.PUBLISHED)],
+        ):
+            response = await hub.enqueue(request)
+            await hub.start()
+            try:
+                for _ in range(50):
+                    status = await hub.get_task_status(response.task_id)
+                    if status.status == PublishStatus.PUBLISHED:
+                        break
+                    await asyncio.sleep(0.05)
+            finally:
+                await hub.shutdown()
+
+        assert status.status == PublishStatus.PUBLISHED
+
+    @pytest.mark.asyncio
+    async def test_worker_survives_claim_errors(self, hub):
+        """认领时数据库暂时出错，worker 退避后继续消费队列"""
+        from src import worker_pool as worker_pool_module
+
+        request = PublishRequest(
+            title="认领失败恢复", content=f"数据库暂时锁定 {uuid4().hex}", platforms=[Platform.CSDN]
+        )
+        real_claim = worker_pool_module.claim_next_publish_job
+        failures = []
+
+        async def flaky_claim(*args, **kwargs):
+            if len(failures) < 8:  # 超过 worker 数，每个 worker 都至少失败一次
+                failures.append(1)
+                raise RuntimeError("database is locked")
+            return await real_claim(*args, **kwargs)
+
+        hub.worker_pool._poll_interval = 0.05
+        with patch.object(worker_pool_module, "claim_next_publish_job", side_effect=flaky_claim), patch(
+            "src.publishers.wechatsync_publisher.WechatsyncPublisher.publish_many",
+            new_callable=AsyncMock,
+            return_value=[PlatformResult(platform=Platform.CSDN, status=PublishStatus.PUBLISHED)],
+        ):
+            response = await hub.enqueue(request)
+            await hub.start()
+            try:
+                for _ in range(100):
+                    status = await hub.get_task_status(response.task_id)
+                    if status.status == PublishStatus.PUBLISHED:
+                        break
+                    await asyncio.sleep(0.05)
+            finally:
+                await hub.shutdown()
+
+        assert len(failures) == 8
+        assert status.status == PublishStatus.PUBLISHED
+
+    @pytest.mark.asyncio
+    async def test_retry_republishes_from_content_store(self, hub):
+        """重试不需要重新提交正文：失败平台重新入队，worker 从正文存储读回内容发布"""
+        content = f"# 重试\n\n正文只提交一次 {uuid4().hex}\n" + "长正文段落。" * 2000
+        request = PublishRequest(title="重试测试", content=content, platforms=[Platform.ZHIHU], tags=["重试"])
+
+        with patch(
+            "src.publishers.wechatsync_publisher.WechatsyncPublisher.publish_many",
+            new_callable=AsyncMock,
+            return_value=[
+                PlatformResult(
+                    platform=Platform.ZHIHU,
+                    status=PublishStatus.FAILED,
+                    error="boom",
+                    error_category=ErrorCategory.PERMANENT,
+                )
+            ],
+        ):
+            first = await hub.publish(request)
+        assert first.results[0].status == PublishStatus.FAILED
+
+        published = AsyncMock(return_value=[PlatformResult(platform=Platform.ZHIHU, status=PublishStatus.PUBLISHED)])
+        with patch("src.publishers.wechatsync_publisher.WechatsyncPublisher.publish_many", published):
+            retry = await hub.retry_task(first.task_id)
+            assert [r.status for r in retry.results] == [PublishStatus.PENDING]
+            await hub.start()
+            try:
+                for _ in range(50):
+                    status = await hub.get_task_status(first.task_id)
+                    if status.status == PublishStatus.PUBLISHED:
+                        break
+                    await asyncio.sleep(0.05)
+            finally:
+                await hub.shutdown()
+
+        assert status.status == PublishStatus.PUBLISHED
+        republished = published.call_args.args[0]
+        assert republished.content == content
+        assert republished.tags == ["重试"]
+        assert republished.content_fingerprint == request.content_fingerprint
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_scheduled_and_retried(self, hub):
+        """进程内重试用尽的失败持久化为 retry_scheduled，到期后由 RetryEngine 重新入队执行"""
+        from datetime import datetime, timedelta
+
+        request = PublishRequest(title="延迟重试", content=f"持久化重试 {uuid4().hex}", platforms=[Platform.JUEJIN])
+        failed = [PlatformResult(platform=Platform.JUEJIN, status=PublishStatus.FAILED, error="503", retries=3)]
+        with patch(
+            "src.publishers.wechatsync_publisher.WechatsyncPublisher.publish_many_with_retry",
+            new_callable=AsyncMock,
+            return_value=failed,
+        ):
+            first = await hub.publish(request)
+
+        result = first.results[0]
+        assert result.status == PublishStatus.RETRY_SCHEDULED
+        assert result.next_attempt_at > datetime.now()
+        status = await hub.get_task_status(first.task_id)
+        assert status.results[0].status == PublishStatus.RETRY_SCHEDULED
+        assert status.results[0].next_attempt_at == result.next_attempt_at
+
+        # 未到期不认领；到期后重置为 pending 并入队（共享数据库中可能还有其他到期记录）
+        await hub.retry_engine.run_once(now=datetime.now())
+        assert (await hub.get_task_status(first.task_id)).results[0].status == PublishStatus.RETRY_SCHEDULED
+        assert await hub.retry_engine.run_once(now=result.next_attempt_at + timedelta(seconds=1)) >= 1
+        status = await hub.get_task_status(first.task_id)
+        assert status.results[0].status == PublishStatus.PENDING
+        assert status.results[0].next_attempt_at is None
+
+        published = [PlatformResult(platform=Platform.JUEJIN, status=PublishStatus.PUBLISHED)]
+        with patch(
+            "src.publishers.wechatsync_publisher.WechatsyncPublisher.publish_many_with_retry",
+            new_callable=AsyncMock,
+            return_value=published,
+        ):
+            await hub.start()
+            try:
+                for _ in range(50):
+                    status = await hub.get_task_status(first.task_id)
+                    if status.status == PublishStatus.PUBLISHED:
+                        break
+                    await asyncio.sleep(0.05)
+            finally:
+                await hub.shutdown()
+
+        assert status.status == PublishStatus.PUBLISHED
+
+
+class TestLifecycle:
+    """优雅关闭与崩溃恢复测试"""
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_inflight_and_rejects_new_work(self, hub):
+        """关闭时拒绝新任务，并等待执行中的发布完成"""
+        from src.lifecycle import ServiceDraining
+
+        release = asyncio.Event()
+
+        async def slow_publish(request, platforms):
+            await release.wait()
+            return [PlatformResult(platform=p, status=PublishStatus.PUBLISHED) for p in platforms]
+
+        request = PublishRequest(title="排空测试", content=f"关闭前完成 {uuid4().hex}", platforms=[Platform.ZHIHU])
+        with patch("src.publishers.wechatsync_publisher.WechatsyncPublisher.publish_many", side_effect=slow_publish):
+            await hub.start()
+            publishing = asyncio.create_task(hub.publish(request))
+            while not hub.lifecycle.inflight:
+                await asyncio.sleep(0.01)
+
+            shutdown = asyncio.create_task(hub.shutdown())
+            await asyncio.sleep(0.05)
+            with pytest.raises(ServiceDraining):
+                await hub.enqueue(PublishRequest(title="新任务", content=uuid4().hex, platforms=[Platform.ZHIHU]))
+            assert not shutdown.done()
+
+            release.set()
+            response = await publishing
+            await shutdown
+
+        assert response.results[0].status == PublishStatus.PUBLISHED
+
+    @pytest.mark.asyncio
+    async def test_drain_timeout_checkpoints_to_retry(self, hub):
+        """超过关闭期限的任务被中断，未完成的平台转为重试而不是一直停留在 processing"""
+        hub.lifecycle._drain_timeout = 0.05
+
+        async def hang(request, platforms):
+            await asyncio.Event().wait()
+
+        request = PublishRequest(title="中断测试", content=f"关闭时中断 {uuid4().hex}", platforms=[Platform.JUEJIN])
+        with patch("src.publishers.wechatsync_publisher.WechatsyncPublisher.publish_many", side_effect=hang):
+            await hub.start()
+            publishing = asyncio.create_task(hub.publish(request))
+            while not hub.lifecycle.inflight:
+                await asyncio.sleep(0.01)
+            await hub.shutdown()
+
+        assert publishing.cancelled()
+        status = await PublisherHub().get_task_status(await _task_id_for(request))
+        assert status.results[0].status == PublishStatus.RETRY_SCHEDULED
+
+
+    @pytest.mark.asyncio
+    async def test_start_recovers_processing_records_without_job(self, hub):
+        """升级前遗留、没有队列任务的 processing 记录在启动时转为重试（无正文时直接失败），不再永远停留在 processing"""
+        from datetime import datetime, timedelta
+
+        from src.storage import database
+
+        task_id = uuid4().hex[:12]
+        record_id = database.save_publish_record(task_id, uuid4().hex, "zhihu", "processing")
+        with database.get_session() as session:
+            session.query(database.PublishRecord).filter_by(id=record_id).update(
+                {"updated_at": datetime.now() - timedelta(days=1)}, synchronize_session=False
+            )
+            session.commit()
+
+        await hub.start()
+        await hub.shutdown()
+
+        status = await PublisherHub().get_task_status(task_id)
+        assert status.results[0].status == PublishStatus.FAILED
+
+
+async def _task_id_for(request: PublishRequest) -> str:
+    from src.storage.async_database import get_existing_task_id
+
+    return await get_existing_task_id(request.content_fingerprint)
@@ -1,15 +1,16 @@
 """发布器单元测试 - Mock 各平台 API/MCP 响应"""
 
-import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
-
+import asyncio
 import sys
 from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config import Platform
-from src.models import PublishRequest, PublishStatus
+from src.models import PlatformResult, PublishRequest, PublishStatus
 
 
 @pytest.fixture
@@ -40,8 +41,8 @@ class TestBasePublisher:
     @pytest.mark.asyncio
     async def test_publish_with_retry_success(self, sample_article_request):
         """测试重试机制 - 首次成功"""
-        from src.publishers.base import BasePublisher
         from src.models import PlatformResult
+        from src.publishers.base import BasePublisher
 
         class MockPublisher(BasePublisher):
             async def publish(self, request, platform):
@@ -61,8 +62,8 @@ class TestBasePublisher:
     @pytest.mark.asyncio
     async def test_publish_with_retry_eventual_success(self, sample_article_request):
         """测试重试机制 - 第二次成功"""
-        from src.publishers.base import BasePublisher
         from src.models import PlatformResult
+        from src.publishers.base import BasePublisher
 
         call_count = 0
 
@@ -94,8 +95,8 @@ class TestBasePublisher:
     @pytest.mark.asyncio
     async def test_publish_with_retry_all_failed(self, sample_article_request):
         """测试重试机制 - 全部失败"""
-        from src.publishers.base import BasePublisher
         from src.models import PlatformResult
+        from src.publishers.base import BasePublisher
 
         class MockPublisher(BasePublisher):
             MAX_RETRIES = 2
@@ -120,6 +121,189 @@ class TestBasePublisher:
         assert result.retries == 2
 
 
+    @pytest.mark.asyncio
+    async def test_publish_with_retry_permanent_error_short_circuits(self, sample_article_request):
+        """永久性错误不重试"""
+        from src.models import ErrorCategory, PlatformResult
+        from src.publishers.base import BasePublisher
+
+        call_count = 0
+
+        class MockPublisher(BasePublisher):
+            async def publish(self, request, platform):
+                nonlocal call_count
+                call_count += 1
+                return PlatformResult(
+                    platform=platform,
+                    status=PublishStatus.FAILED,
+                    error="平台不支持",
+                    error_category=ErrorCategory.PERMANENT,
+                )
+
+            async def check_auth(self, platform):
+                return True
+
+            def get_supported_platforms(self):
+                return [Platform.ZHIHU]
+
+        result = await MockPublisher().publish_with_retry(sample_article_request, Platform.ZHIHU)
+        assert call_count == 1
+        assert result.retries == 0
+        assert result.error == "平台不支持"
+        assert result.error_category == ErrorCategory.PERMANENT
+
+    @pytest.mark.asyncio
+    async def test_publish_with_retry_honors_retry_after(self, sample_article_request, monkeypatch):
+        """限流错误按 retry_after 等待，而非指数退避"""
+        from src.models import ErrorCategory, PlatformResult
+        from src.publishers import base as base_module
+        from src.publishers.base import BasePublisher
+
+        sleeps: list[float] = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+
+        monkeypatch.setattr(base_module.asyncio, "sleep", fake_sleep)
+
+        call_count = 0
+
+        class MockPublisher(BasePublisher):
+            async def publish(self, request, platform):
+                nonlocal call_count
+                call_count += 1
+                if call_count == 1:
+                    return PlatformResult(
+                        platform=platform,
+                        status=PublishStatus.FAILED,
+                        error="429",
+                        error_category=ErrorCategory.RATE_LIMITED,
+                        retry_after=7.5,
+                    )
+                return PlatformResult(platform=platform, status=PublishStatus.PUBLISHED)
+
+            async def check_auth(self, platform):
+                return True
+
+            def get_supported_platforms(self):
+                return [Platform.TWITTER]
+
+        result = await MockPublisher().publish_with_retry(sample_article_request, Platform.TWITTER)
+        assert result.status == PublishStatus.PUBLISHED
+        assert sleeps == [7.5]
+
+    @pytest.mark.asyncio
+    async def test_publish_with_retry_retry_after_too_long(self, sample_article_request):
+        """retry_after 超过限流等待上限时直接返回"""
+        from src.models import ErrorCategory, PlatformResult
+        from src.publishers.base import BasePublisher
+
+        class MockPublisher(BasePublisher):
+            async def publish(self, request, platform):
+                return PlatformResult(
+                    platform=platform,
+                    status=PublishStatus.FAILED,
+                    error="429",
+                    error_category=ErrorCategory.RATE_LIMITED,
+                    retry_after=3600,
+                )
+
+            async def check_auth(self, platform):
+                return True
+
+            def get_supported_platforms(self):
+                return [Platform.TWITTER]
+
+        result = await MockPublisher().publish_with_retry(sample_article_request, Platform.TWITTER)
+        assert result.retries == 0
+        assert result.retry_after == 3600
+
+
+    @pytest.mark.asyncio
+    async def test_publish_many_with_retry_only_retries_failed(self, sample_article_request):
+        """批量发布时每轮只重试失败的平台"""
+        from src.models import PlatformResult
+        from src.publishers.base import BasePublisher
+
+        batches: list[list[Platform]] = []
+
+        class MockPublisher(BasePublisher):
+            BASE_RETRY_DELAY = 0.01
+            SUPPORTS_BATCH = True
+
+            async def publish(self, request, platform):
+                raise NotImplementedError
+
+            async def publish_many(self, request, platforms):
+                batches.append(list(platforms))
+                return [
+                    PlatformResult(
+                        platform=p,
+                        status=(
+                            PublishStatus.FAILED
+                            if p == Platform.JUEJIN and len(batches) == 1
+                            else PublishStatus.PUBLISHED
+                        ),
+                        error="临时错误",
+                    )
+                    for p in platforms
+                ]
+
+            async def check_auth(self, platform):
+                return True
+
+            def get_supported_platforms(self):
+                return [Platform.ZHIHU, Platform.JUEJIN]
+
+        results = await MockPublisher().publish_many_with_retry(
+            sample_article_request, [Platform.ZHIHU, Platform.JUEJIN]
+        )
+        assert batches == [[Platform.ZHIHU, Platform.JUEJIN], [Platform.JUEJIN]]
+        assert [r.status for r in results] == [PublishStatus.PUBLISHED, PublishStatus.PUBLISHED]
+        assert [r.retries for r in results] == [0, 1]
+
+
+    @pytest.mark.asyncio
+    async def test_publish_with_retry_records_attempts(self, sample_article_request):
+        """每次尝试记录状态、失败类型和各阶段耗时"""
+        from src.models import ErrorCategory, PlatformResult
+        from src.publishers.base import BasePublisher
+        from src.timing import phase
+
+        call_count = 0
+
+        class MockPublisher(BasePublisher):
+            BASE_RETRY_DELAY = 0.01
+
+            async def publish(self, request, platform):
+                nonlocal call_count
+                call_count += 1
+                with phase("render"):
+                    pass
+                with phase("api_call"):
+                    await asyncio.sleep(0.01)
+                if call_count < 2:
+                    return PlatformResult(platform=platform, status=PublishStatus.FAILED, error="临时错误")
+                return PlatformResult(platform=platform, status=PublishStatus.PUBLISHED)
+
+            async def check_auth(self, platform):
+                return True
+
+            def get_supported_platforms(self):
+                return [Platform.ZHIHU]
+
+        result = await MockPublisher().publish_with_retry(sample_article_request, Platform.ZHIHU)
+
+        assert [a.attempt for a in result.attempts] == [1, 2]
+        first, second = result.attempts
+        assert first.status == PublishStatus.FAILED
+        assert first.error_category == ErrorCategory.TRANSIENT
+        assert second.status == PublishStatus.PUBLISHED
+        assert set(second.phases) >= {"rate_limit_wait", "render", "api_call"}
+        assert second.phases["api_call"] >= 10
+        assert second.duration_ms >= second.phases["api_call"]
+        assert second.started_at >= first.finished_at
+
 class TestWechatMPPublisher:
     """测试微信公众号发布器"""
 
@@ -134,6 +318,27 @@ class TestWechatMPPublisher:
         result = await publisher.check_auth(Platform.WECHAT_MP)
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_publish_without_credentials_is_permanent(self, sample_article_request):
+        """未配置 AppID 属于永久性错误"""
+        from src.models import ErrorCategory
+        from src.publishers.wechat_mp_publisher import WechatMPPublisher
+
+        publisher = WechatMPPublisher()
+        publisher._app_id = ""
+        result = await publisher.publish(sample_article_request, Platform.WECHAT_MP)
+        assert result.status == PublishStatus.FAILED
+        assert result.error_category == ErrorCategory.PERMANENT
+
+    def test_errcode_category(self):
+        """微信 errcode 映射到失败类型"""
+        from src.models import ErrorCategory
+        from src.publishers.wechat_mp_publisher import WechatAPIError
+
+        assert WechatAPIError(40013, "invalid appid").category == ErrorCategory.PERMANENT
+        assert WechatAPIError(45009, "reach max api daily quota limit").category == ErrorCategory.RATE_LIMITED
+        assert WechatAPIError(42001, "access_token expired").category == ErrorCategory.TRANSIENT
+
     @pytest.mark.asyncio
     async def test_markdown_to_html(self):
         """测试 Markdown 转 HTML"""
@@ -157,6 +362,26 @@ class TestTwitterPublisher:
         result = await publisher.check_auth(Platform.TWITTER)
         assert result is False
 
+    def test_classify_response(self):
+        """按状态码区分限流/认证失效/永久错误"""
+        import time
+
+        import httpx
+
+        from src.models import ErrorCategory
+        from src.publishers.twitter_publisher import TwitterPublisher
+
+        reset = str(int(time.time()) + 60)
+        category, retry_after = TwitterPublisher._classify_response(
+            httpx.Response(429, headers={"x-rate-limit-reset": reset})
+        )
+        assert category == ErrorCategory.RATE_LIMITED
+        assert 0 < retry_after <= 60
+
+        assert TwitterPublisher._classify_response(httpx.Response(401))[0] == ErrorCategory.AUTH_EXPIRED
+        assert TwitterPublisher._classify_response(httpx.Response(403))[0] == ErrorCategory.PERMANENT
+        assert TwitterPublisher._classify_response(httpx.Response(503))[0] == ErrorCategory.TRANSIENT
+
     def test_format_tweet_length(self, sample_tweet_request):
         """测试推文长度限制"""
         from src.publishers.twitter_publisher import TwitterPublisher
@@ -179,6 +404,17 @@ class TestPlaywrightPublisher:
         assert Platform.DOUYIN in platforms
         assert Platform.YOUTUBE in platforms
 
+    @pytest.mark.asyncio
+    async def test_unimplemented_platform_is_permanent(self, sample_article_request):
+        """未实现的平台不进入重试"""
+        from src.models import ErrorCategory
+        from src.publishers.playwright_publisher import PlaywrightPublisher
+
+        result = await PlaywrightPublisher().publish_with_retry(sample_article_request, Platform.KUAISHOU)
+        assert result.status == PublishStatus.FAILED
+        assert result.retries == 0
+        assert result.error_category == ErrorCategory.PERMANENT
+
     @pytest.mark.asyncio
     async def test_check_auth_no_cookies(self):
         """测试无 Cookie 时认证检查"""
@@ -221,3 +457,358 @@ class TestModels:
             platforms=[Platform.ZHIHU],
         )
         assert req1.content_fingerprint != req2.content_fingerprint
+
+
+class TestRateLimiter:
+    """测试令牌桶限流与配额"""
+
+    def test_token_bucket_reserve_wait(self):
+        """桶空后按补充速率计算精确等待时间"""
+        from src.rate_limiter import TokenBucket
+
+        bucket = TokenBucket(rate_per_second=1.0, capacity=2)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(1.0, abs=0.05)
+        assert bucket.reserve() == pytest.approx(2.0, abs=0.05)
+
+    def test_token_bucket_max_wait(self):
+        """等待超过上限时不扣减令牌"""
+        from src.rate_limiter import TokenBucket
+
+        bucket = TokenBucket(rate_per_second=0.1, capacity=1)
+        bucket.reserve()
+        with pytest.raises(ValueError):
+            bucket.reserve(max_wait=1)
+        assert bucket.tokens == pytest.approx(0, abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_quota_exhausted(self):
+        """月配额用尽后直接拒绝"""
+        from uuid import uuid4
+
+        from src.rate_limiter import RateLimiter, RateLimitExceeded, RateLimitPolicy
+        from src.storage.database import init_db
+
+        init_db()
+        limiter = RateLimiter(
+            policies={Platform.TWITTER: RateLimitPolicy(rate_per_minute=600, burst=10, monthly_quota=2)}
+        )
+        account = uuid4().hex
+        for _ in range(2):
+            await limiter.acquire(Platform.TWITTER, account)
+            await limiter.record_usage(Platform.TWITTER, account)
+
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            await limiter.acquire(Platform.TWITTER, account)
+        assert "月配额" in str(exc_info.value)
+        assert exc_info.value.retry_after > 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_headers_block_bucket(self):
+        """x-rate-limit-remaining=0 时阻塞到 reset"""
+        import time
+
+        from src.rate_limiter import RateLimiter, RateLimitExceeded, RateLimitPolicy
+
+        limiter = RateLimiter(policies={Platform.TWITTER: RateLimitPolicy(rate_per_minute=600, burst=10)})
+        limiter.update_from_headers(
+            Platform.TWITTER,
+            {"x-rate-limit-remaining": "0", "x-rate-limit-reset": str(int(time.time()) + 900)},
+        )
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            await limiter.acquire(Platform.TWITTER, max_wait=60)
+        assert exc_info.value.retry_after > 800
+
+    @pytest.mark.asyncio
+    async def test_publish_with_retry_stops_when_limited(self, sample_tweet_request, monkeypatch):
+        """限流时 publish_with_retry 不再盲目重试"""
+        from src import rate_limiter as rate_limiter_module
+        from src.publishers.base import BasePublisher
+        from src.rate_limiter import RateLimitExceeded
+
+        calls = 0
+
+        class MockPublisher(BasePublisher):
+            async def publish(self, request, platform):
+                nonlocal calls
+                calls += 1
+
+            async def check_auth(self, platform):
+                return True
+
+            def get_supported_platforms(self):
+                return [Platform.TWITTER]
+
+        async def limited(platform, *args, **kwargs):
+            raise RateLimitExceeded(platform, 900, "触发限流")
+
+        monkeypatch.setattr(rate_limiter_module.rate_limiter, "acquire", limited)
+        result = await MockPublisher().publish_with_retry(sample_tweet_request, Platform.TWITTER)
+        assert result.status == PublishStatus.FAILED
+        assert "限流" in result.error
+        assert calls == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_wait_does_not_hold_scheduler_slot(self, sample_tweet_request, monkeypatch):
+        """限流等待期间不占用调度器名额，名额只在实际调用发布接口时持有"""
+        from src import rate_limiter as rate_limiter_module
+        from src.publishers.base import BasePublisher
+        from src.scheduler import ConcurrencyScheduler
+
+        scheduler = ConcurrencyScheduler(method_limits={}, platform_limits={Platform.TWITTER: 1})
+        active_during_wait = []
+        active_during_publish = []
+
+        class MockPublisher(BasePublisher):
+            async def publish(self, request, platform):
+                active_during_publish.append(scheduler.snapshot()["platforms"]["twitter"]["active"])
+                return PlatformResult(platform=platform, status=PublishStatus.PUBLISHED)
+
+            async def check_auth(self, platform):
+                return True
+
+            def get_supported_platforms(self):
+                return [Platform.TWITTER]
+
+        async def throttled(platform, *args, **kwargs):
+            active_during_wait.append(scheduler.snapshot()["platforms"]["twitter"]["active"])
+            await asyncio.sleep(0.01)
+
+        async def record(platform, *args, **kwargs):
+            return None
+
+        monkeypatch.setattr(rate_limiter_module.rate_limiter, "acquire", throttled)
+        monkeypatch.setattr(rate_limiter_module.rate_limiter, "record_usage", record)
+        results = await MockPublisher().publish_many_with_retry(
+            sample_tweet_request, [Platform.TWITTER], slot=lambda batch: scheduler.slot(*batch)
+        )
+        assert results[0].status == PublishStatus.PUBLISHED
+        assert active_during_wait == [0]
+        assert active_during_publish == [1]
+
+    @pytest.mark.asyncio
+    async def test_usage_bookkeeping_failure_keeps_published(self, sample_tweet_request, monkeypatch):
+        """配额记账失败不影响已发布的结果，也不触发重试"""
+        from src import rate_limiter as rate_limiter_module
+        from src.publishers.base import BasePublisher
+
+        calls = 0
+
+        class MockPublisher(BasePublisher):
+            async def publish(self, request, platform):
+                nonlocal calls
+                calls += 1
+                return PlatformResult(platform=platform, status=PublishStatus.PUBLISHED)
+
+            async def check_auth(self, platform):
+                return True
+
+            def get_supported_platforms(self):
+                return [Platform.TWITTER]
+
+        async def allowed(platform, *args, **kwargs):
+            return None
+
+        async def broken(platform, *args, **kwargs):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(rate_limiter_module.rate_limiter, "acquire", allowed)
+        monkeypatch.setattr(rate_limiter_module.rate_limiter, "record_usage", broken)
+        result = await MockPublisher().publish_with_retry(sample_tweet_request, Platform.TWITTER)
+        assert result.status == PublishStatus.PUBLISHED
+        assert calls == 1
+
+
+class _FakeContext:
+    def __init__(self):
+        self.closed = False
+        self.pages = 0
+
+    async def new_page(self):
+        self.pages += 1
+        return AsyncMock()
+
+    async def storage_state(self, path):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts: list[_FakeContext] = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        context = _FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class TestBrowserPool:
+    """测试 Playwright 浏览器池"""
+
+    @pytest.fixture
+    def pool(self, monkeypatch):
+        from src.publishers.browser_pool import BrowserPool
+
+        pool = BrowserPool(size=1, max_context_uses=2)
+        launched: list[_FakeBrowser] = []
+
+        async def fake_launch():
+            browser = _FakeBrowser()
+            launched.append(browser)
+            return browser
+
+        monkeypatch.setattr(pool, "_launch_browser", fake_launch)
+        pool.launched = launched
+        return pool
+
+    @pytest.mark.asyncio
+    async def test_reuses_browser_and_context(self, pool, tmp_path):
+        """同一平台的多次发布复用浏览器和 context"""
+        for _ in range(2):
+            async with pool.page(Platform.DOUYIN, tmp_path / "douyin.json"):
+                pass
+
+        assert len(pool.launched) == 1
+        assert len(pool.launched[0].contexts) == 1
+        assert pool.launched[0].contexts[0].pages == 2
+
+    @pytest.mark.asyncio
+    async def test_recycles_after_max_uses(self, pool, tmp_path):
+        """context 达到使用上限后重建"""
+        for _ in range(3):
+            async with pool.page(Platform.DOUYIN, tmp_path / "douyin.json"):
+                pass
+
+        contexts = pool.launched[0].contexts
+        assert len(contexts) == 2
+        assert contexts[0].closed is True
+        assert contexts[1].closed is False
+
+    @pytest.mark.asyncio
+    async def test_recycles_on_error_and_crash(self, pool, tmp_path):
+        """发布异常回收 context，浏览器断开后重新启动"""
+        with pytest.raises(RuntimeError):
+            async with pool.page(Platform.BILIBILI_VIDEO, tmp_path / "bili.json"):
+                raise RuntimeError("页面崩溃")
+        assert pool.launched[0].contexts[0].closed is True
+
+        pool.launched[0].connected = False
+        async with pool.page(Platform.BILIBILI_VIDEO, tmp_path / "bili.json"):
+            pass
+        assert len(pool.launched) == 2
+
+        await pool.close()
+        assert pool.stats() == {"browsers": 0, "contexts": {}}
+
+    @pytest.mark.asyncio
+    async def test_recycle_waits_for_pages_sharing_context(self, pool, tmp_path):
+        """同平台并发发布共享 context：一个页面失败只停止借出，其他页面归还后才关闭"""
+        state = tmp_path / "douyin.json"
+        async with pool.page(Platform.DOUYIN, state):
+            with pytest.raises(RuntimeError):
+                async with pool.page(Platform.DOUYIN, state):
+                    raise RuntimeError("页面崩溃")
+            shared = pool.launched[0].contexts[0]
+            assert shared.closed is False  # 外层页面仍在使用
+
+            async with pool.page(Platform.DOUYIN, state):
+                pass
+            assert len(pool.launched[0].contexts) == 2  # 新的借出使用新 context
+            assert shared.closed is False
+
+        assert shared.closed is True
+        assert pool.launched[0].contexts[1].closed is False
+
+
+class _FakeResponseInfo:
+    def __init__(self, response):
+        self._response = response
+
+    @property
+    def value(self):
+        async def _get():
+            return self._response
+
+        return _get()
+
+
+class _FakeExpectResponse:
+    def __init__(self, response):
+        self._info = _FakeResponseInfo(response)
+
+    async def __aenter__(self):
+        return self._info
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class TestPlaywrightWaits:
+    """测试事件驱动等待与操作节奏"""
+
+    @pytest.fixture
+    def publisher(self):
+        from src.publishers.playwright_publisher import HUMANIZATION_PROFILES, PlaywrightPublisher
+
+        publisher = PlaywrightPublisher()
+        publisher._profile = HUMANIZATION_PROFILES["none"]
+        return publisher
+
+    @pytest.mark.asyncio
+    async def test_click_and_confirm_success(self, publisher):
+        """拦截到发布接口 2xx 响应即确认成功"""
+        page = MagicMock()
+        page.expect_response = MagicMock(return_value=_FakeExpectResponse(MagicMock(ok=True, status=200)))
+        button = AsyncMock()
+
+        await publisher._click_and_confirm(page, button, Platform.DOUYIN)
+        button.click.assert_awaited_once()
+        predicate = page.expect_response.call_args.args[0]
+        create_url = "https://creator.douyin.com/web/api/media/aweme/create/?a=1"
+        assert predicate(MagicMock(url=create_url, request=MagicMock(method="POST")))
+        assert not predicate(MagicMock(url="https://creator.douyin.com/other", request=MagicMock(method="POST")))
+
+    @pytest.mark.asyncio
+    async def test_click_and_confirm_error_response(self, publisher):
+        """发布接口返回错误时不报告成功"""
+        from src.publishers.playwright_publisher import PublishNotConfirmed
+
+        page = MagicMock()
+        page.expect_response = MagicMock(return_value=_FakeExpectResponse(MagicMock(ok=False, status=500)))
+
+        with pytest.raises(PublishNotConfirmed):
+            await publisher._click_and_confirm(page, AsyncMock(), Platform.BILIBILI_VIDEO)
+
+    @pytest.mark.asyncio
+    async def test_wait_for_upload_uses_selector(self, publisher):
+        """上传等待由完成标志驱动"""
+        locator = MagicMock()
+        locator.first.wait_for = AsyncMock()
+        page = MagicMock()
+        page.locator.return_value = locator
+
+        await publisher._wait_for_upload(page, Platform.DOUYIN)
+        assert "重新上传" in page.locator.call_args.args[0]
+        assert locator.first.wait_for.await_args.kwargs["state"] == "visible"
+
+    @pytest.mark.asyncio
+    async def test_none_profile_skips_delay(self, publisher, monkeypatch):
+        """none 节奏下不等待"""
+        from src.publishers import playwright_publisher as module
+
+        sleep = AsyncMock()
+        monkeypatch.setattr(module.asyncio, "sleep", sleep)
+        await publisher._random_delay()
+        await publisher._random_delay(short=True)
+        sleep.assert_not_called()